@@ -0,0 +1,93 @@
+"""PropPredict: real estate price prediction engine."""
+
+import importlib
+
+from proppredict.address import AddressIndex
+from proppredict.cache import load_table
+from proppredict.categorical import Categorical
+from proppredict.convert import convert
+from proppredict.cv import CVReport, FoldResult, RidgeModel, cross_validate
+from proppredict.decode import (
+    DecodeError,
+    Decoded,
+    decode_address,
+    decode_area,
+    decode_dates,
+    decode_rooms,
+    normalize_yr_renovated,
+)
+from proppredict.gbt import BinMapper, CompiledForest, GradientBoostedTrees
+from proppredict.house import House, Houses
+from proppredict.linear import StreamingRidge
+from proppredict.predicate import Predicate
+from proppredict.quarantine import QuarantineReport, quarantine
+from proppredict.query import LazyFrame, col, scan
+from proppredict.repair import RepairReport, repair_sqft_living
+from proppredict.rowgroup import RowGroupFile, write_rowgroups
+from proppredict.search import BinnedFeatures, SearchReport, load_binned, successive_halving
+from proppredict.schema import LISTING_SCHEMA, Field, Schema, SchemaError
+from proppredict.stream import iter_houses
+from proppredict.table import COLUMNS, ListingTable, MappedCSV, TextSpans, read_csv, read_dat, read_table
+
+# diff and ingest are also run with ``python -m``; importing them eagerly here
+# would make runpy warn that they are already in sys.modules.
+_LAZY = {"IngestStore": "proppredict.ingest", "SnapshotDiff": "proppredict.diff"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "AddressIndex",
+    "BinMapper",
+    "BinnedFeatures",
+    "COLUMNS",
+    "CVReport",
+    "Categorical",
+    "CompiledForest",
+    "DecodeError",
+    "Decoded",
+    "Field",
+    "FoldResult",
+    "GradientBoostedTrees",
+    "House",
+    "Houses",
+    "IngestStore",
+    "LazyFrame",
+    "LISTING_SCHEMA",
+    "ListingTable",
+    "MappedCSV",
+    "Predicate",
+    "QuarantineReport",
+    "RepairReport",
+    "RidgeModel",
+    "RowGroupFile",
+    "Schema",
+    "SearchReport",
+    "SchemaError",
+    "SnapshotDiff",
+    "StreamingRidge",
+    "TextSpans",
+    "col",
+    "convert",
+    "cross_validate",
+    "decode_address",
+    "decode_area",
+    "decode_dates",
+    "decode_rooms",
+    "iter_houses",
+    "load_binned",
+    "load_table",
+    "normalize_yr_renovated",
+    "quarantine",
+    "read_csv",
+    "read_dat",
+    "read_table",
+    "repair_sqft_living",
+    "scan",
+    "successive_halving",
+    "write_rowgroups",
+]
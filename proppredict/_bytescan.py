@@ -0,0 +1,251 @@
+"""Vectorised byte scanning over a column of strings packed into one buffer.
+
+A column is laid out as a single ``uint8`` buffer with ``\\n`` between rows,
+plus ``starts``/``ends`` offset arrays.  All helpers work on every row at once
+and return an ``ok`` mask alongside their result instead of raising, so the
+decoders can report malformed rows by index.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+NEWLINE = 10
+_ZERO = 48
+# FNV-1a 64-bit prime; diff and address fold their per-column hashes with it too.
+HASH_PRIME = np.uint64(0x100000001B3)
+# _TAIL_MASKS[k] keeps the low ``k`` bytes of a little-endian word.
+_TAIL_MASKS = np.array([(1 << (8 * k)) - 1 for k in range(9)], dtype=np.uint64)
+
+
+def join_column(values: Sequence[str] | np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pack ``values`` into one byte buffer.
+
+    Returns ``(buf, starts, ends, ok)``; rows that contain a newline (and so
+    cannot be delimited) are blanked and flagged in ``ok``.
+    """
+    values = values.tolist() if isinstance(values, np.ndarray) else list(values)
+    n = len(values)
+    ok = np.ones(n, dtype=bool)
+    try:
+        text = "\n".join(values)
+    except TypeError:
+        values = [str(v) for v in values]
+        text = "\n".join(values)
+    buf = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    ends = np.flatnonzero(buf == NEWLINE)
+    if len(ends) != max(n - 1, 0):
+        # Only reachable on bad input, so the per-row fallback is acceptable.
+        bad = [i for i, v in enumerate(values) if "\n" in v]
+        ok[bad] = False
+        for i in bad:
+            values[i] = ""
+        buf = np.frombuffer("\n".join(values).encode("utf-8"), dtype=np.uint8)
+        ends = np.flatnonzero(buf == NEWLINE)
+    ends = np.append(ends, len(buf)).astype(np.int64) if n else np.empty(0, dtype=np.int64)
+    starts = np.empty_like(ends)
+    if n:
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+    return buf, starts, ends, ok
+
+
+def byte_at(buf: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """Bytes at ``pos``; out-of-range positions are clamped, so callers must mask them."""
+    if not len(buf):
+        return np.zeros(len(pos), dtype=np.uint8)
+    return buf.take(pos, mode="clip")
+
+
+def find_each(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, byte: int, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Locate ``byte`` in every row that contains it exactly ``count`` times.
+
+    Returns an ``(n, count)`` array of absolute offsets and the ``ok`` mask.
+    """
+    hits = np.flatnonzero(buf == byte)
+    first = np.searchsorted(hits, starts)
+    found = np.searchsorted(hits, ends) - first
+    ok = found == count
+    idx = np.where(ok, first, 0)[:, None] + np.arange(count)
+    pos = hits[np.minimum(idx, len(hits) - 1)] if len(hits) else np.zeros(idx.shape, dtype=np.int64)
+    return np.where(ok[:, None], pos, 0), ok
+
+
+def rfind_each(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, byte: int, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Locate the last ``count`` occurrences of ``byte`` in every row.
+
+    Returns an ``(n, count)`` array of absolute offsets in increasing order;
+    rows with fewer occurrences are flagged in the ``ok`` mask.
+    """
+    hits = np.flatnonzero(buf == byte)
+    first = np.searchsorted(hits, starts)
+    stop = np.searchsorted(hits, ends)
+    ok = stop - first >= count
+    idx = np.where(ok, stop - count, 0)[:, None] + np.arange(count)
+    pos = hits[np.minimum(idx, len(hits) - 1)] if len(hits) else np.zeros(idx.shape, dtype=np.int64)
+    return np.where(ok[:, None], pos, 0), ok
+
+
+def _words(buf: np.ndarray) -> np.ndarray:
+    """Unaligned little-endian uint64 view starting at every byte; short buffers are zero-padded."""
+    padded = buf if len(buf) >= 8 else np.concatenate([buf, np.zeros(8 - len(buf), np.uint8)])
+    return np.ndarray((len(padded) - 7,), dtype="<u8", buffer=padded, strides=(1,))
+
+
+def _word_at(words: np.ndarray, pos: np.ndarray, remaining: np.ndarray) -> np.ndarray:
+    """The ``min(remaining, 8)`` bytes at ``pos`` as one word, zero above them."""
+    last = len(words) - 1
+    word = words[np.minimum(pos, last)]
+    if len(pos) and pos.max() > last:
+        # Words that would run past the buffer are read from its last word and shifted down.
+        word >>= (np.maximum(pos - last, 0) * 8).astype(np.uint64)
+    return word & _TAIL_MASKS[np.clip(remaining, 0, 8)]
+
+
+def gather_spans(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Copy each span into a fixed-width ``S`` array without building Python strings.
+
+    Spans are copied eight bytes per gather through an unaligned uint64 view.
+    """
+    lengths = np.maximum(ends - starts, 0)
+    width = int(lengths.max()) if len(lengths) else 0
+    if not width or not len(buf):
+        return np.zeros(len(starts), dtype="S1")
+    words = _words(buf)
+    out = np.empty((len(starts), -(-width // 8)), dtype="<u8")
+    for j in range(out.shape[1]):
+        out[:, j] = _word_at(words, starts + 8 * j, lengths - 8 * j)
+    chars = out.view(np.uint8)[:, :width]
+    return np.ascontiguousarray(chars).view(f"S{width}").ravel()
+
+
+def matches(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, literal: bytes) -> np.ndarray:
+    """Mask of spans ``buf[starts:ends]`` equal to ``literal``."""
+    ok = (ends - starts) == len(literal)
+    if len(literal) < 8 or len(buf) < 8:
+        for j, char in enumerate(literal):
+            ok &= byte_at(buf, starts + j) == char
+        return ok
+    # Compare eight bytes per gather through an unaligned uint64 view; the last
+    # word overlaps the previous one so reads never run past the literal.
+    words = np.ndarray((len(buf) - 7,), dtype="<u8", buffer=buf, strides=(1,))
+    for off in [*range(0, len(literal) - 7, 8), len(literal) - 8]:
+        expected = int.from_bytes(literal[off:off + 8], "little")
+        ok &= words[np.minimum(starts + off, len(words) - 1)] == expected
+    return ok
+
+
+def parse_uint(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, max_digits: int) -> tuple[np.ndarray, np.ndarray]:
+    """Parse unsigned decimal integers of at most ``max_digits`` digits into int64."""
+    lengths = ends - starts
+    ok = (lengths > 0) & (lengths <= max_digits)
+    value = np.zeros(len(starts), dtype=np.int64)
+    for j in range(max_digits):
+        inside = j < lengths
+        if not inside.any():
+            break
+        digit = byte_at(buf, starts + j).astype(np.int64) - _ZERO
+        ok &= ~inside | ((digit >= 0) & (digit <= 9))
+        value = np.where(inside, value * 10 + digit, value)
+    return np.where(ok, value, 0), ok
+
+
+def parse_decimal(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, max_chars: int) -> tuple[np.ndarray, np.ndarray]:
+    """Parse unsigned decimals such as ``2.25`` or ``3`` into float64.
+
+    ``max_chars`` must stay at or below 15 so the digit accumulator is exact
+    and the final division rounds exactly like ``float(text)``.
+    """
+    lengths = ends - starts
+    ok = (lengths > 0) & (lengths <= max_chars)
+    value = np.zeros(len(starts), dtype=np.int64)
+    dots = np.zeros(len(starts), dtype=np.int64)
+    digits = np.zeros(len(starts), dtype=np.int64)
+    scale = np.zeros(len(starts), dtype=np.int64)
+    for j in range(max_chars):
+        inside = j < lengths
+        if not inside.any():
+            break
+        char = byte_at(buf, starts + j)
+        digit = char.astype(np.int64) - _ZERO
+        is_digit = inside & (digit >= 0) & (digit <= 9)
+        is_dot = inside & (char == ord("."))
+        ok &= ~inside | is_digit | is_dot
+        scale += is_digit & (dots > 0)
+        digits += is_digit
+        dots += is_dot
+        value = np.where(is_digit, value * 10 + digit, value)
+    ok &= (dots <= 1) & (digits > 0)
+    return np.where(ok, value / 10.0 ** scale, 0.0), ok
+
+
+def unique_bytes(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``np.unique(values, return_inverse=True)`` for an ``S`` array.
+
+    Rows are grouped by a 64-bit hash of their bytes, so only the distinct
+    values are ever compared as strings.  Hash collisions are detected and
+    fall back to the exact string sort.
+    """
+    n, width = len(values), values.dtype.itemsize
+    if not n:
+        return values[:0], np.empty(0, dtype=np.intp)
+    words = np.zeros((n, -(-width // 8)), dtype=np.uint64)
+    words.view(np.uint8)[:, :width] = np.ascontiguousarray(values).view(np.uint8).reshape(n, width)
+    hashes = np.zeros(n, dtype=np.uint64)
+    for column in words.T:
+        hashes = (hashes ^ column) * HASH_PRIME
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    reps = values[first]
+    if (reps[inverse] != values).any():
+        return np.unique(values, return_inverse=True)
+    order = np.argsort(reps)
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    return reps[order], rank[inverse]
+
+
+def mix64(h: np.ndarray) -> np.ndarray:
+    """Murmur3 64-bit finaliser, applied elementwise to a ``uint64`` array."""
+    h = h ^ (h >> np.uint64(33))
+    h = h * np.uint64(0xFF51AFD7ED558CCD)
+    h = h ^ (h >> np.uint64(33))
+    h = h * np.uint64(0xC4CEB9FE1A85EC53)
+    return h ^ (h >> np.uint64(33))
+
+
+def span_hashes(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """64-bit hash of every span ``buf[starts:ends]``, independent of where the span lies.
+
+    Spans are folded eight bytes at a time through an unaligned uint64 view,
+    so the work per call is proportional to the longest span, not the buffer.
+    """
+    lengths = ends - starts
+    h = lengths.astype(np.uint64)
+    if not len(buf):
+        return mix64(h)
+    words = _words(buf)
+    width = int(lengths.max()) if len(lengths) else 0
+    for k in range(0, width, 8):
+        remaining = lengths - k
+        word = _word_at(words, starts + k, remaining)
+        if remaining.min() > 0:
+            h = (h ^ word) * HASH_PRIME
+        else:
+            h = np.where(remaining > 0, (h ^ word) * HASH_PRIME, h)
+    return mix64(h)
+
+
+def spans_equal(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, other_starts: np.ndarray, other_ends: np.ndarray) -> np.ndarray:
+    """Mask of rows where ``buf[starts:ends]`` and ``buf[other_starts:other_ends]`` hold the same bytes."""
+    lengths = ends - starts
+    equal = lengths == other_ends - other_starts
+    if not len(buf):
+        return equal
+    words = _words(buf)
+    width = int(lengths.max()) if len(lengths) else 0
+    for k in range(0, width, 8):
+        remaining = lengths - k
+        equal &= _word_at(words, starts + k, remaining) == _word_at(words, other_starts + k, remaining)
+    return equal
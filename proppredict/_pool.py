@@ -0,0 +1,44 @@
+"""Ordered, bounded fan-out of tasks over a process pool.
+
+Writers that render chunks in parallel must still write them in order and
+must not let finished chunks pile up in memory.  :func:`ordered_map` keeps
+at most two tasks per worker in flight and yields results in submission
+order, so memory stays bounded by ``2 * workers`` chunks whatever the
+input size.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def ordered_map(
+    fn: Callable[..., T],
+    args: Sequence[tuple],
+    workers: int,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> Iterator[T]:
+    """Yield ``fn(*a)`` for every ``a`` in ``args``, in order.
+
+    With ``workers == 1`` or a single task everything runs in this process,
+    through the same ``initializer`` as the pool workers.
+    """
+    if workers == 1 or len(args) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for a in args:
+            yield fn(*a)
+        return
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as pool:
+        pending: deque = deque()
+        for a in args:
+            pending.append(pool.submit(fn, *a))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,99 @@
+"""Numpy arrays in shared memory for process pools.
+
+:class:`SharedArrays` copies arrays into named
+:class:`~multiprocessing.shared_memory.SharedMemory` blocks once; workers
+receive only the picklable :attr:`SharedArrays.specs` (in the pool
+initializer) and :func:`attach` them as ordinary arrays without copying.
+Writes by any process are visible to all of them.
+
+Pool tasks find their arrays with :func:`worker_arrays`, keyed by the
+module that owns the pool.  :func:`init_worker` is the pool initializer,
+and :func:`local_arrays` installs the same arrays in this process for
+``workers=1`` runs.  The owner key keeps a model fitted inside another
+module's task from replacing that task's arrays.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterator, Mapping
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class SharedArrays:
+    """Owner of shared copies of ``arrays``; :meth:`close` (or leaving the ``with`` block) frees them."""
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.arrays: dict[str, np.ndarray] = {}
+        self.specs: dict[str, ArraySpec] = {}
+        for key, array in arrays.items():
+            array = np.asarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self.arrays[key] = view
+            self.specs[key] = ArraySpec(block.name, array.shape, array.dtype.str)
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.arrays.clear()
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping goes away with it
+            block.unlink()
+        self._blocks.clear()
+
+
+def attach(specs: Mapping[str, ArraySpec]) -> tuple[dict[str, np.ndarray], list[shared_memory.SharedMemory]]:
+    """Map the arrays described by ``specs``; keep the returned blocks alive as long as the arrays are used."""
+    arrays, blocks = {}, []
+    for key, spec in specs.items():
+        block = shared_memory.SharedMemory(name=spec.name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+_worker_arrays: dict[str, dict[str, np.ndarray]] = {}
+_worker_blocks: list[shared_memory.SharedMemory] = []
+
+
+def init_worker(owner: str, specs: Mapping[str, ArraySpec]) -> None:
+    """Pool initializer: attach ``specs`` as the arrays of ``owner`` for the life of the worker."""
+    arrays, blocks = attach(specs)
+    _worker_blocks.extend(blocks)
+    _worker_arrays[owner] = arrays
+
+
+def worker_arrays(owner: str) -> dict[str, np.ndarray]:
+    """The arrays installed for ``owner`` by :func:`init_worker` or :func:`local_arrays`."""
+    return _worker_arrays[owner]
+
+
+@contextmanager
+def local_arrays(owner: str, arrays: dict[str, np.ndarray]) -> Iterator[None]:
+    """Install ``arrays`` for ``owner`` in this process while the block runs."""
+    _worker_arrays[owner] = arrays
+    try:
+        yield
+    finally:
+        del _worker_arrays[owner]
@@ -0,0 +1,238 @@
+"""Address normalisation, duplicate detection and repeat-sale pairs.
+
+Every row gets a 64-bit key from its normalised ``street``, ``city`` and
+``statezip``.  Normalisation and hashing run once per distinct category
+rather than once per row, and rows are then grouped by key in a single
+sort, so the cost never involves comparing address strings pairwise.
+Keys depend only on the address text, not on a table's dictionaries, so
+they can be compared across files and snapshots.
+
+Within an address group, rows are ordered by date and classified:
+
+* ``unique``: the only record at that address;
+* ``first``: the earliest record of a repeated address;
+* ``duplicate``: identical to an earlier record in every column, with the
+  address compared after normalisation, i.e. the same listing ingested twice;
+* ``conflict``: same address and day as an earlier record but different
+  values, i.e. contradictory copies of one listing;
+* ``repeat_sale``: the same address sold again on a later day.
+
+:meth:`AddressIndex.training_mask` drops duplicates and conflicts so they
+do not weigh twice in a model; :meth:`AddressIndex.repeat_sales` pairs
+consecutive sales of the same address.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from proppredict._bytescan import HASH_PRIME, join_column, mix64, span_hashes
+from proppredict.categorical import Categorical
+from proppredict.table import ListingTable
+
+ADDRESS_COLUMNS = ("street", "city", "statezip")
+KINDS = ("unique", "first", "duplicate", "conflict", "repeat_sale")
+UNIQUE, FIRST, DUPLICATE, CONFLICT, REPEAT_SALE = range(len(KINDS))
+
+_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "av": "ave",
+    "road": "rd",
+    "drive": "dr",
+    "boulevard": "blvd",
+    "lane": "ln",
+    "place": "pl",
+    "court": "ct",
+    "terrace": "ter",
+    "parkway": "pkwy",
+    "highway": "hwy",
+    "circle": "cir",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+    "northeast": "ne",
+    "northwest": "nw",
+    "southeast": "se",
+    "southwest": "sw",
+    "apartment": "#",
+    "apt": "#",
+    "unit": "#",
+}
+_PUNCTUATION = re.compile(r"[.,;']")
+_UNIT = re.compile(r"#\s*")
+
+
+def normalize_street(value: str) -> str:
+    """Lower-case, drop punctuation, abbreviate suffixes and directions: ``"100 Main Street N."`` -> ``"100 main st n"``."""
+    words = _PUNCTUATION.sub(" ", value.casefold()).split()
+    return _UNIT.sub("#", " ".join(_ABBREVIATIONS.get(w, w) for w in words))
+
+
+def normalize_city(value: str) -> str:
+    return " ".join(_PUNCTUATION.sub(" ", value.casefold()).split())
+
+
+def normalize_statezip(value: str) -> str:
+    """``"wa  98103"`` -> ``"WA98103"``."""
+    return "".join(value.upper().split())
+
+
+_NORMALIZERS = {"street": normalize_street, "city": normalize_city, "statezip": normalize_statezip}
+
+
+def _category_hashes(column: Categorical, normalize) -> tuple[np.ndarray, np.ndarray]:
+    """Hash and exact id of every category after normalisation; row codes index both."""
+    normalized = np.array([normalize(v) for v in column.categories.tolist()], dtype=str)
+    buf, starts, ends, _ = join_column(normalized)
+    _, exact = np.unique(normalized, return_inverse=True) if len(normalized) else (None, np.empty(0, np.intp))
+    return span_hashes(buf, starts, ends), exact.reshape(-1)
+
+
+def address_keys(table: ListingTable) -> np.ndarray:
+    """64-bit key per row of the normalised ``street``, ``city`` and ``statezip``."""
+    return _address_keys(table)[0]
+
+
+def _address_keys(table: ListingTable) -> tuple[np.ndarray, np.ndarray]:
+    """Keys plus exact normalised ids, ``(rows, 3)``, to verify groups against hash collisions."""
+    keys = np.zeros(len(table), dtype=np.uint64)
+    exact = np.empty((len(table), len(ADDRESS_COLUMNS)), dtype=np.int64)
+    for j, name in enumerate(ADDRESS_COLUMNS):
+        column = table[name]
+        hashes, ids = _category_hashes(column, _NORMALIZERS[name])
+        codes = np.asarray(column.codes)
+        present = codes >= 0
+        safe = np.maximum(codes, 0)
+        row_hash = np.where(present, hashes[safe] if len(hashes) else 0, np.uint64(0))
+        exact[:, j] = np.where(present, ids[safe] if len(ids) else -1, -1)
+        keys = (keys ^ row_hash) * HASH_PRIME
+    return mix64(keys), exact
+
+
+def _row_hashes(table: ListingTable, keys: np.ndarray) -> np.ndarray:
+    """64-bit hash of each row, with the address compared by its normalised key."""
+    h = keys.copy()
+    for name, column in table.columns.items():
+        if name in ADDRESS_COLUMNS:
+            continue
+        if isinstance(column, Categorical):
+            buf, starts, ends, _ = join_column(column.categories)
+            values = span_hashes(buf, starts, ends)[np.maximum(column.codes, 0)] if len(column.categories) else 0
+            values = np.where(np.asarray(column.codes) >= 0, values, np.uint64(0))
+        else:
+            data = np.asarray(column)
+            if data.dtype.kind == "f":
+                data = data.astype(np.float64)
+            elif data.dtype.kind == "M":
+                data = data.astype("datetime64[s]")
+            else:
+                data = data.astype(np.int64)
+            values = data.view(np.uint64)
+        h = (h ^ mix64(values)) * HASH_PRIME
+    return mix64(h)
+
+
+def _first_in_run(*columns: np.ndarray) -> np.ndarray:
+    """Mask over rows already in sorted order: True where any of ``columns`` differs from the previous row."""
+    n = len(columns[0])
+    first = np.zeros(n, dtype=bool)
+    if n:
+        first[0] = True
+        for column in columns:
+            first[1:] |= column[1:] != column[:-1]
+    return first
+
+
+@dataclass(frozen=True)
+class AddressIndex:
+    """Address groups of a table.
+
+    Attributes:
+        keys: per-row 64-bit address key.
+        group: per-row dense group id; groups are numbered in key order.
+        kind: per-row classification, an index into :data:`KINDS`.
+        order: rows sorted by group, then date, then row number.
+        offsets: ``order[offsets[g]:offsets[g + 1]]`` are the rows of group ``g``.
+    """
+
+    keys: np.ndarray
+    group: np.ndarray
+    kind: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+    _dates: np.ndarray
+
+    @classmethod
+    def build(cls, table: ListingTable) -> "AddressIndex":
+        keys, exact = _address_keys(table)
+        _, first_row, group = np.unique(keys, return_index=True, return_inverse=True)
+        group = group.reshape(-1)
+        if (exact != exact[first_row][group]).any():
+            # A 64-bit collision merged two addresses; group by the exact ids instead.
+            _, group = np.unique(exact, axis=0, return_inverse=True)
+            group = group.reshape(-1)
+        groups = int(group.max()) + 1 if len(group) else 0
+        dates = np.asarray(table["date"]).astype("datetime64[s]").astype(np.int64)
+        days = dates // 86400
+        rows = np.arange(len(table))
+
+        kind = np.full(len(table), REPEAT_SALE, dtype=np.int8)
+        by_date = np.lexsort((rows, dates, group))
+        sizes = np.bincount(group, minlength=groups)
+        g = group[by_date]
+        starts = _first_in_run(g)
+        kind[by_date[starts]] = np.where(sizes[g[starts]] > 1, FIRST, UNIQUE)
+
+        content = _row_hashes(table, keys)
+        by_content = np.lexsort((rows, dates, content, group))
+        repeated = ~_first_in_run(group[by_content], content[by_content])
+        kind[by_content[repeated]] = DUPLICATE
+
+        # Same address and day as an earlier record that is not itself a duplicate.
+        distinct = kind != DUPLICATE
+        candidates = np.flatnonzero(distinct)
+        by_day = candidates[np.lexsort((candidates, dates[candidates], days[candidates], group[candidates]))]
+        later = ~_first_in_run(group[by_day], days[by_day])
+        kind[by_day[later]] = CONFLICT
+
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        return cls(keys, group, kind, by_date, offsets, dates)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def groups(self) -> int:
+        return len(self.offsets) - 1
+
+    def rows_of(self, group: int) -> np.ndarray:
+        """Rows at one address, oldest first."""
+        return self.order[self.offsets[group]:self.offsets[group + 1]]
+
+    def counts(self) -> dict[str, int]:
+        return dict(zip(KINDS, np.bincount(self.kind, minlength=len(KINDS)).tolist()))
+
+    def training_mask(self) -> np.ndarray:
+        """Rows to train on: everything except duplicates and conflicting copies."""
+        return (self.kind != DUPLICATE) & (self.kind != CONFLICT)
+
+    def repeat_sales(self, table: ListingTable) -> ListingTable:
+        """Consecutive sales of the same address: row numbers, prices and days between them."""
+        sales = self.order[self.training_mask()[self.order]]
+        same = self.group[sales[1:]] == self.group[sales[:-1]]
+        before, after = sales[:-1][same], sales[1:][same]
+        price = np.asarray(table["price"], dtype=np.float64)
+        return ListingTable(
+            {
+                "row_before": before,
+                "row_after": after,
+                "price_before": price[before],
+                "price_after": price[after],
+                "days": (self._dates[after] - self._dates[before]) // 86400,
+            }
+        )
@@ -0,0 +1,263 @@
+"""Benchmarks for each stage of the ``data.dat -> data.csv -> model`` pipeline.
+
+The seed files are ``data/data.dat`` and ``data/data.csv``; larger inputs
+are produced by repeating their records ``scale`` times.  Every stage is
+timed on its own (best of ``repeats``) together with the peak resident set
+size observed while it ran, and results are appended as JSON lines so runs
+can be compared across commits::
+
+    python -m proppredict.bench --scales 1 10 100 --output bench_results.jsonl
+
+``--large`` adds the 1000x scale (4.6M rows), which takes minutes per
+repeat and a few GiB of memory, so it is opt-in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from proppredict.convert import array_bounds, convert
+from proppredict.features import feature_matrix, target
+from proppredict.gbt import GradientBoostedTrees
+from proppredict.linear import StreamingRidge
+from proppredict.quarantine import quarantine
+from proppredict.repair import repair_sqft_living
+from proppredict.stream import iter_houses
+from proppredict.table import BATCH_ROWS, ListingTable, PathLike, batches, from_records, read_csv
+
+DEFAULT_SCALES = (1, 10, 100)
+LARGE_SCALE = 1000
+# Trees in the benchmarked boosted model: enough levels and trees to exercise
+# the engine while keeping the 1000x train stage to minutes.
+BENCH_TREES = 50
+_COPY_BLOCK = 1 << 20
+
+
+@dataclass
+class Result:
+    stage: str
+    scale: int
+    rows: int
+    seconds: float
+    peak_rss_bytes: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+
+class _PeakRSS:
+    """Track the peak resident set size of this process while the block runs."""
+
+    _PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = 0
+
+    def _current(self) -> int:
+        try:
+            with open("/proc/self/statm") as fp:
+                return int(fp.read().split()[1]) * self._PAGE
+        except OSError:
+            # ru_maxrss is the lifetime peak (KiB on Linux), the best fallback available.
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, self._current())
+
+    def __enter__(self) -> "_PeakRSS":
+        self.peak = self._current()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._current())
+
+
+def upscale_dat(seed: PathLike, dest: PathLike, scale: int) -> Path:
+    """Write ``seed``'s ``houses`` array repeated ``scale`` times to ``dest``."""
+    first, close = array_bounds(seed)
+    with open(seed, "rb") as src, open(dest, "wb") as out:
+        out.write(b'{"houses": [')
+        for i in range(scale):
+            if i:
+                out.write(b", ")
+            src.seek(first)
+            _copy(src, out, close - first)
+        out.write(b"]}")
+    return Path(dest)
+
+
+def upscale_csv(seed: PathLike, dest: PathLike, scale: int) -> Path:
+    """Write ``seed``'s header once followed by its data rows repeated ``scale`` times."""
+    with open(seed, "rb") as src, open(dest, "wb") as out:
+        header = src.readline()
+        body_start, body_end = len(header), os.path.getsize(seed)
+        out.write(header)
+        for _ in range(scale):
+            src.seek(body_start)
+            _copy(src, out, body_end - body_start)
+    return Path(dest)
+
+
+def _copy(src, out, size: int) -> None:
+    while size > 0:
+        block = src.read(min(size, _COPY_BLOCK))
+        if not block:
+            break
+        out.write(block)
+        size -= len(block)
+
+
+def _timed(stage: str, scale: int, repeats: int, fn: Callable[[], Any], rows: Callable[[Any], int]) -> tuple[Result, Any]:
+    best, peak, value = float("inf"), 0, None
+    for _ in range(repeats):
+        value = None
+        with _PeakRSS() as rss:
+            start = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - start
+        best, peak = min(best, elapsed), max(peak, rss.peak)
+    return Result(stage, scale, rows(value), best, peak), value
+
+
+def _decode(dat: Path) -> tuple[ListingTable, float]:
+    """Decode ``dat`` batch by batch, returning the table and the time spent decoding only."""
+    parts, seconds = [], 0.0
+    for batch in batches(iter_houses(dat), BATCH_ROWS):
+        start = time.perf_counter()
+        parts.append(from_records(batch))
+        seconds += time.perf_counter() - start
+    return ListingTable.concat(parts), seconds
+
+
+def run_scale(dat: Path, csv: Path, scale: int, repeats: int, workdir: Path) -> list[Result]:
+    """Benchmark every stage on one pair of (already upscaled) inputs.
+
+    Each stage reports the rows it was given, not the rows it kept, so
+    throughput stays comparable across stages that drop rows.
+    """
+    results = []
+    parse, _ = _timed("parse", scale, repeats, lambda: sum(1 for _ in iter_houses(dat)), int)
+    results.append(parse)
+
+    decode, (_, decode_seconds) = _timed("decode", scale, 1, lambda: _decode(dat), lambda v: len(v[0]))
+    decode.seconds = decode_seconds
+    results.append(decode)
+
+    out = workdir / f"convert-{scale}.csv"
+    result, _ = _timed("convert", scale, repeats, lambda: convert(dat, out), lambda _: parse.rows)
+    results.append(result)
+    out.unlink(missing_ok=True)
+
+    result, csv_table = _timed("read_csv", scale, repeats, lambda: read_csv(csv), len)
+    results.append(result)
+
+    result, (repaired, _) = _timed(
+        "clean", scale, repeats, lambda: repair_sqft_living(csv_table), lambda _: len(csv_table)
+    )
+    results.append(result)
+
+    result, (clean, _) = _timed("quarantine", scale, repeats, lambda: quarantine(repaired), lambda _: len(repaired))
+    results.append(result)
+
+    result, X = _timed("features", scale, repeats, lambda: feature_matrix(clean), len)
+    results.append(result)
+    y = target(clean)
+
+    result, _ = _timed("ridge", scale, repeats, lambda: StreamingRidge().add(X, y).fit(), lambda _: len(X))
+    results.append(result)
+
+    result, model = _timed(
+        "train", scale, repeats, lambda: GradientBoostedTrees(n_trees=BENCH_TREES).fit(X, y), lambda _: len(X)
+    )
+    results.append(result)
+
+    forest = model.compile()
+    result, _ = _timed("predict", scale, repeats, lambda: forest.predict(X), len)
+    results.append(result)
+    return results
+
+
+def run(data_dir: PathLike, scales: tuple[int, ...], repeats: int, workdir: PathLike) -> list[Result]:
+    data_dir, workdir = Path(data_dir), Path(workdir)
+    results = []
+    for scale in scales:
+        dat, csv = data_dir / "data.dat", data_dir / "data.csv"
+        if scale != 1:
+            dat = upscale_dat(dat, workdir / f"data-x{scale}.dat", scale)
+            csv = upscale_csv(csv, workdir / f"data-x{scale}.csv", scale)
+        results.extend(run_scale(dat, csv, scale, repeats, workdir))
+        if scale != 1:
+            dat.unlink()
+            csv.unlink()
+    return results
+
+
+def _environment() -> dict[str, Any]:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m proppredict.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="directory holding data.dat and data.csv")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--large", action="store_true", help=f"also run the {LARGE_SCALE}x scale")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--output", default="bench_results.jsonl", help="JSON-lines file to append to")
+    parser.add_argument("--workdir", help="where upscaled inputs are written (default: a temp dir)")
+    args = parser.parse_args(argv)
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="proppredict-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        scales = tuple(args.scales) + ((LARGE_SCALE,) if args.large and LARGE_SCALE not in args.scales else ())
+        results = run(args.data_dir, scales, args.repeats, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    env = _environment()
+    with open(args.output, "a") as fp:
+        for result in results:
+            fp.write(json.dumps({**env, **result.as_dict()}) + "\n")
+    for r in results:
+        print(
+            f"{r.stage:>10} x{r.scale:<5} {r.rows:>10} rows {r.seconds:9.4f}s "
+            f"{r.rows_per_second:14,.0f} rows/s  peak {r.peak_rss_bytes / 2**20:8.1f} MiB",
+            file=sys.stdout,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Binary columnar cache of decoded listing tables.
+
+The first load of a source file decodes it and writes every column as a
+``.npy`` file (categorical columns as a codes file plus a categories file)
+into a directory named after the SHA-256 of the source contents.  Later loads
+memory-map those files read-only, so opening the table copies no column data;
+any edit to the source changes the digest and therefore misses the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from proppredict.categorical import Categorical
+from proppredict.table import ListingTable, PathLike, read_table
+
+CACHE_VERSION = 3
+CACHE_DIRNAME = ".proppredict_cache"
+MANIFEST = "manifest.json"
+
+
+def source_digest(path: PathLike) -> str:
+    """Hex SHA-256 of the file contents."""
+    with open(path, "rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def default_cache_dir(source: PathLike) -> Path:
+    """Cache directory used when none is given: next to the source file."""
+    return Path(source).resolve().parent / CACHE_DIRNAME
+
+
+def write_cache(table: ListingTable, directory: PathLike, source: str = "") -> Path:
+    """Write ``table`` to ``directory`` atomically and return the directory."""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=directory.name + ".", dir=directory.parent))
+    try:
+        columns = []
+        for name, col in table.columns.items():
+            if isinstance(col, Categorical):
+                np.save(tmp / f"{name}.codes.npy", col.codes)
+                np.save(tmp / f"{name}.categories.npy", col.categories)
+                columns.append({"name": name, "kind": "categorical"})
+            else:
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(col))
+                columns.append({"name": name, "kind": "array"})
+        manifest = {
+            "version": CACHE_VERSION,
+            "source": source,
+            "rows": len(table),
+            "columns": columns,
+            "invalid": {name: rows.tolist() for name, rows in table.invalid.items()},
+        }
+        (tmp / MANIFEST).write_text(json.dumps(manifest, indent=1))
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return directory
+
+
+def read_cache(directory: PathLike) -> ListingTable:
+    """Open a cache directory with every column memory-mapped read-only.
+
+    Raises:
+        FileNotFoundError: if the directory holds no manifest.
+        ValueError: if the manifest was written by another cache version.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST).read_text())
+    if manifest.get("version") != CACHE_VERSION:
+        raise ValueError(f"{directory}: cache version {manifest.get('version')!r} != {CACHE_VERSION}")
+    columns = {}
+    for entry in manifest["columns"]:
+        name = entry["name"]
+        if entry["kind"] == "categorical":
+            columns[name] = Categorical(
+                np.load(directory / f"{name}.codes.npy", mmap_mode="r"),
+                np.load(directory / f"{name}.categories.npy", mmap_mode="r"),
+            )
+        else:
+            columns[name] = np.load(directory / f"{name}.npy", mmap_mode="r")
+    invalid = {name: np.asarray(rows, dtype=np.int64) for name, rows in manifest["invalid"].items()}
+    return ListingTable(columns, invalid)
+
+
+def load_table(source: PathLike, cache_dir: PathLike | None = None, refresh: bool = False) -> ListingTable:
+    """Load ``source`` (``.dat`` or ``.csv``) through the binary cache.
+
+    On a miss the file is decoded, written to ``cache_dir/<sha256>`` and
+    earlier entries for the same source path are removed.  ``refresh`` forces
+    a rebuild.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(source)
+    entry = cache_dir / source_digest(source)
+    if not refresh:
+        try:
+            return read_cache(entry)
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+    origin = os.fspath(Path(source).resolve())
+    write_cache(read_table(source), entry, source=origin)
+    _prune(cache_dir, origin, keep=entry)
+    return read_cache(entry)
+
+
+def _prune(cache_dir: Path, origin: str, keep: Path) -> None:
+    """Delete stale cache entries built from ``origin``."""
+    for manifest in cache_dir.glob(f"*/{MANIFEST}"):
+        entry = manifest.parent
+        if entry == keep:
+            continue
+        try:
+            stale = json.loads(manifest.read_text()).get("source") == origin
+        except (OSError, ValueError):
+            continue
+        if stale:
+            shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,104 @@
+"""Dictionary-encoded string columns.
+
+Low-cardinality text columns such as ``city`` (a few dozen values) or
+``country`` (always ``"USA"``) are stored as small integer codes into a
+sorted array of distinct values, instead of one Python string per row.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from proppredict._bytescan import unique_bytes
+
+MISSING = -1
+
+
+def code_dtype(n_categories: int) -> np.dtype:
+    """Narrowest signed integer dtype able to hold ``n_categories`` codes plus :data:`MISSING`."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+@dataclass(frozen=True)
+class Categorical:
+    """A string column stored as ``categories[codes]``.
+
+    Attributes:
+        codes: per-row integer codes; :data:`MISSING` marks rows without a value.
+        categories: sorted array of the distinct values.
+    """
+
+    codes: np.ndarray
+    categories: np.ndarray
+
+    @classmethod
+    def encode(cls, values: Sequence[str] | np.ndarray, missing: np.ndarray | None = None) -> "Categorical":
+        """Dictionary-encode ``values``; rows set in ``missing`` get :data:`MISSING`."""
+        values = np.asarray(values)
+        if values.dtype.kind not in "SU":
+            values = values.astype(str)
+        present = values if missing is None else values[~missing]
+        if values.dtype.kind == "S":
+            categories, inverse = unique_bytes(present)
+            try:
+                categories = categories.astype(str)
+            except UnicodeDecodeError:
+                categories = np.char.decode(categories, "utf-8")
+        else:
+            categories, inverse = np.unique(present, return_inverse=True)
+        codes = np.full(len(values), MISSING, dtype=code_dtype(len(categories)))
+        if missing is None:
+            codes[:] = inverse
+        else:
+            codes[~missing] = inverse
+        return cls(codes, categories)
+
+    @classmethod
+    def concat(cls, parts: Sequence["Categorical"]) -> "Categorical":
+        """Concatenate columns with different dictionaries into one."""
+        if not parts:
+            return cls.encode([])
+        categories = np.unique(np.concatenate([p.categories for p in parts]))
+        codes = np.concatenate([p.recode(categories).codes for p in parts])
+        return cls(codes, categories)
+
+    def recode(self, categories: np.ndarray) -> "Categorical":
+        """Express this column in terms of ``categories``, a sorted superset of its own."""
+        dtype = code_dtype(len(categories))
+        if not len(self.categories):
+            return Categorical(np.full(len(self.codes), MISSING, dtype=dtype), categories)
+        lookup = np.searchsorted(categories, self.categories).astype(dtype)
+        codes = np.where(self.codes == MISSING, MISSING, lookup[np.maximum(self.codes, 0)])
+        return Categorical(codes.astype(dtype), categories)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            code = self.codes[index]
+            return None if code == MISSING else str(self.categories[code])
+        return Categorical(self.codes[index], self.categories)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.categories.nbytes
+
+    def code_of(self, value: str) -> int:
+        """Code for ``value``, or :data:`MISSING` if it is not a category."""
+        i = int(np.searchsorted(self.categories, value))
+        return i if i < len(self.categories) and self.categories[i] == value else MISSING
+
+    def decode(self) -> np.ndarray:
+        """Materialise the column as a numpy string array (missing rows are ``""``)."""
+        if not len(self.categories):
+            return np.full(len(self.codes), "", dtype="U1")
+        out = self.categories[np.maximum(self.codes, 0)]
+        return np.where(self.codes == MISSING, "", out)
+
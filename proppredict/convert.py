@@ -0,0 +1,133 @@
+"""Parallel ``.dat`` to ``.csv`` conversion.
+
+The ``houses`` array is cut into byte ranges of roughly ``chunk_bytes``.  Each
+worker snaps its range to whole records, decodes them through the columnar
+pipeline and renders CSV text; the parent writes the chunks back in range
+order, so the output is byte-identical to a single-process run.
+
+Record boundaries are found by searching for ``}, {``, the separator
+``json.dumps`` emits between array elements; a range that does not parse as
+whole records raises rather than producing shifted rows.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Iterator
+
+from proppredict._pool import ordered_map
+from proppredict.repair import Policy, RepairReport, repair_sqft_living
+from proppredict.table import CSV_HEADER, PathLike, from_records, to_csv_bytes
+
+CHUNK_BYTES = 8 << 20
+
+_SEP = b"}, {"
+_HEAD = re.compile(rb'\A\s*\{\s*"houses"\s*:\s*\[\s*')
+_TAIL = re.compile(rb"\]\s*\}\s*\Z")
+_PROBE = 4096
+
+
+def array_bounds(path: PathLike) -> tuple[int, int]:
+    """Offsets of the first byte inside the ``houses`` array and of its closing ``]``."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as fp:
+        head = _HEAD.match(fp.read(_PROBE))
+        fp.seek(max(size - _PROBE, 0))
+        tail_start = fp.tell()
+        tail = _TAIL.search(fp.read())
+    if head is None or tail is None:
+        raise ValueError(f"{os.fspath(path)}: not a {{\"houses\": [...]}} document")
+    return head.end(), tail_start + tail.start()
+
+
+def byte_ranges(first: int, close: int, chunk_bytes: int) -> Iterator[tuple[int, int]]:
+    """``[start, end)`` ranges of ``chunk_bytes`` covering ``[first, close)``."""
+    for start in range(first, close, chunk_bytes):
+        yield start, min(start + chunk_bytes, close)
+
+
+def _next_record(fp, pos: int, close: int) -> int:
+    """Offset of the first record starting at or after ``pos`` (``close`` if none)."""
+    fp.seek(max(pos - len(_SEP) + 1, 0))
+    base = fp.tell()
+    block = b""
+    while chunk := fp.read(_PROBE):
+        block += chunk
+        hit = block.find(_SEP)
+        while hit != -1:
+            brace = base + hit + len(_SEP) - 1
+            if brace >= pos:
+                return min(brace, close)
+            hit = block.find(_SEP, hit + 1)
+        if base + len(block) >= close:
+            break
+        # Keep a partial separator that may straddle the next read.
+        keep = len(_SEP) - 1
+        base += len(block) - keep
+        block = block[-keep:]
+    return close
+
+
+def range_records(path: PathLike, start: int, end: int, first: int, close: int) -> list[dict]:
+    """The records whose opening brace lies in ``[start, end)``."""
+    with open(path, "rb") as fp:
+        lo = first if start == first else _next_record(fp, start, close)
+        if lo >= end:
+            return []
+        hi = _next_record(fp, end, close)
+        fp.seek(lo)
+        payload = fp.read(hi - lo).rstrip()
+    # Unless this is the last record, ``hi`` is the next record's "{" so a ", " is left over.
+    if payload.endswith(b","):
+        payload = payload[:-1]
+    return json.loads(b"[" + payload + b"]")
+
+
+def _convert_range(
+    path: PathLike, start: int, end: int, first: int, close: int, repair: Policy | None
+) -> tuple[bytes, RepairReport | None]:
+    """Decode the records whose opening brace lies in ``[start, end)`` and render them as CSV rows.
+
+    The repair report, if any, indexes rows from the start of the range.
+    """
+    records = range_records(path, start, end, first, close)
+    if not records:
+        return b"", None
+    table, report = from_records(records), None
+    if repair is not None:
+        table, report = repair_sqft_living(table, repair)
+    return to_csv_bytes(table, header=False), report
+
+
+def convert(
+    source: PathLike,
+    destination: PathLike,
+    workers: int | None = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    repair: Policy | None = None,
+) -> tuple[int, RepairReport | None]:
+    """Convert a ``.dat`` document to ``data.csv`` format.
+
+    Returns the number of bytes written and, when ``repair`` is given, the
+    :class:`~proppredict.repair.RepairReport` of the whole document, with
+    rows numbered from its first record.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` converts in-process
+    through exactly the same chunking.  At most two chunks per worker are in
+    flight, so memory stays bounded by ``chunk_bytes`` rather than file size.
+    ``repair`` applies :func:`~proppredict.repair.repair_sqft_living` with
+    that policy to every chunk before it is written.
+    """
+    first, close = array_bounds(source)
+    args = [(source, start, end, first, close, repair) for start, end in byte_ranges(first, close, chunk_bytes)]
+    workers = workers or os.cpu_count() or 1
+    reports = []
+    with open(destination, "wb") as out:
+        written = out.write(CSV_HEADER)
+        for chunk, report in ordered_map(_convert_range, args, workers):
+            written += out.write(chunk)
+            if report is not None:
+                reports.append(report)
+    return written, None if repair is None else RepairReport.concat(repair, reports)
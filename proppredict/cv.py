@@ -0,0 +1,214 @@
+"""k-fold cross-validation of the price model over one shared copy of the data.
+
+:func:`cross_validate` builds the feature matrix and target of a
+:class:`~proppredict.table.ListingTable` once and copies them into shared
+memory together with a per-row fold number.  Each fold then runs in a
+worker process that maps those buffers, finds its training and held-out
+rows from the fold numbers, and gathers only those rows of the matrix and
+target for its model.  A fold is described by its number alone, so nothing
+row-sized is pickled, and memory stays at one shared copy plus each
+worker's training and held-out subsets of the matrix, whatever the number
+of folds.
+
+Models only see matrices, as ``fit(X, y)`` and ``predict(X)``.
+:class:`~proppredict.gbt.GradientBoostedTrees` works as it is, and
+:class:`RidgeModel` adapts :class:`~proppredict.linear.StreamingRidge`.
+
+Folds never share what a model could leak across them:
+
+* ``by="date"``: each fold is one contiguous range of sale dates, so a
+  fold is never scored by a model trained on the same days;
+* ``by="statezip"``: whole statezips are assigned to folds, largest
+  first to the currently smallest fold, so no area is on both sides.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Literal, Protocol, Sequence
+
+import numpy as np
+
+from proppredict._shared import SharedArrays, init_worker, local_arrays, worker_arrays
+from proppredict.features import FEATURES, feature_matrix, target
+from proppredict.gbt import GradientBoostedTrees
+from proppredict.linear import StreamingRidge
+from proppredict.table import ListingTable
+
+FoldBy = Literal["date", "statezip"]
+FOLD_BY: tuple[FoldBy, ...] = ("date", "statezip")
+K_FOLDS = 5
+
+
+class Model(Protocol):
+    def fit(self, X: np.ndarray, y: np.ndarray) -> Any: ...
+
+    def predict(self, X: np.ndarray) -> np.ndarray: ...
+
+
+class RidgeModel:
+    """:class:`~proppredict.linear.StreamingRidge` as a :class:`Model`; each ``fit`` starts from empty statistics."""
+
+    def __init__(self, features: Sequence[str] = FEATURES, alpha: float = 1.0) -> None:
+        self.ridge = StreamingRidge(features, alpha)
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "RidgeModel":
+        self.ridge = StreamingRidge(self.ridge.features, self.ridge.alpha).add(X, y).fit()
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.ridge.predict(X)
+
+
+# One process per fold already; the model itself stays in-process.
+DEFAULT_MODEL: Callable[[], Model] = partial(GradientBoostedTrees, workers=1)
+
+
+@dataclass(frozen=True)
+class FoldResult:
+    """Scores and timings of one held-out fold; errors are in price units."""
+
+    fold: int
+    train_rows: int
+    test_rows: int
+    rmse: float
+    mae: float
+    r2: float
+    fit_seconds: float
+    predict_seconds: float
+
+
+@dataclass(frozen=True)
+class CVReport:
+    """Result of :func:`cross_validate`.
+
+    Attributes:
+        by: how rows were split into folds.
+        folds: one result per fold, in fold order.
+        seconds: wall-clock time of the whole run, including the shared copy.
+    """
+
+    by: FoldBy
+    folds: tuple[FoldResult, ...]
+    seconds: float
+
+    def mean(self, metric: str) -> float:
+        """Mean of a :class:`FoldResult` field over the folds."""
+        return float(np.mean([getattr(fold, metric) for fold in self.folds]))
+
+    def __str__(self) -> str:
+        lines = [f"{'fold':>4} {'train':>8} {'test':>7} {'rmse':>11} {'mae':>11} {'r2':>7} {'fit s':>7} {'pred s':>7}"]
+        for f in self.folds:
+            lines.append(
+                f"{f.fold:>4} {f.train_rows:>8} {f.test_rows:>7} {f.rmse:>11.0f} {f.mae:>11.0f} "
+                f"{f.r2:>7.3f} {f.fit_seconds:>7.3f} {f.predict_seconds:>7.3f}"
+            )
+        lines.append(
+            f"{'mean':>4} {'':>8} {'':>7} {self.mean('rmse'):>11.0f} {self.mean('mae'):>11.0f} "
+            f"{self.mean('r2'):>7.3f} {self.mean('fit_seconds'):>7.3f} {self.mean('predict_seconds'):>7.3f}"
+        )
+        lines.append(f"{len(self.folds)} folds by {self.by} in {self.seconds:.2f}s")
+        return "\n".join(lines)
+
+
+def assign_folds(table: ListingTable, k: int = K_FOLDS, by: FoldBy = "date") -> np.ndarray:
+    """Fold number (``0..k-1``) of every row of ``table``.
+
+    Rows with the same date (``by="date"``) or statezip (``by="statezip"``)
+    always share a fold, so folds are only approximately equal in size.
+
+    Raises:
+        ValueError: for an unknown ``by``, or fewer than ``k`` distinct dates or statezips.
+    """
+    if by not in FOLD_BY:
+        raise ValueError(f"unknown fold split {by!r}; expected one of {FOLD_BY}")
+    if k < 2:
+        raise ValueError("need at least 2 folds")
+    if by == "date":
+        days, group = np.unique(np.asarray(table["date"]), return_inverse=True)
+        sizes = np.bincount(group, minlength=len(days))
+        if len(days) < k:
+            raise ValueError(f"cannot split {len(days)} distinct dates into {k} folds")
+        # Fold j ends on the first day reaching (j + 1) / k of the rows,
+        # moved if needed so that every fold keeps at least one day.
+        ends = np.cumsum(sizes)
+        last_days = np.searchsorted(ends, np.arange(1, k) * ends[-1] / k)
+        previous = -1
+        for j, day in enumerate(last_days.tolist()):
+            previous = last_days[j] = min(max(day, previous + 1), len(days) - k + j)
+        return np.searchsorted(last_days, np.arange(len(days))).astype(np.int32)[group]
+    codes = np.asarray(table["statezip"].codes).astype(np.intp)
+    # Missing statezips (code -1) form one more group of their own.
+    group = codes + 1
+    sizes = np.bincount(group)
+    present = np.flatnonzero(sizes)
+    if len(present) < k:
+        raise ValueError(f"cannot split {len(present)} distinct statezips into {k} folds")
+    fold_of_group = np.zeros(len(sizes), dtype=np.int32)
+    load = np.zeros(k, dtype=np.int64)
+    for g in present[np.argsort(-sizes[present], kind="stable")]:
+        fold = int(load.argmin())
+        fold_of_group[g] = fold
+        load[fold] += sizes[g]
+    return fold_of_group[group]
+
+
+def _run_fold(fold: int, model: Callable[[], Model]) -> FoldResult:
+    arrays = worker_arrays(__name__)
+    held_out = arrays["fold"] == fold
+    train, test = np.flatnonzero(~held_out), np.flatnonzero(held_out)
+    X, y = arrays["X"], arrays["y"]
+    start = time.perf_counter()
+    fitted = model()
+    fitted.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    predicted = np.asarray(fitted.predict(X[test]), dtype=np.float64)
+    predict_seconds = time.perf_counter() - start
+    actual = y[test]
+    error = predicted - actual
+    total = float(((actual - actual.mean()) ** 2).sum())
+    return FoldResult(
+        fold,
+        len(train),
+        len(test),
+        float(np.sqrt(np.mean(error**2))),
+        float(np.mean(np.abs(error))),
+        1 - float(error @ error) / total if total > 0 else 0.0,
+        fit_seconds,
+        predict_seconds,
+    )
+
+
+def cross_validate(
+    table: ListingTable,
+    k: int = K_FOLDS,
+    by: FoldBy = "date",
+    model: Callable[[], Model] = DEFAULT_MODEL,
+    workers: int | None = None,
+    features: Sequence[str] = FEATURES,
+) -> CVReport:
+    """Fit ``model()`` on all folds but one and score it on the held-out fold, ``k`` times.
+
+    ``model`` is a picklable factory for objects with ``fit(X, y)`` and
+    ``predict(X)`` over the ``features`` matrix, by default a
+    single-process :class:`~proppredict.gbt.GradientBoostedTrees`; use
+    :class:`RidgeModel` for the ridge model.  ``workers`` defaults to the
+    CPU count, capped at ``k``; ``workers=1`` runs the folds in-process
+    without a shared copy.
+    """
+    start = time.perf_counter()
+    arrays = {"X": feature_matrix(table, features), "y": target(table), "fold": assign_folds(table, k, by)}
+    workers = min(workers or os.cpu_count() or 1, k)
+    if workers == 1:
+        with local_arrays(__name__, arrays):
+            folds = [_run_fold(fold, model) for fold in range(k)]
+    else:
+        with SharedArrays(arrays) as shared:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(__name__, shared.specs)) as pool:
+                folds = list(pool.map(_run_fold, range(k), [model] * k))
+    return CVReport(by, tuple(folds), time.perf_counter() - start)
@@ -0,0 +1,318 @@
+"""Streaming cell-level diff between two ``data.csv``-format snapshots.
+
+Both files are read in blocks of whole lines.  Every cell of a block is
+hashed at once with :func:`~proppredict._bytescan.span_hashes` and the cell
+hashes are folded into one 64-bit hash per row, so no per-row Python
+objects are built for rows that are unchanged.
+
+Rows are then matched by content: a row whose hash also occurs on the other
+side, among the rows not yet matched, is unchanged wherever it moved.  Rows
+left unmatched for more than ``window`` rows behind the slower reader are
+resolved: an old and a new row with the same key (by default date and
+address) are reported as changed, cell by cell; the rest are deleted or
+inserted.  Memory is bounded by the block size plus the unmatched rows in
+the window, so snapshots of any size diff in one pass::
+
+    python -m proppredict.diff data/data.csv data/output.csv
+
+Line numbers count the header as line 1, like ``diff``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import sys
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import IO, Iterator, Literal, Sequence
+
+import numpy as np
+
+from proppredict._bytescan import HASH_PRIME, NEWLINE, find_each, mix64, span_hashes
+from proppredict.table import PathLike
+
+BLOCK_BYTES = 4 << 20
+WINDOW = 1 << 16
+DEFAULT_KEY = ("date", "street", "city", "statezip")
+
+_COMMA = ord(",")
+_CR = ord("\r")
+
+Kind = Literal["inserted", "deleted", "changed"]
+
+
+@dataclass(frozen=True)
+class Change:
+    """One difference: a whole inserted/deleted row, or one changed cell.
+
+    Attributes:
+        kind: ``"inserted"``, ``"deleted"`` or ``"changed"``.
+        old_line: line in the old snapshot (``None`` for inserts).
+        new_line: line in the new snapshot (``None`` for deletes).
+        column: changed column name (``None`` for whole rows).
+        old: old cell, or the deleted line.
+        new: new cell, or the inserted line.
+    """
+
+    kind: Kind
+    old_line: int | None
+    new_line: int | None
+    column: str | None = None
+    old: str | None = None
+    new: str | None = None
+
+    def __str__(self) -> str:
+        if self.kind == "changed":
+            return f"{self.old_line}->{self.new_line} {self.column}: {self.old!r} -> {self.new!r}"
+        if self.kind == "deleted":
+            return f"{self.old_line}d < {self.old}"
+        return f"{self.new_line}a > {self.new}"
+
+
+@dataclass
+class _Rows:
+    """Unmatched rows of one side: data-row index, row hash, key hash, cell hashes, and the
+    block id and byte span of each line so its text is only built if it is reported."""
+
+    index: np.ndarray
+    row: np.ndarray
+    key: np.ndarray
+    cells: np.ndarray
+    block: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+    @classmethod
+    def empty(cls, columns: int) -> "_Rows":
+        empty = np.empty(0, np.int64)
+        return cls(empty, empty.astype(np.uint64), empty.astype(np.uint64), np.empty((0, columns), np.uint64),
+                   empty, empty, empty)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def take(self, rows: np.ndarray) -> "_Rows":
+        return _Rows(*(getattr(self, f.name)[rows] for f in fields(self)))
+
+    def drop(self, rows: np.ndarray) -> "_Rows":
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        return self.take(keep)
+
+    def extend(self, other: "_Rows") -> "_Rows":
+        return _Rows(*(np.concatenate([getattr(self, f.name), getattr(other, f.name)]) for f in fields(self)))
+
+
+def _fold(hashes: np.ndarray) -> np.ndarray:
+    """Combine the columns of an ``(n, k)`` hash matrix into one hash per row."""
+    h = np.zeros(len(hashes), dtype=np.uint64)
+    for column in hashes.T:
+        h = (h ^ column) * HASH_PRIME
+    return mix64(h)
+
+
+def _split(line: bytes) -> list[str]:
+    return next(csv.reader([line.decode("utf-8")]))
+
+
+def _read_header(fp: IO[bytes]) -> tuple[str, ...]:
+    return tuple(_split(fp.readline().rstrip(b"\r\n")))
+
+
+def _blocks(fp: IO[bytes], block_bytes: int) -> Iterator[bytes]:
+    """Chunks of ``fp`` that end on a line boundary."""
+    tail = b""
+    while block := fp.read(block_bytes):
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        if not cut:
+            tail = block
+            continue
+        tail = block[cut:]
+        yield block[:cut]
+    if tail:
+        yield tail + b"\n"
+
+
+def _hash_block(block: bytes, columns: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cell hashes ``(rows, columns)`` of a block of lines, plus line starts and ends (without CR/LF)."""
+    buf = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(buf == NEWLINE)
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+    ends = ends - (buf[np.maximum(ends - 1, 0)] == _CR)
+    commas, ok = find_each(buf, starts, ends, _COMMA, columns - 1)
+    field_starts = np.concatenate([starts[:, None], commas + 1], axis=1)
+    field_ends = np.concatenate([commas, ends[:, None]], axis=1)
+    cells = np.empty((len(starts), columns), dtype=np.uint64)
+    for c in range(columns):
+        cells[:, c] = span_hashes(buf, field_starts[:, c], field_ends[:, c])
+    for i in np.flatnonzero(~ok):
+        # Quoted fields (or malformed lines): hash the parsed cells instead.
+        values = _split(block[starts[i]:ends[i]])
+        values += [""] * (columns - len(values))
+        cells[i] = _hash_cells(values[:columns])
+    return cells, starts, ends
+
+
+def _hash_cells(values: Sequence[str]) -> np.ndarray:
+    text = "\n".join(values).encode("utf-8")
+    buf = np.frombuffer(text, dtype=np.uint8)
+    ends = np.append(np.flatnonzero(buf == NEWLINE), len(buf)).astype(np.int64)
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+    return span_hashes(buf, starts, ends)
+
+
+def _pair(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pair equal hashes of ``a`` and ``b``: the k-th occurrence on one side with the k-th on the other."""
+    if not len(a) or not len(b):
+        return np.empty(0, np.intp), np.empty(0, np.intp)
+    ka, kb = _occurrence_keys(a), _occurrence_keys(b)
+    _, ia, ib = np.intersect1d(ka, kb, return_indices=True)
+    same = a[ia] == b[ib]
+    return ia[same], ib[same]
+
+
+def _occurrence_keys(h: np.ndarray) -> np.ndarray:
+    order = np.argsort(h, kind="stable")
+    ordered = h[order]
+    starts = np.flatnonzero(np.concatenate([[True], ordered[1:] != ordered[:-1]]))
+    occurrence = np.arange(len(h)) - np.repeat(starts, np.diff(np.append(starts, len(h))))
+    keys = np.empty_like(h)
+    keys[order] = mix64(ordered ^ (occurrence.astype(np.uint64) * HASH_PRIME))
+    return keys
+
+
+class SnapshotDiff:
+    """Differences between two ``data.csv``-format files, produced by iterating.
+
+    After iteration, :attr:`rows` holds the data-row counts of both files and
+    :attr:`counts` the number of changes of each kind (changed rows, not cells).
+    """
+
+    def __init__(
+        self,
+        old: PathLike,
+        new: PathLike,
+        key: Sequence[str] = DEFAULT_KEY,
+        window: int = WINDOW,
+        block_bytes: int = BLOCK_BYTES,
+    ) -> None:
+        self.old, self.new = old, new
+        self.key = tuple(key)
+        self.window = window
+        self.block_bytes = block_bytes
+        self.columns: tuple[str, ...] = ()
+        self.rows = (0, 0)
+        self.counts: Counter = Counter()
+
+    def __iter__(self) -> Iterator[Change]:
+        with open(self.old, "rb") as old, open(self.new, "rb") as new:
+            header = _read_header(old)
+            if _read_header(new) != header:
+                raise ValueError(f"{self.new}: header differs from {self.old}")
+            unknown = [name for name in self.key if name not in header]
+            if unknown:
+                raise KeyError(f"key columns {unknown!r} not in header")
+            self.columns = header
+            self.counts = Counter()
+            self._blocks: dict[int, bytes] = {}
+            block_ids = itertools.count()
+            key_columns = [header.index(name) for name in self.key]
+            readers = [_blocks(old, self.block_bytes), _blocks(new, self.block_bytes)]
+            pending = [_Rows.empty(len(header)), _Rows.empty(len(header))]
+            read = [0, 0]
+            done = [False, False]
+            while not all(done):
+                # Advance whichever side is behind so both stay within the window.
+                side = 0 if (read[0] <= read[1] and not done[0]) or done[1] else 1
+                block = next(readers[side], None)
+                if block is None:
+                    done[side] = True
+                else:
+                    block_id = next(block_ids)
+                    self._blocks[block_id] = block
+                    rows = self._rows(block, block_id, read[side], key_columns)
+                    read[side] += len(rows)
+                    pending = self._match(pending, side, rows)
+                horizon = min(read) - self.window if not all(done) else max(read) + 1
+                pending, changes = self._resolve(pending, horizon)
+                # Keep only the blocks that still hold the text of a pending row.
+                live = set(np.unique(np.concatenate([pending[0].block, pending[1].block])).tolist())
+                self._blocks = {i: b for i, b in self._blocks.items() if i in live}
+                yield from changes
+            self.rows = (read[0], read[1])
+
+    def _rows(self, block: bytes, block_id: int, first: int, key_columns: list[int]) -> _Rows:
+        cells, starts, ends = _hash_block(block, len(self.columns))
+        key = _fold(cells[:, key_columns]) if key_columns else np.zeros(len(cells), np.uint64)
+        index = first + np.arange(len(cells))
+        return _Rows(index, _fold(cells), key, cells, np.full(len(cells), block_id), starts, ends)
+
+    @staticmethod
+    def _match(pending: list[_Rows], side: int, rows: _Rows) -> list[_Rows]:
+        """Drop rows that pair with an unmatched row of the other side; keep the rest pending."""
+        other = pending[1 - side]
+        mine, theirs = _pair(rows.row, other.row)
+        out = list(pending)
+        out[1 - side] = other.drop(theirs)
+        out[side] = pending[side].extend(rows.drop(mine))
+        return out
+
+    def _line(self, rows: _Rows, i: int) -> bytes:
+        return self._blocks[int(rows.block[i])][int(rows.start[i]):int(rows.end[i])]
+
+    def _resolve(self, pending: list[_Rows], horizon: int) -> tuple[list[_Rows], list[Change]]:
+        old, new = pending
+        expired_old = old.index < horizon
+        expired_new = new.index < horizon
+        if not expired_old.any() and not expired_new.any():
+            return pending, []
+        # Pair expired rows with any unmatched row of the same key on the other side.
+        io, jn = _pair(old.key, new.key)
+        paired = expired_old[io] | expired_new[jn]
+        io, jn = io[paired], jn[paired]
+        changes: list[Change] = []
+        order = np.argsort(old.index[io], kind="stable")
+        for i, j in zip(io[order].tolist(), jn[order].tolist()):
+            differ = np.flatnonzero(old.cells[i] != new.cells[j])
+            before, after = _split(self._line(old, i)), _split(self._line(new, j))
+            for c in differ.tolist():
+                changes.append(
+                    Change("changed", old.index[i] + 2, new.index[j] + 2, self.columns[c], before[c], after[c])
+                )
+        self.counts["changed"] += len(io)
+        expired_old[io] = False
+        expired_new[jn] = False
+        for i in np.flatnonzero(expired_old).tolist():
+            changes.append(Change("deleted", old.index[i] + 2, None, old=self._line(old, i).decode("utf-8")))
+        for j in np.flatnonzero(expired_new).tolist():
+            changes.append(Change("inserted", None, new.index[j] + 2, new=self._line(new, j).decode("utf-8")))
+        self.counts["deleted"] += int(expired_old.sum())
+        self.counts["inserted"] += int(expired_new.sum())
+        drop_old = np.union1d(io, np.flatnonzero(expired_old))
+        drop_new = np.union1d(jn, np.flatnonzero(expired_new))
+        return [old.drop(drop_old), new.drop(drop_new)], changes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m proppredict.diff", description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--key", nargs="*", default=list(DEFAULT_KEY), help="columns identifying a listing")
+    parser.add_argument("--window", type=int, default=WINDOW, help="rows an unmatched row may wait for a match")
+    parser.add_argument("--summary", action="store_true", help="print only the counts")
+    args = parser.parse_args(argv)
+
+    diff = SnapshotDiff(args.old, args.new, args.key, args.window)
+    for change in diff:
+        if not args.summary:
+            print(change)
+    counts = ", ".join(f"{diff.counts[kind]} {kind}" for kind in ("inserted", "deleted", "changed"))
+    print(f"{diff.rows[0]} -> {diff.rows[1]} rows: {counts}", file=sys.stderr)
+    return 1 if sum(diff.counts.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
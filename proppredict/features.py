@@ -0,0 +1,38 @@
+"""Numeric feature matrices for the price models."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from proppredict.table import ListingTable
+
+FEATURES = (
+    "bedrooms",
+    "bathrooms",
+    "sqft_living",
+    "sqft_lot",
+    "floors",
+    "waterfront",
+    "view",
+    "condition",
+    "sqft_above",
+    "sqft_basement",
+    "yr_built",
+    "yr_renovated",
+)
+TARGET = "price"
+
+
+def feature_matrix(table: ListingTable, features: Sequence[str] = FEATURES, dtype: type = np.float64) -> np.ndarray:
+    """Stack ``features`` into a C-contiguous ``(rows, len(features))`` matrix."""
+    out = np.empty((len(table), len(features)), dtype=dtype)
+    for j, name in enumerate(features):
+        out[:, j] = table[name]
+    return out
+
+
+def target(table: ListingTable) -> np.ndarray:
+    """The ``price`` column as float64."""
+    return np.asarray(table[TARGET], dtype=np.float64)
@@ -0,0 +1,507 @@
+"""Gradient-boosted regression trees on histogram-binned features.
+
+Every feature is binned once, before training, into at most 256 buckets
+(:class:`BinMapper`): features with few distinct values get one bucket per
+value, the rest get quantile buckets.  Training then works on the
+``(rows, features)`` uint8 bin matrix only, about 40 bytes per row
+including the target, prediction, gradient and node arrays, so tens of
+millions of listings fit in memory.
+
+Trees are grown level by level.  A node's split is found from its
+histogram, the gradient sum and row count per (feature, bin), by one
+cumulative sum over the bins.  Only the smaller child of each split has
+its histogram built from rows; the larger child's is the parent's minus
+the smaller one's, so each level reads at most half of the rows.
+
+With ``workers > 1`` the bin matrix and per-row state live in shared
+memory and each process of a pool builds the histograms of one row shard;
+only the split decisions and the histograms cross process boundaries.
+The loss is squared error, so the gradient is ``prediction - price`` and
+each leaf's value is ``-sum(gradient) / (rows + l2)``, scaled by the
+learning rate.
+
+For prediction the trees are compiled into a :class:`CompiledForest` of
+flat node arrays and evaluated for a block of rows and every tree at once,
+one tree level per step, instead of walking :class:`Node` objects.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import repeat
+from typing import Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from proppredict._shared import SharedArrays, init_worker, local_arrays, worker_arrays
+from proppredict.features import FEATURES, feature_matrix, target
+from proppredict.table import ListingTable, PathLike
+
+MAX_BINS = 256
+# Rows sampled per feature to place quantile bin edges.
+BIN_SAMPLE = 200_000
+# Smallest row shard worth a worker process.
+MIN_SHARD_ROWS = 1 << 16
+# Rows per histogram block, bounding the temporary key arrays.
+_BLOCK_ROWS = 1 << 16
+# (rows, trees) node indices held at once during prediction; small enough
+# that the node matrix and its temporaries stay in cache between steps.
+BLOCK_ELEMENTS = 1 << 16
+# Histogram channels: gradient sum and row count.
+_GRAD, _COUNT = 0, 1
+
+
+@dataclass(frozen=True)
+class BinMapper:
+    """Per-feature bin edges.
+
+    A value ``x`` of feature ``j`` falls in bin ``b = #(edges[j] < x)``, so
+    bin ``b`` holds ``edges[j][b - 1] < x <= edges[j][b]`` and a split after
+    bin ``b`` sends ``x <= edges[j][b]`` left.
+    """
+
+    edges: tuple[np.ndarray, ...]
+
+    @classmethod
+    def fit(cls, X: np.ndarray, max_bins: int = MAX_BINS, sample: int = BIN_SAMPLE, seed: int = 0) -> "BinMapper":
+        if not 2 <= max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be in [2, {MAX_BINS}], got {max_bins}")
+        X = np.asarray(X)
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(X), sample, replace=False) if len(X) > sample else slice(None)
+        edges = []
+        for j in range(X.shape[1]):
+            values = np.asarray(X[rows, j], dtype=np.float64)
+            if np.isnan(values).any():
+                raise ValueError(f"feature {j} contains NaN")
+            distinct = np.unique(values)
+            if len(distinct) <= max_bins:
+                edges.append((distinct[:-1] + distinct[1:]) / 2)
+            else:
+                edges.append(np.unique(np.quantile(values, np.linspace(0, 1, max_bins + 1)[1:-1])))
+        return cls(tuple(edges))
+
+    @property
+    def n_bins(self) -> np.ndarray:
+        return np.array([len(e) + 1 for e in self.edges])
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """The ``(rows, features)`` uint8 bin matrix of ``X``."""
+        X = np.asarray(X)
+        out = np.empty((len(X), len(self.edges)), dtype=np.uint8)
+        for j, edges in enumerate(self.edges):
+            out[:, j] = np.searchsorted(edges, X[:, j], side="left")
+        return out
+
+    def threshold(self, feature: int, bin: int) -> float:
+        return float(self.edges[feature][bin])
+
+
+@dataclass(frozen=True)
+class Node:
+    """One tree node; leaves have ``feature == -1`` and children ``-1``.
+
+    Rows with ``x[feature] <= threshold`` (bin ``<= bin``) go to ``left``.
+    ``value`` is the learning-rate-scaled output of a leaf.
+    """
+
+    feature: int
+    threshold: float
+    bin: int
+    left: int
+    right: int
+    value: float
+    count: int
+    gain: float
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.feature < 0
+
+
+Tree = list[Node]
+
+
+@dataclass(frozen=True)
+class _Step:
+    """Work order for every row shard, applied in this order.
+
+    1. Rows in a node with ``split_feature[node] >= 0`` move to its left or
+       right child.
+    2. If ``values`` is set, the tree is finished: add ``values[node]`` to
+       each row's prediction, recompute gradients and put every row back at
+       the root.
+    3. If ``slot`` is set, return histograms for the nodes with
+       ``slot[node] >= 0``, shaped ``(slots, features, MAX_BINS, 2)``.
+    """
+
+    split_feature: np.ndarray | None = None
+    split_bin: np.ndarray | None = None
+    left: np.ndarray | None = None
+    right: np.ndarray | None = None
+    values: np.ndarray | None = None
+    slot: np.ndarray | None = None
+    slots: int = 0
+
+
+def _shard_step(lo: int, hi: int, step: _Step) -> np.ndarray | None:
+    arrays = worker_arrays(__name__)
+    bins, node = arrays["bins"][lo:hi], arrays["node"][lo:hi]
+    if step.split_feature is not None:
+        feature = step.split_feature[node]
+        rows = np.flatnonzero(feature >= 0)
+        parent = node[rows]
+        # Flat indexing into the contiguous shard is much cheaper than bins[rows, feature[rows]].
+        go_left = bins.reshape(-1)[rows * bins.shape[1] + feature[rows]] <= step.split_bin[parent]
+        node[rows] = np.where(go_left, step.left[parent], step.right[parent])
+    grad = arrays["grad"][lo:hi]
+    if step.values is not None:
+        pred = arrays["pred"][lo:hi]
+        pred += step.values[node]
+        np.subtract(pred, arrays["y"][lo:hi], out=grad)
+        node[:] = 0
+    if step.slot is None:
+        return None
+    features = bins.shape[1]
+    size = step.slots * MAX_BINS
+    hist = np.zeros((2, features, size))
+    for start in range(0, len(node), _BLOCK_ROWS):
+        slot = step.slot[node[start:start + _BLOCK_ROWS]]
+        rows = np.flatnonzero(slot >= 0)
+        if not len(rows):
+            continue
+        # One gather of the block's rows, then one bincount per feature and channel.
+        block = np.ascontiguousarray(bins[start + rows].T)
+        weights = grad[start + rows]
+        base = slot[rows] * MAX_BINS
+        for j in range(features):
+            keys = base + block[j]
+            hist[_GRAD, j] += np.bincount(keys, weights=weights, minlength=size)
+            hist[_COUNT, j] += np.bincount(keys, minlength=size)
+    return hist.reshape(2, features, step.slots, MAX_BINS).transpose(2, 1, 3, 0)
+
+
+def _shards(rows: int, workers: int) -> list[tuple[int, int]]:
+    bounds = np.linspace(0, rows, workers + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+class GradientBoostedTrees:
+    """Squared-error gradient boosting on histogram-binned features.
+
+    Attributes:
+        features: feature column names used when given a table.
+        trees: the fitted trees, each a list of :class:`Node` with the root first.
+        base: the initial prediction, the mean training price.
+        mapper: the :class:`BinMapper` fitted on the training data.
+    """
+
+    def __init__(
+        self,
+        n_trees: int = 200,
+        learning_rate: float = 0.1,
+        max_depth: int = 6,
+        min_samples_leaf: int = 20,
+        l2: float = 1.0,
+        max_bins: int = MAX_BINS,
+        workers: int | None = None,
+        features: Sequence[str] = FEATURES,
+    ) -> None:
+        if min_samples_leaf < 1:
+            raise ValueError("min_samples_leaf must be at least 1")
+        self.n_trees = n_trees
+        self.learning_rate = learning_rate
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.l2 = l2
+        self.max_bins = max_bins
+        self.workers = workers
+        self.features = tuple(features)
+        self.trees: list[Tree] = []
+        self.base = 0.0
+        self.mapper: BinMapper | None = None
+        self._compiled: CompiledForest | None = None
+
+    def fit(self, data: ListingTable | np.ndarray, y: np.ndarray | None = None) -> "GradientBoostedTrees":
+        """Fit on a table (features and price taken from it) or on a matrix and target."""
+        X, y = (feature_matrix(data, self.features), target(data)) if isinstance(data, ListingTable) else (data, y)
+        mapper = BinMapper.fit(X, self.max_bins)
+        return self.fit_binned(mapper.transform(X), np.asarray(y, dtype=np.float64), mapper)
+
+    def fit_binned(self, bins: np.ndarray, y: np.ndarray, mapper: BinMapper) -> "GradientBoostedTrees":
+        """Fit on an already binned matrix, so several models can share one binning pass."""
+        if bins.dtype != np.uint8 or bins.ndim != 2 or len(bins) != len(y):
+            raise ValueError("expected a (rows, features) uint8 bin matrix aligned with y")
+        if not len(y):
+            raise ValueError("no rows to fit")
+        self.mapper, self.base, self.trees, self._compiled = mapper, float(np.mean(y)), [], None
+        arrays = {
+            "bins": np.ascontiguousarray(bins),
+            "y": y,
+            "pred": np.full(len(y), self.base),
+            "grad": np.zeros(len(y)),
+            "node": np.zeros(len(y), dtype=np.int32),
+        }
+        workers = min(self.workers or os.cpu_count() or 1, -(-len(y) // MIN_SHARD_ROWS))
+        shards = _shards(len(y), workers)
+        if workers == 1:
+            with local_arrays(__name__, arrays):
+                self._boost(lambda step: _combine([_shard_step(lo, hi, step) for lo, hi in shards]))
+            return self
+        his, los = [hi for _, hi in shards], [lo for lo, _ in shards]
+        with SharedArrays(arrays) as shared:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(__name__, shared.specs)) as pool:
+                self._boost(lambda step: _combine(list(pool.map(_shard_step, los, his, repeat(step)))))
+        return self
+
+    def _boost(self, run: Callable[[_Step], np.ndarray | None]) -> None:
+        # The first step only computes gradients around the base prediction.
+        finish = _Step(values=np.zeros(1))
+        for _ in range(self.n_trees):
+            tree, finish = self._grow(run, finish)
+            self.trees.append(tree)
+
+    def _grow(self, run: Callable[[_Step], np.ndarray | None], finish: _Step) -> tuple[Tree, _Step]:
+        """Grow one tree.
+
+        ``finish`` completes the previous tree (its last splits and leaf
+        values) and is sent together with the new root's histogram request;
+        the step that completes this tree is returned the same way.
+        """
+        root = replace(finish, slot=np.zeros(len(finish.values), dtype=np.intp), slots=1)
+        hists = {0: run(root)[0]}
+        # Per node: [feature, bin, left, right, grad sum, count, gain].
+        nodes = [[-1, 0, -1, -1, *self._totals(hists[0]), 0.0]]
+        level = [0]
+        last: dict[str, np.ndarray] = {}
+        for depth in range(self.max_depth):
+            best = self._best_splits(np.stack([hists[n] for n in level]))
+            splitting = [(n, *split) for n, split in zip(level, best) if split is not None]
+            if not splitting:
+                break
+            count = len(nodes) + 2 * len(splitting)
+            step = {k: np.full(count, -1, dtype=np.intp) for k in ("split_feature", "split_bin", "left", "right", "slot")}
+            children, small = [], []
+            for n, feature, bin, gain, left_totals, right_totals in splitting:
+                left, right = len(nodes), len(nodes) + 1
+                nodes[n][:4], nodes[n][6] = [feature, bin, left, right], gain
+                nodes.append([-1, 0, -1, -1, *left_totals, 0.0])
+                nodes.append([-1, 0, -1, -1, *right_totals, 0.0])
+                step["split_feature"][n], step["split_bin"][n] = feature, bin
+                step["left"][n], step["right"][n] = left, right
+                children += [(n, left, right)]
+                small.append(left if left_totals[1] <= right_totals[1] else right)
+            if depth == self.max_depth - 1:
+                # Children of the last level are leaves: no histograms needed.
+                last = {k: v for k, v in step.items() if k != "slot"}
+                break
+            step["slot"][small] = np.arange(len(small))
+            small_hists = run(_Step(**step, slots=len(small)))
+            level = []
+            for (parent, left, right), s, hist in zip(children, small, small_hists):
+                large = right if s == left else left
+                hists[s], hists[large] = hist, hists[parent] - hist
+                level += [left, right]
+            for parent, _, _ in children:
+                del hists[parent]
+
+        values = np.zeros(len(nodes))
+        tree = []
+        for i, (feature, bin, left, right, grad, count, gain) in enumerate(nodes):
+            value = -self.learning_rate * grad / (count + self.l2)
+            if feature < 0:
+                values[i] = value
+            threshold = self.mapper.threshold(feature, bin) if feature >= 0 else 0.0
+            tree.append(Node(int(feature), threshold, int(bin), int(left), int(right), float(value), int(count), float(gain)))
+        return tree, _Step(**last, values=values)
+
+    @staticmethod
+    def _totals(hist: np.ndarray) -> tuple[float, float]:
+        """Gradient sum and row count of a node, read off its first feature's histogram."""
+        return float(hist[0, :, _GRAD].sum()), float(hist[0, :, _COUNT].sum())
+
+    def _best_splits(self, hists: np.ndarray) -> list[tuple | None]:
+        """Best ``(feature, bin, gain, left_totals, right_totals)`` per node of ``(nodes, features, bins, 2)``."""
+        grad_left = np.cumsum(hists[..., _GRAD], axis=-1)
+        count_left = np.cumsum(hists[..., _COUNT], axis=-1)
+        grad = grad_left[:, :1, -1:]
+        count = count_left[:, :1, -1:]
+        grad_right, count_right = grad - grad_left, count - count_left
+        l2 = self.l2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain = grad_left**2 / (count_left + l2) + grad_right**2 / (count_right + l2) - grad**2 / (count + l2)
+        valid = (count_left >= self.min_samples_leaf) & (count_right >= self.min_samples_leaf)
+        gain = np.where(valid, gain, -np.inf).reshape(len(hists), -1)
+        best = gain.argmax(axis=1)
+        out = []
+        for i, flat in enumerate(best.tolist()):
+            if not gain[i, flat] > 0:
+                out.append(None)
+                continue
+            feature, bin = divmod(flat, MAX_BINS)
+            left = (float(grad_left[i, feature, bin]), float(count_left[i, feature, bin]))
+            right = (float(grad_right[i, feature, bin]), float(count_right[i, feature, bin]))
+            out.append((feature, bin, float(gain[i, flat]), left, right))
+        return out
+
+    def compile(self) -> "CompiledForest":
+        """The fitted trees as a :class:`CompiledForest`, built once per fit."""
+        if self._compiled is None:
+            self._compiled = CompiledForest.compile(self)
+        return self._compiled
+
+    def predict(self, data: ListingTable | np.ndarray) -> np.ndarray:
+        """Predicted price for a table or a ``(rows, len(features))`` matrix."""
+        return self.compile().predict(data)
+
+
+@dataclass(frozen=True)
+class CompiledForest:
+    """A tree ensemble flattened into contiguous node arrays.
+
+    Node ``i`` of the forest sends a row to ``left[i]`` if
+    ``x[feature[i]] <= threshold[i]`` and to ``right[i]`` otherwise; tree
+    ``t`` starts at ``roots[t]``.  Children are laid out in pairs, so
+    ``right == left + 1`` for every split, and a leaf points to itself with
+    an infinite threshold, so descending from a leaf is a no-op.  Prediction
+    therefore needs no branching: all rows and all trees take ``depth``
+    steps of ``node = left[node] + (x > threshold[node])``, four gathers
+    per step over a ``(rows, trees)`` block.
+
+    Attributes:
+        feature, threshold, left, right, value: per-node arrays; ``value``
+            is zero except at leaves.
+        roots: root node of each tree.
+        depth: depth of the deepest tree.
+        base: constant added to every prediction.
+        features: feature column names used when given a table.
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    depth: int
+    base: float
+    features: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, model: GradientBoostedTrees) -> "CompiledForest":
+        """Flatten ``model.trees`` in breadth-first order."""
+        feature, threshold, left, value, roots = [], [], [], [], []
+        depth = 0
+        for tree in model.trees:
+            root = len(feature)
+            roots.append(root)
+            # Breadth-first order with both children of a split queued together keeps them adjacent.
+            order, levels, position = [0], {0: 0}, {}
+            for i in order:
+                position[i] = root + len(position)
+                node = tree[i]
+                if not node.is_leaf:
+                    order += [node.left, node.right]
+                    levels[node.left] = levels[node.right] = levels[i] + 1
+            depth = max(depth, max(levels.values()))
+            for i in order:
+                node = tree[i]
+                if node.is_leaf:
+                    feature.append(0)
+                    threshold.append(np.inf)
+                    left.append(position[i])
+                    value.append(node.value)
+                else:
+                    feature.append(node.feature)
+                    threshold.append(node.threshold)
+                    left.append(position[node.left])
+                    value.append(0.0)
+        left_array = np.array(left, dtype=np.intp)
+        leaf = np.isinf(np.array(threshold))
+        return cls(
+            np.array(feature, dtype=np.intp),
+            np.array(threshold, dtype=np.float64),
+            left_array,
+            np.where(leaf, left_array, left_array + 1),
+            np.array(value, dtype=np.float64),
+            np.array(roots, dtype=np.intp),
+            depth,
+            model.base,
+            model.features,
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, data: ListingTable | np.ndarray, block_elements: int = BLOCK_ELEMENTS) -> np.ndarray:
+        """Predicted price for a table or a ``(rows, len(features))`` matrix.
+
+        Rows are processed in blocks of ``block_elements // n_trees`` so the
+        ``(rows, trees)`` node matrix stays bounded whatever the input size.
+        """
+        X = feature_matrix(data, self.features) if isinstance(data, ListingTable) else np.asarray(data, np.float64)
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        out = np.empty(len(X))
+        step = max(block_elements // max(self.n_trees, 1), 1)
+        for start in range(0, len(X), step):
+            out[start:start + step] = self._predict_block(X[start:start + step])
+        return out
+
+    def predict_chunks(self, chunks: Iterable[ListingTable | np.ndarray]) -> Iterator[np.ndarray]:
+        """Predictions for each chunk of a stream, e.g. :meth:`RowGroupFile.iter_groups`.
+
+        Memory is bounded by the largest chunk, so inputs of any length can
+        be scored.
+        """
+        for chunk in chunks:
+            yield self.predict(chunk)
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        rows, width = X.shape
+        flat = X.reshape(-1)
+        offsets = (np.arange(rows) * width)[:, None]
+        node = np.broadcast_to(self.roots, (rows, self.n_trees)).copy()
+        for _ in range(self.depth):
+            x = flat.take(offsets + self.feature.take(node))
+            node = self.left.take(node) + (x > self.threshold.take(node))
+        return self.base + self.value.take(node).sum(axis=1)
+
+    def save(self, path: PathLike) -> None:
+        """Write to an ``.npz`` file, replacing it atomically."""
+        path = os.fspath(path)
+        tmp = path + ".tmp.npz"
+        try:
+            np.savez(
+                tmp,
+                **{name: getattr(self, name) for name in _FOREST_ARRAYS},
+                depth=self.depth,
+                base=self.base,
+                features=np.array(self.features),
+            )
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: PathLike) -> "CompiledForest":
+        with np.load(os.fspath(path)) as saved:
+            arrays = {name: saved[name] for name in _FOREST_ARRAYS}
+            return cls(**arrays, depth=int(saved["depth"]), base=float(saved["base"]), features=tuple(saved["features"].tolist()))
+
+
+_FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+def _combine(parts: list[np.ndarray | None]) -> np.ndarray | None:
+    """Sum the per-shard histograms."""
+    if parts[0] is None:
+        return None
+    total = parts[0].copy()
+    for part in parts[1:]:
+        total += part
+    return total
@@ -0,0 +1,139 @@
+"""Record-style access to single listings without per-row dicts.
+
+A decoded ``.dat`` house is a nested dict, an ``area`` sub-dict plus one
+string per field, which costs kilobytes per listing.  :class:`House` is a
+two-slot view, a table reference and a row number, whose attributes read
+the :class:`~proppredict.table.ListingTable` column arrays directly::
+
+    houses = Houses(read_csv("data/data.csv"))
+    house = houses[0]
+    house.price, house.sqft_living, house.city   # 313000.0, 1340, 'Shoreline'
+
+:class:`Houses` is a sequence over a table (optionally a subset of its
+rows) that creates ``House`` views on demand, so holding millions of
+listings costs the column arrays plus at most eight bytes per row for the
+row selection.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterator, Sequence, overload
+
+import numpy as np
+
+from proppredict.categorical import Categorical
+from proppredict.table import COLUMNS, ListingTable
+
+
+class House:
+    """One row of a :class:`~proppredict.table.ListingTable`.
+
+    Every column of :data:`~proppredict.table.COLUMNS` is an attribute that
+    reads ``table[column][row]`` as a Python value: ``float``/``int`` for
+    numeric columns, ``str`` (``None`` if missing) for text columns and
+    :class:`numpy.datetime64` for ``date``.  Values are not copied, so a
+    view reflects the table it was taken from.
+    """
+
+    __slots__ = ("table", "row")
+
+    # Column attributes are installed below, one property per name in COLUMNS.
+    date: np.datetime64
+    price: float
+    bedrooms: int
+    bathrooms: float
+    sqft_living: int
+    sqft_lot: int
+    floors: float
+    waterfront: int
+    view: int
+    condition: int
+    sqft_above: int
+    sqft_basement: int
+    yr_built: int
+    yr_renovated: int
+    street: str | None
+    city: str | None
+    statezip: str | None
+    country: str | None
+
+    def __init__(self, table: ListingTable, row: int) -> None:
+        self.table = table
+        self.row = row
+
+    def as_dict(self) -> dict[str, Any]:
+        """The row as a flat ``{column: value}`` dict, in table column order."""
+        return {name: getattr(self, name) for name in self.table.names}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, House):
+            return NotImplemented
+        return self.table is other.table and self.row == other.row
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.row))
+
+    def __repr__(self) -> str:
+        address = ", ".join(str(getattr(self, n)) for n in ("street", "city", "statezip") if n in self.table)
+        return f"House(row={self.row}, {address!r})" if address else f"House(row={self.row})"
+
+
+def _column_property(name: str) -> property:
+    def get(self: House) -> Any:
+        try:
+            column = self.table.columns[name]
+        except KeyError:
+            raise AttributeError(f"column {name!r} is not in this table") from None
+        if isinstance(column, Categorical):
+            return column[self.row]
+        value = column[self.row]
+        return value if column.dtype.kind == "M" else value.item()
+
+    get.__name__ = name
+    return property(get, doc=f"``{name}`` of this row.")
+
+
+for _name in COLUMNS:
+    setattr(House, _name, _column_property(_name))
+del _name
+
+
+class Houses(Sequence[House]):
+    """A sequence of :class:`House` views over ``table``, or over ``rows`` of it."""
+
+    __slots__ = ("table", "rows")
+
+    def __init__(self, table: ListingTable, rows: np.ndarray | None = None) -> None:
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.table) if self.rows is None else len(self.rows)
+
+    @overload
+    def __getitem__(self, index: int) -> House: ...
+
+    @overload
+    def __getitem__(self, index: slice | np.ndarray) -> "Houses": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            n = len(self)
+            if not -n <= index < n:
+                raise IndexError(f"house index {index} out of range for {n} rows")
+            index = int(index) % n
+            return House(self.table, index if self.rows is None else int(self.rows[index]))
+        rows = np.arange(len(self.table)) if self.rows is None else self.rows
+        if isinstance(index, slice):
+            return Houses(self.table, rows[index])
+        selected = np.asarray(index)
+        return Houses(self.table, rows[np.flatnonzero(selected) if selected.dtype == bool else selected])
+
+    def __iter__(self) -> Iterator[House]:
+        table = self.table
+        rows = range(len(table)) if self.rows is None else self.rows.tolist()
+        return (House(table, row) for row in rows)
+
+    def materialize(self) -> ListingTable:
+        """The selected rows as a standalone table."""
+        return self.table if self.rows is None else self.table.take(self.rows)
@@ -0,0 +1,303 @@
+"""Append-only ingestion of a growing ``.dat`` document.
+
+New listings are added to the end of the ``houses`` array.  An
+:class:`IngestStore` records a high-water mark, the byte offset just past
+the last record it has consumed, and on every run decodes only the records
+after it.  Each run writes one immutable segment containing the new rows as
+a binary cache (see :mod:`proppredict.cache`) plus their feature matrix
+and ridge statistics (see :mod:`proppredict.linear`), folds the rows into
+small running aggregates, and optionally appends the
+rows to a ``data.csv``-format export.  The work done is proportional to the
+new data; nothing already ingested is re-read.
+
+Store layout::
+
+    state.json         high-water mark, segment list, CSV length
+    aggregates.json    running count/sum per statezip and per day
+    segments/000000/   write_cache() output for one run, plus features.npy
+                       and ridge.npz
+
+``state.json`` is replaced atomically after a segment is complete, so an
+interrupted run leaves the previous state intact; its orphaned segment is
+removed and the CSV export truncated back to the recorded length on the
+next run.  A source whose already-ingested bytes changed (detected from a
+digest of the bytes just before the mark) is rejected rather than
+silently double-counted::
+
+    python -m proppredict.ingest data/data.dat store/ --csv store/listings.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from proppredict.cache import read_cache, write_cache
+from proppredict.convert import CHUNK_BYTES, array_bounds, byte_ranges, range_records
+from proppredict.features import FEATURES, feature_matrix, target
+from proppredict.linear import StreamingRidge
+from proppredict.table import CSV_HEADER, ListingTable, PathLike, from_records, to_csv_bytes
+
+STATE = "state.json"
+AGGREGATES = "aggregates.json"
+SEGMENTS = "segments"
+FEATURES_FILE = "features.npy"
+MODEL_FILE = "ridge.npz"
+STATE_VERSION = 1
+AGGREGATE_KEYS = ("statezip", "day")
+
+# Bytes before the mark that must be unchanged for an append to be accepted.
+_FINGERPRINT_BYTES = 4096
+# Per-group running sums: count, price, sqft_living.
+_SUMS = ("count", "price_sum", "sqft_living_sum")
+
+
+@dataclass
+class HighWaterMark:
+    """How far a source has been ingested.
+
+    Attributes:
+        source: resolved path of the ``.dat`` file.
+        offset: byte offset just past the last ingested record.
+        fingerprint: SHA-256 of the bytes in ``[offset - 4096, offset)``.
+        rows: records ingested so far.
+        segments: segment directory names, oldest first.
+        csv_bytes: length of the CSV export after the last run (0 if none).
+    """
+
+    source: str = ""
+    offset: int = 0
+    fingerprint: str = ""
+    rows: int = 0
+    segments: list[str] = field(default_factory=list)
+    csv_bytes: int = 0
+
+
+@dataclass(frozen=True)
+class IngestReport:
+    rows: int
+    bytes_read: int
+    seconds: float
+    segment: str | None
+
+    def __str__(self) -> str:
+        where = f"segment {self.segment}" if self.segment else "nothing new"
+        return f"ingested {self.rows} rows ({self.bytes_read} bytes) in {self.seconds:.3f}s: {where}"
+
+
+def _fingerprint(path: PathLike, offset: int) -> str:
+    with open(path, "rb") as fp:
+        fp.seek(max(offset - _FINGERPRINT_BYTES, 0))
+        return hashlib.sha256(fp.read(min(offset, _FINGERPRINT_BYTES))).hexdigest()
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1))
+    os.replace(tmp, path)
+
+
+def _decoded(table: ListingTable) -> np.ndarray:
+    """Mask of the rows that decoded cleanly."""
+    good = np.ones(len(table), dtype=bool)
+    for rows in table.invalid.values():
+        good[rows] = False
+    return good
+
+
+def _group_sums(table: ListingTable) -> dict[str, dict[str, list[float]]]:
+    """Per-statezip and per-day sums over the rows that decoded cleanly."""
+    good = _decoded(table)
+    keys = {
+        "statezip": table["statezip"].decode()[good],
+        "day": np.datetime_as_string(np.asarray(table["date"])[good], unit="D"),
+    }
+    values = np.column_stack(
+        [np.ones(good.sum()), np.asarray(table["price"])[good], np.asarray(table["sqft_living"], np.float64)[good]]
+    )
+    out: dict[str, dict[str, list[float]]] = {}
+    for by, key in keys.items():
+        uniques, inverse = np.unique(key, return_inverse=True)
+        sums = np.zeros((len(uniques), len(_SUMS)))
+        np.add.at(sums, inverse.reshape(-1), values)
+        out[by] = {str(k): row for k, row in zip(uniques.tolist(), sums.tolist())}
+    return out
+
+
+class IngestStore:
+    """A directory of ingested listings for one ``.dat`` source."""
+
+    def __init__(self, directory: PathLike) -> None:
+        self.directory = Path(directory)
+
+    @property
+    def state(self) -> HighWaterMark:
+        path = self.directory / STATE
+        if not path.exists():
+            return HighWaterMark()
+        payload = json.loads(path.read_text())
+        if payload.pop("version", None) != STATE_VERSION:
+            raise ValueError(f"{path}: unsupported state version")
+        return HighWaterMark(**payload)
+
+    def _save(self, state: HighWaterMark, aggregates: dict[str, Any]) -> None:
+        # state.json is the commit point; aggregates.json names the segments it
+        # covers, so a crash between the two writes is detected and rebuilt.
+        _write_json(self.directory / AGGREGATES, {"segments": state.segments, "groups": aggregates})
+        _write_json(self.directory / STATE, {"version": STATE_VERSION, **asdict(state)})
+
+    def _aggregates(self, state: HighWaterMark) -> dict[str, dict[str, list[float]]]:
+        path = self.directory / AGGREGATES
+        if path.exists():
+            payload = json.loads(path.read_text())
+            if payload["segments"] == state.segments:
+                return payload["groups"]
+        # Missing or ahead of the committed state: rebuild from the segments.
+        groups: dict[str, dict[str, list[float]]] = {by: {} for by in AGGREGATE_KEYS}
+        for segment in state.segments:
+            _merge(groups, _group_sums(read_cache(self.directory / SEGMENTS / segment)))
+        return groups
+
+    def _discard_orphans(self, state: HighWaterMark) -> None:
+        segments = self.directory / SEGMENTS
+        if segments.exists():
+            for entry in segments.iterdir():
+                if entry.name not in state.segments:
+                    shutil.rmtree(entry, ignore_errors=True)
+
+    def ingest(
+        self, source: PathLike, csv_output: PathLike | None = None, chunk_bytes: int = CHUNK_BYTES
+    ) -> IngestReport:
+        """Decode the records appended to ``source`` since the last run.
+
+        ``csv_output``, if given, receives the new rows in ``data.csv``
+        format; the first run (re)writes it from the header on, so pass it
+        on every run.
+
+        Raises:
+            ValueError: if ``source`` is not the file this store was built
+                from, or its already-ingested bytes have changed.
+        """
+        started = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self.state
+        origin = os.fspath(Path(source).resolve())
+        if state.source and state.source != origin:
+            raise ValueError(f"{self.directory}: store was built from {state.source}, not {origin}")
+        first, close = array_bounds(source)
+        if state.offset:
+            if close < state.offset or _fingerprint(source, state.offset) != state.fingerprint:
+                raise ValueError(f"{origin}: ingested records changed; rebuild the store from scratch")
+        self._discard_orphans(state)
+
+        start = max(state.offset, first)
+        parts = [
+            from_records(records)
+            for lo, hi in byte_ranges(start, close, chunk_bytes)
+            if (records := range_records(source, lo, hi, first, close))
+        ]
+        table = ListingTable.concat(parts)
+        segment = None
+        aggregates = self._aggregates(state)
+        if len(table):
+            segment = f"{len(state.segments):06d}"
+            path = write_cache(table, self.directory / SEGMENTS / segment, source=origin)
+            features = feature_matrix(table)
+            np.save(path / FEATURES_FILE, features)
+            _segment_model(table, features).save(path / MODEL_FILE)
+            _merge(aggregates, _group_sums(table))
+            state.segments.append(segment)
+        if csv_output is not None:
+            state.csv_bytes = _append_csv(csv_output, state.csv_bytes, table)
+        state.source, state.offset, state.rows = origin, close, state.rows + len(table)
+        state.fingerprint = _fingerprint(source, close)
+        self._save(state, aggregates)
+        return IngestReport(len(table), close - start, time.perf_counter() - started, segment)
+
+    def table(self) -> ListingTable:
+        """Every ingested row, oldest first; segment columns are memory-mapped and concatenated."""
+        return ListingTable.concat([read_cache(self.directory / SEGMENTS / s) for s in self.state.segments])
+
+    def features(self) -> np.ndarray:
+        """The ``(rows, len(FEATURES))`` feature matrix aligned with :meth:`table`."""
+        parts = [np.load(self.directory / SEGMENTS / s / FEATURES_FILE) for s in self.state.segments]
+        return np.concatenate(parts) if parts else np.empty((0, len(FEATURES)))
+
+    def model(self, alpha: float = 1.0) -> StreamingRidge:
+        """Ridge model over every cleanly decoded row, merged from the per-segment statistics.
+
+        Nothing but the d x d statistics of each segment is read, so a refit
+        after an ingest costs one small solve.
+        """
+        model = StreamingRidge(alpha=alpha)
+        for segment in self.state.segments:
+            path = self.directory / SEGMENTS / segment
+            if (path / MODEL_FILE).exists():
+                model.merge(StreamingRidge.load(path / MODEL_FILE))
+            else:
+                model.merge(_segment_model(read_cache(path), np.load(path / FEATURES_FILE)))
+        return model.fit() if model.rows else model
+
+    def aggregate(self, by: str = "statezip") -> ListingTable:
+        """Running count, price and sqft_living totals and mean price per ``by`` (``statezip`` or ``day``)."""
+        if by not in AGGREGATE_KEYS:
+            raise ValueError(f"unknown aggregate {by!r}; expected one of {AGGREGATE_KEYS}")
+        groups = self._aggregates(self.state)[by]
+        keys = sorted(groups)
+        sums = np.array([groups[k] for k in keys], dtype=np.float64).reshape(len(keys), len(_SUMS))
+        columns: dict[str, Any] = {by: np.array(keys, dtype="datetime64[D]" if by == "day" else str)}
+        for j, name in enumerate(_SUMS):
+            columns[name] = sums[:, j].astype(np.int64) if name == "count" else sums[:, j]
+        columns["price_mean"] = sums[:, 1] / np.maximum(sums[:, 0], 1)
+        return ListingTable(columns)
+
+
+def _segment_model(table: ListingTable, features: np.ndarray) -> StreamingRidge:
+    good = _decoded(table)
+    return StreamingRidge().add(features[good], target(table)[good])
+
+
+def _merge(into: dict[str, dict[str, list[float]]], sums: dict[str, dict[str, list[float]]]) -> None:
+    for by, groups in sums.items():
+        target = into.setdefault(by, {})
+        for key, row in groups.items():
+            current = target.get(key)
+            target[key] = row if current is None else [a + b for a, b in zip(current, row)]
+
+
+def _append_csv(path: PathLike, committed: int, table: ListingTable) -> int:
+    """Append ``table`` to the export after cutting it back to ``committed`` bytes; returns the new length."""
+    with open(path, "ab+") as out:
+        if out.tell() < committed:
+            raise ValueError(f"{os.fspath(path)}: shorter than the {committed} bytes already exported")
+        out.truncate(committed)
+        if committed == 0:
+            out.write(CSV_HEADER)
+        if len(table):
+            out.write(to_csv_bytes(table, header=False))
+        return out.tell()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m proppredict.ingest", description=__doc__.splitlines()[0])
+    parser.add_argument("source", help=".dat document to ingest")
+    parser.add_argument("store", help="store directory (created on first run)")
+    parser.add_argument("--csv", help="data.csv-format export to append the new rows to")
+    parser.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    args = parser.parse_args(argv)
+    print(IngestStore(args.store).ingest(args.source, args.csv, args.chunk_bytes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Ridge regression on price from streaming sufficient statistics.
+
+:class:`StreamingRidge` never keeps the rows it was trained on.  It holds
+running sums, the row count, ``sum(x)``, ``sum(y)``, ``X^T X`` and
+``X^T y``, from which the ridge solution follows exactly:
+
+* :meth:`~StreamingRidge.add` folds in new rows in O(rows * d^2) and
+  :meth:`~StreamingRidge.remove` takes rows back out (for example a
+  quarantine side table) at the same cost;
+* :meth:`~StreamingRidge.fit` solves one d x d system, d being the number
+  of features (12), whatever the number of rows seen;
+* statistics from different shards :meth:`~StreamingRidge.merge` by
+  addition, and :meth:`~StreamingRidge.save` / :meth:`~StreamingRidge.load`
+  persist them so a refit never re-reads ``data.csv``.
+
+Rows are shifted by a fixed offset, the means of the first batch, before
+they are summed, so the centred scatter matrices are not dominated by
+cancellation between huge raw sums.  The offset never changes afterwards,
+which keeps removal exact up to float64 rounding.  The penalty ``alpha``
+applies to the standardised coefficients, not the intercept.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Sequence
+
+import numpy as np
+
+from proppredict.features import FEATURES, feature_matrix, target
+from proppredict.table import ListingTable, PathLike
+
+
+class StreamingRidge:
+    """Ridge regression of price on ``features`` kept as sufficient statistics.
+
+    Attributes:
+        features: feature column names, in matrix order.
+        alpha: ridge penalty on the standardised coefficients.
+        rows: rows currently summed into the statistics.
+        coef: per-feature coefficients after :meth:`fit` (``None`` before).
+        intercept: intercept after :meth:`fit`.
+    """
+
+    def __init__(self, features: Sequence[str] = FEATURES, alpha: float = 1.0) -> None:
+        self.features = tuple(features)
+        self.alpha = float(alpha)
+        d = len(self.features)
+        self.rows = 0
+        self._x_shift: np.ndarray | None = None
+        self._y_shift = 0.0
+        self._sx = np.zeros(d)
+        self._sy = 0.0
+        self._sxx = np.zeros((d, d))
+        self._sxy = np.zeros(d)
+        self._syy = 0.0
+        self.coef: np.ndarray | None = None
+        self.intercept = 0.0
+
+    def _accumulate(self, X: np.ndarray, y: np.ndarray, sign: float) -> None:
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features) or len(X) != len(y):
+            raise ValueError(f"expected X of shape (n, {len(self.features)}) and y of length n, got {X.shape}, {y.shape}")
+        if not len(X):
+            return
+        if self._x_shift is None:
+            self._x_shift, self._y_shift = X.mean(axis=0), float(y.mean())
+        Xs = X - self._x_shift
+        ys = y - self._y_shift
+        self.rows += int(sign) * len(X)
+        self._sx += sign * Xs.sum(axis=0)
+        self._sy += sign * ys.sum()
+        self._sxx += sign * (Xs.T @ Xs)
+        self._sxy += sign * (Xs.T @ ys)
+        self._syy += sign * float(ys @ ys)
+
+    def add(self, X: np.ndarray, y: np.ndarray) -> "StreamingRidge":
+        """Fold rows into the statistics; the model is refit on the next :meth:`fit`."""
+        self._accumulate(X, y, 1.0)
+        return self
+
+    def remove(self, X: np.ndarray, y: np.ndarray) -> "StreamingRidge":
+        """Take rows previously passed to :meth:`add` back out.
+
+        Raises:
+            ValueError: if that would leave fewer than zero rows.
+        """
+        if len(X) > self.rows:
+            raise ValueError(f"cannot remove {len(X)} rows from statistics over {self.rows}")
+        self._accumulate(X, y, -1.0)
+        return self
+
+    def add_table(self, table: ListingTable) -> "StreamingRidge":
+        return self.add(feature_matrix(table, self.features), target(table))
+
+    def remove_table(self, table: ListingTable) -> "StreamingRidge":
+        return self.remove(feature_matrix(table, self.features), target(table))
+
+    def merge(self, other: "StreamingRidge") -> "StreamingRidge":
+        """Add the statistics of ``other`` (same features) into this model."""
+        if other.features != self.features:
+            raise ValueError("cannot merge statistics over different features")
+        if other._x_shift is None:
+            return self
+        if self._x_shift is None:
+            self._x_shift, self._y_shift = other._x_shift.copy(), other._y_shift
+        # Re-express other's sums around this model's shift: x - a = (x - b) + (b - a).
+        dx, dy, n = other._x_shift - self._x_shift, other._y_shift - self._y_shift, other.rows
+        sx, sy = other._sx, other._sy
+        self.rows += n
+        self._sx += sx + n * dx
+        self._sy += sy + n * dy
+        self._sxx += other._sxx + np.outer(sx, dx) + np.outer(dx, sx) + n * np.outer(dx, dx)
+        self._sxy += other._sxy + sx * dy + dx * sy + n * dx * dy
+        self._syy += other._syy + 2 * sy * dy + n * dy * dy
+        return self
+
+    def _centred(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, float, float]:
+        """Means of x and y, the centred ``X^T X`` and ``X^T y``, and the centred ``y^T y``."""
+        n = self.rows
+        mean_x, mean_y = self._sx / n, self._sy / n
+        sxx = self._sxx - np.outer(self._sx, mean_x)
+        sxy = self._sxy - self._sx * mean_y
+        syy = self._syy - self._sy * mean_y
+        return self._x_shift + mean_x, sxx, sxy, self._y_shift + mean_y, syy
+
+    def fit(self) -> "StreamingRidge":
+        """Solve for the coefficients from the current statistics.
+
+        Raises:
+            ValueError: if no rows have been added.
+        """
+        if self.rows <= 0:
+            raise ValueError("no rows to fit")
+        mean_x, sxx, sxy, mean_y, _ = self._centred()
+        scale = np.sqrt(np.maximum(np.diag(sxx), 0.0) / self.rows)
+        scale[scale == 0] = 1.0  # constant features get a zero coefficient
+        gram = sxx / np.outer(scale, scale) + self.alpha * np.eye(len(scale))
+        try:
+            beta = np.linalg.solve(gram, sxy / scale)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(gram, sxy / scale, rcond=None)[0]
+        self.coef = beta / scale
+        self.intercept = float(mean_y - mean_x @ self.coef)
+        return self
+
+    def r2(self) -> float:
+        """Training R^2 of the fitted coefficients, computed from the statistics alone."""
+        if self.coef is None:
+            raise ValueError("model is not fitted")
+        _, sxx, sxy, _, syy = self._centred()
+        sse = syy - 2 * self.coef @ sxy + self.coef @ sxx @ self.coef
+        return float(1 - sse / syy) if syy > 0 else 0.0
+
+    def predict(self, data: ListingTable | np.ndarray) -> np.ndarray:
+        """Predicted price for a table or a ``(rows, len(features))`` matrix."""
+        if self.coef is None:
+            raise ValueError("model is not fitted")
+        X = feature_matrix(data, self.features) if isinstance(data, ListingTable) else np.asarray(data, np.float64)
+        return X @ self.coef + self.intercept
+
+    def save(self, path: PathLike) -> None:
+        """Write the statistics (not the rows) to an ``.npz`` file, replacing it atomically."""
+        path = os.fspath(path)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            features=np.array(self.features),
+            alpha=self.alpha,
+            rows=self.rows,
+            x_shift=self._x_shift if self._x_shift is not None else np.zeros(0),
+            y_shift=self._y_shift,
+            sx=self._sx,
+            sy=self._sy,
+            sxx=self._sxx,
+            sxy=self._sxy,
+            syy=self._syy,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: PathLike) -> "StreamingRidge":
+        with np.load(os.fspath(path)) as saved:
+            model = cls(saved["features"].tolist(), float(saved["alpha"]))
+            model.rows = int(saved["rows"])
+            model._x_shift = saved["x_shift"] if len(saved["x_shift"]) else None
+            model._y_shift = float(saved["y_shift"])
+            model._sx, model._sy = saved["sx"], float(saved["sy"])
+            model._sxx, model._sxy, model._syy = saved["sxx"], saved["sxy"], float(saved["syy"])
+        return model
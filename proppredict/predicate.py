@@ -0,0 +1,196 @@
+"""Column predicates that can be checked against data or against zone maps.
+
+A :class:`Predicate` such as ``Predicate("city", "==", "Seattle")`` is
+written in terms of logical values.  Before comparison it is bound to the
+physical representation of the column: category codes for
+:class:`~proppredict.categorical.Categorical` columns (whose sorted
+dictionaries make code order match string order) and epoch seconds for
+``datetime64`` columns.  The same bound predicate can then filter rows
+(:meth:`Predicate.mask`) or rule out a whole block from its min/max and
+distinct-value statistics (:meth:`Predicate.may_match`).
+"""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from proppredict.categorical import Categorical
+
+OPS = ("==", "!=", "<", "<=", ">", ">=", "in")
+
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+# Code for a category that does not exist; never stored (MISSING is -1).
+_ABSENT = -2
+_INT64_MIN, _INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class ZoneStats:
+    """Statistics of one column within one block, in physical units.
+
+    Attributes:
+        min: smallest value (``None`` if the block has no non-null values).
+        max: largest value.
+        distinct: sorted distinct values when there are few of them, else ``None``.
+    """
+
+    min: Any
+    max: Any
+    distinct: tuple | None = None
+
+    @classmethod
+    def of(cls, values: np.ndarray, distinct_limit: int) -> "ZoneStats":
+        """Compute stats for a physical column chunk (codes, epoch seconds or numbers)."""
+        values = _physical_values(values)
+        if values.dtype.kind == "f":
+            values = values[~np.isnan(values)]
+        if not len(values):
+            return cls(None, None, ())
+        distinct = np.unique(values)
+        kept = tuple(distinct.tolist()) if len(distinct) <= distinct_limit else None
+        return cls(distinct[0].item(), distinct[-1].item(), kept)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"min": self.min, "max": self.max, "distinct": None if self.distinct is None else list(self.distinct)}
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "ZoneStats":
+        distinct = d.get("distinct")
+        return cls(d["min"], d["max"], None if distinct is None else tuple(distinct))
+
+
+def _physical_values(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        seconds = values.astype("datetime64[s]")
+        return seconds[~np.isnat(seconds)].astype(np.int64)
+    return values
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """``column op value``; ``in`` takes a collection of values."""
+
+    column: str
+    op: str
+    value: Any
+
+    def __post_init__(self) -> None:
+        if self.op not in OPS:
+            raise ValueError(f"unknown operator {self.op!r}; expected one of {OPS}")
+
+    def __str__(self) -> str:
+        return f"{self.column} {self.op} {self.value!r}"
+
+    def bind(self, kind: str, categories: np.ndarray | None = None) -> tuple[str, Any]:
+        """Translate to ``(op, value)`` in physical units for a column of ``kind``.
+
+        ``kind`` is ``"categorical"``, ``"datetime"`` or ``"number"``.
+        """
+        op, value = self.op, self.value
+        if kind == "datetime":
+            to_seconds = lambda v: int(np.datetime64(v, "s").astype(np.int64))  # noqa: E731
+            return op, [to_seconds(v) for v in value] if op == "in" else to_seconds(value)
+        if kind != "categorical":
+            return op, _numbers(value) if op == "in" else value
+        if op == "in":
+            codes = [_code(categories, v) for v in value]
+            return op, [c for c in codes if c != _ABSENT]
+        if op in ("==", "!="):
+            return op, _code(categories, value)
+        # Categories are sorted, so string bounds become code bounds.
+        side = "left" if op in ("<", ">=") else "right"
+        bound = int(np.searchsorted(categories, value, side=side))
+        return ("<" if op in ("<", "<=") else ">="), bound
+
+    def mask(self, column: np.ndarray | Categorical) -> np.ndarray:
+        """Boolean mask of the rows of ``column`` that satisfy the predicate."""
+        if isinstance(column, Categorical):
+            op, value = self.bind("categorical", column.categories)
+            data = np.asarray(column.codes)
+            if op in ("<", ">="):
+                return _COMPARE[op](data, value) & (data >= 0)
+        elif np.asarray(column).dtype.kind == "M":
+            seconds = np.asarray(column).astype("datetime64[s]")
+            op, value = self.bind("datetime")
+            data = seconds.astype(np.int64)
+            return _apply(data, op, value) & ~np.isnat(seconds)
+        else:
+            data = np.asarray(column)
+            if data.dtype.kind == "f" and data.dtype.itemsize < 8:
+                # numpy would round a Python float to the column's dtype
+                # (1.0004 becomes 1.0 in float16), so compare in float64.
+                data = data.astype(np.float64)
+            op, value = self.bind("number")
+        return _apply(data, op, value)
+
+    def may_match(self, stats: ZoneStats, kind: str, categories: np.ndarray | None = None) -> bool:
+        """False only if no row of a block with ``stats`` can satisfy the predicate."""
+        if stats.min is None:
+            return False
+        op, value = self.bind(kind, categories)
+        values = value if op == "in" else [value]
+        if op in ("==", "in"):
+            if stats.distinct is not None:
+                return any(v in stats.distinct for v in values)
+            return any(stats.min <= v <= stats.max for v in values)
+        if op == "!=":
+            return not (stats.min == stats.max == value)
+        if op in ("<", "<="):
+            return _COMPARE[op](stats.min, value)
+        return _COMPARE[op](stats.max, value)
+
+
+def _code(categories: np.ndarray | None, value: str) -> int:
+    if categories is None or not len(categories):
+        return _ABSENT
+    i = int(np.searchsorted(categories, value))
+    return i if i < len(categories) and categories[i] == value else _ABSENT
+
+
+def _numbers(values: Iterable[Any]) -> list:
+    """The members of ``values`` that numpy can hold as int64 or float64; no other value can match a number."""
+    return [
+        v
+        for v in values
+        if isinstance(v, (float, np.floating)) or (isinstance(v, (int, np.integer)) and _INT64_MIN <= v <= _INT64_MAX)
+    ]
+
+
+def _apply(data: np.ndarray, op: str, value: Any) -> np.ndarray:
+    if op == "in":
+        # The candidates keep their own dtype and np.isin compares in the
+        # common one, so 2.5 is not truncated to 2 nor 300 wrapped for int8.
+        return np.isin(data, np.asarray(value)) if len(value) else np.zeros(len(data), dtype=bool)
+    return _COMPARE[op](data, value)
+
+
+def column_kind(column: np.ndarray | Categorical) -> str:
+    """``"categorical"``, ``"datetime"`` or ``"number"``."""
+    if isinstance(column, Categorical):
+        return "categorical"
+    return "datetime" if np.asarray(column).dtype.kind == "M" else "number"
+
+
+def combined_mask(predicates: Sequence[Predicate], columns: dict[str, np.ndarray | Categorical], rows: int) -> np.ndarray:
+    """AND of all ``predicates`` over ``columns``."""
+    keep = np.ones(rows, dtype=bool)
+    for predicate in predicates:
+        keep &= predicate.mask(columns[predicate.column])
+    return keep
+
+
+def referenced_columns(predicates: Iterable[Predicate]) -> list[str]:
+    """Columns used by ``predicates``, in first-use order."""
+    return list(dict.fromkeys(p.column for p in predicates))
@@ -0,0 +1,125 @@
+"""Rule-based quarantine of implausible listings.
+
+Some rows of ``data.csv`` cannot be trusted as training examples: 49 carry
+a price of 0.0, some have a price per square foot far outside their
+statezip, and some were renovated before they were built.
+:func:`quarantine` evaluates every rule as a boolean mask over whole
+columns, combines the masks into one bitmask per row, and splits the table
+in two.  The clean table continues down the main path.  The flagged rows go
+to a side table together with the rules they broke, so later stages never
+see or re-check them.
+
+Rules (bit ``i`` of :attr:`QuarantineReport.rules` is ``RULES[i]``):
+
+* ``zero_price``: ``price <= 0``;
+* ``price_per_sqft``: ``price / sqft_living`` lies more than ``z_threshold``
+  standard deviations from the mean of its statezip (statezips with fewer
+  than ``min_group`` priced rows are not scored);
+* ``sqft_living``: ``sqft_living`` is not positive or differs from
+  ``sqft_above + sqft_basement``;
+* ``renovated_before_built``: ``yr_renovated`` is set and earlier than
+  ``yr_built``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from proppredict.decode import NOT_RENOVATED
+from proppredict.table import ListingTable
+
+RULES = ("zero_price", "price_per_sqft", "sqft_living", "renovated_before_built")
+Z_THRESHOLD = 4.0
+MIN_GROUP = 5
+
+
+@dataclass(frozen=True)
+class QuarantineReport:
+    """Rows taken out of the main path by :func:`quarantine`.
+
+    Attributes:
+        checked: number of rows examined.
+        rows: indices (into the input table) of the quarantined rows.
+        rules: per quarantined row, a bitmask of the rules it broke.
+        side: the quarantined rows, aligned with ``rows``.
+    """
+
+    checked: int
+    rows: np.ndarray
+    rules: np.ndarray
+    side: ListingTable
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def counts(self) -> dict[str, int]:
+        """Rows breaking each rule; a row can break several."""
+        return {name: int(((self.rules >> i) & 1).sum()) for i, name in enumerate(RULES)}
+
+    def reasons(self, i: int) -> list[str]:
+        """Names of the rules broken by the ``i``-th quarantined row."""
+        return [name for j, name in enumerate(RULES) if self.rules[i] >> j & 1]
+
+    def __str__(self) -> str:
+        counts = ", ".join(f"{name} {n}" for name, n in self.counts().items() if n)
+        return f"quarantined {len(self.rows)}/{self.checked} rows" + (f" [{counts}]" if counts else "")
+
+
+def price_per_sqft_z(table: ListingTable, min_group: int = MIN_GROUP) -> np.ndarray:
+    """z-score of ``price / sqft_living`` within each statezip; NaN where it is not defined.
+
+    Group means and deviations come from ``np.bincount`` over the statezip
+    codes, so the cost is a few passes over the columns whatever the number
+    of statezips.  Unpriced rows and rows without living area are neither
+    scored nor counted in their group's statistics.
+    """
+    price = np.asarray(table["price"], dtype=np.float64)
+    living = np.asarray(table["sqft_living"], dtype=np.float64)
+    codes = np.asarray(table["statezip"].codes).astype(np.intp)
+    scored = (price > 0) & (living > 0) & (codes >= 0)
+    ppsf = np.divide(price, living, out=np.zeros(len(price)), where=scored)
+    group = np.where(scored, codes, 0)
+    groups = len(table["statezip"].categories) or 1
+    n = np.bincount(group, weights=scored, minlength=groups)
+    mean = np.bincount(group, weights=ppsf, minlength=groups) / np.maximum(n, 1)
+    deviation = np.where(scored, ppsf - mean[group], 0.0)
+    std = np.sqrt(np.bincount(group, weights=deviation**2, minlength=groups) / np.maximum(n - 1, 1))
+    valid = scored & (n[group] >= min_group) & (std[group] > 0)
+    return np.divide(deviation, std[group], out=np.full(len(price), np.nan), where=valid)
+
+
+def rule_masks(
+    table: ListingTable, z_threshold: float = Z_THRESHOLD, min_group: int = MIN_GROUP
+) -> dict[str, np.ndarray]:
+    """One boolean mask per rule in :data:`RULES`, True where a row breaks it."""
+    price = np.asarray(table["price"])
+    living = np.asarray(table["sqft_living"]).astype(np.int64)
+    renovated = np.asarray(table["yr_renovated"])
+    with np.errstate(invalid="ignore"):
+        outlier = np.abs(price_per_sqft_z(table, min_group)) > z_threshold
+    return {
+        "zero_price": price <= 0,
+        "price_per_sqft": outlier,
+        "sqft_living": (living <= 0) | (living != np.asarray(table["sqft_above"]) + np.asarray(table["sqft_basement"])),
+        "renovated_before_built": (renovated != NOT_RENOVATED) & (renovated < np.asarray(table["yr_built"])),
+    }
+
+
+def quarantine(
+    table: ListingTable, z_threshold: float = Z_THRESHOLD, min_group: int = MIN_GROUP
+) -> tuple[ListingTable, QuarantineReport]:
+    """Split ``table`` into the rows that pass every rule and a side table of the rest.
+
+    The input table is never modified; returns the clean table and a
+    :class:`QuarantineReport` holding the side table.
+    """
+    masks = rule_masks(table, z_threshold, min_group)
+    bits = np.zeros(len(table), dtype=np.uint8)
+    for i, name in enumerate(RULES):
+        bits |= masks[name].astype(np.uint8) << np.uint8(i)
+    flagged = bits != 0
+    rows = np.flatnonzero(flagged)
+    report = QuarantineReport(len(table), rows, bits[rows], table.take(rows))
+    return (table.take(~flagged) if len(rows) else table), report
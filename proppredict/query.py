@@ -0,0 +1,427 @@
+"""Lazy queries over listing data with projection and filter pushdown.
+
+A query is built from :func:`scan` and the ``select`` / ``filter`` /
+``group_by(...).agg(...)`` methods of :class:`LazyFrame`; nothing is read
+until :meth:`LazyFrame.collect`::
+
+    from proppredict.query import col, count, scan
+
+    q = (
+        scan("data/data.csv")
+        .filter(col("city") == "Seattle", col("price") > 0)
+        .group_by("statezip")
+        .agg(col("price").median(), count())
+    )
+    print(q.explain())
+    per_zip = q.collect()
+
+On collect the plan is reduced to the columns it actually uses and every
+filter that precedes the aggregation is handed to the source, which
+applies it as early as its format allows: row-group files skip whole groups
+from their zone maps, cached tables read only the rows that match from
+the projected memory maps, and ``.csv`` / ``.dat`` files decode only the
+needed columns.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterable, Sequence, Union
+
+import numpy as np
+
+from proppredict.cache import MANIFEST, load_table, read_cache
+from proppredict.categorical import Categorical
+from proppredict.predicate import Predicate, combined_mask, referenced_columns
+from proppredict.rowgroup import RowGroupFile
+from proppredict.table import COLUMNS, Column, ListingTable, PathLike, read_table
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max", "median")
+ROWGROUP_SUFFIX = ".pprg"
+# Read by a plan that only counts rows: one byte per row in every format.
+COUNT_COLUMN = "waterfront"
+
+
+@dataclass(frozen=True)
+class Agg:
+    """Aggregation ``func`` of ``column`` (``None`` counts rows), output as ``name``."""
+
+    func: str
+    column: str | None
+    name: str
+
+    def __post_init__(self) -> None:
+        if self.func not in AGGREGATIONS:
+            raise ValueError(f"unknown aggregation {self.func!r}; expected one of {AGGREGATIONS}")
+
+    def __str__(self) -> str:
+        return f"{self.func}({self.column or '*'}) as {self.name}"
+
+    def alias(self, name: str) -> "Agg":
+        return replace(self, name=name)
+
+
+class Col:
+    """Column reference; comparisons build :class:`Predicate` objects, methods build :class:`Agg`."""
+
+    __slots__ = ("name",)
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"col({self.name!r})"
+
+    def __eq__(self, value: Any) -> Predicate:  # type: ignore[override]
+        return Predicate(self.name, "==", value)
+
+    def __ne__(self, value: Any) -> Predicate:  # type: ignore[override]
+        return Predicate(self.name, "!=", value)
+
+    def __lt__(self, value: Any) -> Predicate:
+        return Predicate(self.name, "<", value)
+
+    def __le__(self, value: Any) -> Predicate:
+        return Predicate(self.name, "<=", value)
+
+    def __gt__(self, value: Any) -> Predicate:
+        return Predicate(self.name, ">", value)
+
+    def __ge__(self, value: Any) -> Predicate:
+        return Predicate(self.name, ">=", value)
+
+    def isin(self, values: Iterable[Any]) -> Predicate:
+        return Predicate(self.name, "in", tuple(values))
+
+    def _agg(self, func: str) -> Agg:
+        return Agg(func, self.name, f"{self.name}_{func}")
+
+    def count(self) -> Agg:
+        return self._agg("count")
+
+    def sum(self) -> Agg:
+        return self._agg("sum")
+
+    def mean(self) -> Agg:
+        return self._agg("mean")
+
+    def min(self) -> Agg:
+        return self._agg("min")
+
+    def max(self) -> Agg:
+        return self._agg("max")
+
+    def median(self) -> Agg:
+        return self._agg("median")
+
+
+def col(name: str) -> Col:
+    return Col(name)
+
+
+def count() -> Agg:
+    """Number of rows in each group."""
+    return Agg("count", None, "count")
+
+
+# -- sources -----------------------------------------------------------------
+
+
+class _TableSource:
+    """An in-memory or memory-mapped table; filter columns are scanned before the projection is gathered."""
+
+    def __init__(self, table: ListingTable, label: str) -> None:
+        self.table = table
+        self.label = label
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self.table.names
+
+    def read(self, columns: Sequence[str], filters: Sequence[Predicate]) -> ListingTable:
+        projected = self.table.select(columns)
+        if not filters:
+            return projected
+        used = {name: self.table[name] for name in referenced_columns(filters)}
+        return projected.take(combined_mask(filters, used, len(self.table)))
+
+
+class _FileSource:
+    """A ``.csv`` or ``.dat`` file decoded on every collect, restricted to the columns the plan uses."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.label = f"{path} (decode)"
+        self.names = COLUMNS
+
+    def read(self, columns: Sequence[str], filters: Sequence[Predicate]) -> ListingTable:
+        table = read_table(self.path, [*columns, *referenced_columns(filters)])
+        return _TableSource(table, self.label).read(columns, filters)
+
+
+class _RowGroupSource:
+    """A row-group file; filters prune groups by zone map before any chunk is read."""
+
+    def __init__(self, file: RowGroupFile) -> None:
+        self.file = file
+        self.label = f"{file.path} (row groups)"
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self.file.names
+
+    def read(self, columns: Sequence[str], filters: Sequence[Predicate]) -> ListingTable:
+        return self.file.read(columns, filters)
+
+
+_Source = Union[_TableSource, _FileSource, _RowGroupSource]
+Source = Union[PathLike, ListingTable, RowGroupFile]
+
+
+def scan(source: Source, cache: bool = False, cache_dir: PathLike | None = None) -> "LazyFrame":
+    """Start a lazy query over ``source``.
+
+    ``source`` is a :class:`ListingTable`, a :class:`RowGroupFile`, a
+    row-group file path (``.pprg``), a cache directory written by
+    :func:`~proppredict.cache.write_cache`, or a ``.csv`` / ``.dat`` listing
+    file.  Listing files are decoded on each collect unless ``cache`` is
+    set, in which case they go through :func:`~proppredict.cache.load_table`
+    (optionally in ``cache_dir``) and are queried from the memory-mapped
+    binary cache.
+    """
+    if isinstance(source, ListingTable):
+        return LazyFrame(_TableSource(source, "<table>"))
+    if isinstance(source, RowGroupFile):
+        return LazyFrame(_RowGroupSource(source))
+    path = Path(source)
+    if path.is_dir() and (path / MANIFEST).exists():
+        return LazyFrame(_TableSource(read_cache(path), f"{path} (cache)"))
+    if path.suffix.lower() == ROWGROUP_SUFFIX:
+        return LazyFrame(_RowGroupSource(RowGroupFile(path)))
+    if cache or cache_dir is not None:
+        return LazyFrame(_TableSource(load_table(path, cache_dir), f"{os.fspath(path)} (cache)"))
+    return LazyFrame(_FileSource(path))
+
+
+# -- plans -------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _Select:
+    names: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _Filter:
+    predicates: tuple[Predicate, ...]
+
+
+@dataclass(frozen=True)
+class _Aggregate:
+    keys: tuple[str, ...]
+    aggs: tuple[Agg, ...]
+
+
+_Step = Union[_Select, _Filter, _Aggregate]
+
+
+@dataclass(frozen=True)
+class Plan:
+    """An optimised plan: what the source reads, then what runs in memory.
+
+    Attributes:
+        columns: columns the source must return.
+        filters: predicates pushed down to the source.
+        keys: group-by columns, or ``None`` when the query does not aggregate.
+        aggs: aggregations computed per group.
+        having: predicates applied to the aggregated result.
+        output: result columns, in order.
+    """
+
+    columns: tuple[str, ...]
+    filters: tuple[Predicate, ...]
+    keys: tuple[str, ...] | None
+    aggs: tuple[Agg, ...]
+    having: tuple[Predicate, ...]
+    output: tuple[str, ...]
+
+
+def _check(names: Iterable[str], visible: Sequence[str]) -> None:
+    missing = [name for name in names if name not in visible]
+    if missing:
+        raise KeyError(f"unknown columns {missing!r}; available: {list(visible)!r}")
+
+
+def _optimise(source_names: Sequence[str], steps: Sequence[_Step]) -> Plan:
+    visible = list(source_names)
+    filters: list[Predicate] = []
+    having: list[Predicate] = []
+    aggregate: _Aggregate | None = None
+    for step in steps:
+        if isinstance(step, _Select):
+            _check(step.names, visible)
+            visible = list(step.names)
+        elif isinstance(step, _Filter):
+            _check(referenced_columns(step.predicates), visible)
+            # Projections never rename, so a filter can move below any select.
+            (having if aggregate else filters).extend(step.predicates)
+        else:
+            if aggregate is not None:
+                raise ValueError("a query can aggregate only once")
+            _check([*step.keys, *(a.column for a in step.aggs if a.column)], visible)
+            aggregate = step
+            visible = [*step.keys, *(a.name for a in step.aggs)]
+            if len(set(visible)) != len(visible):
+                raise ValueError(f"duplicate output columns {visible!r}; use Agg.alias")
+    if aggregate is None:
+        return Plan(tuple(visible), tuple(filters), None, (), (), tuple(visible))
+    used = [*aggregate.keys, *(a.column for a in aggregate.aggs if a.column)]
+    if not used and source_names:
+        # count() alone uses no column, but a source read with none returns
+        # no rows; read the first filter column, or else one narrow column.
+        used = [referenced_columns(filters)[0] if filters else _count_column(source_names)]
+    return Plan(
+        tuple(dict.fromkeys(used)), tuple(filters), aggregate.keys, aggregate.aggs, tuple(having), tuple(visible)
+    )
+
+
+def _count_column(names: Sequence[str]) -> str:
+    return COUNT_COLUMN if COUNT_COLUMN in names else names[0]
+
+
+class LazyFrame:
+    """An unevaluated query; every method returns a new frame."""
+
+    def __init__(self, source: _Source, steps: tuple[_Step, ...] = ()) -> None:
+        self._source = source
+        self._steps = steps
+
+    def _then(self, step: _Step) -> "LazyFrame":
+        return LazyFrame(self._source, (*self._steps, step))
+
+    def select(self, *names: str) -> "LazyFrame":
+        return self._then(_Select(names))
+
+    def filter(self, *predicates: Predicate) -> "LazyFrame":
+        """Keep rows satisfying every predicate (see :func:`col`)."""
+        return self._then(_Filter(predicates))
+
+    def group_by(self, *keys: str) -> "GroupBy":
+        return GroupBy(self, keys)
+
+    def agg(self, *aggs: Agg) -> "LazyFrame":
+        """Aggregate all rows into a single-row result."""
+        return self._then(_Aggregate((), aggs))
+
+    def plan(self) -> Plan:
+        return _optimise(self._source.names, self._steps)
+
+    def explain(self) -> str:
+        plan = self.plan()
+        lines = [f"scan {self._source.label}", f"  columns: {', '.join(plan.columns)}"]
+        if plan.filters:
+            lines.append(f"  pushed filters: {' AND '.join(map(str, plan.filters))}")
+        if plan.keys is not None:
+            lines.append(f"aggregate by [{', '.join(plan.keys)}]: {', '.join(map(str, plan.aggs))}")
+        if plan.having:
+            lines.append(f"filter {' AND '.join(map(str, plan.having))}")
+        lines.append(f"output {', '.join(plan.output)}")
+        return "\n".join(lines)
+
+    def collect(self) -> ListingTable:
+        """Run the query."""
+        plan = self.plan()
+        table = self._source.read(plan.columns, plan.filters)
+        if plan.keys is None:
+            return table.select(plan.output)
+        result = _aggregate(table, plan.keys, plan.aggs)
+        if plan.having:
+            result = result.take(combined_mask(plan.having, result.columns, len(result)))
+        return result.select(plan.output)
+
+
+class GroupBy:
+    def __init__(self, frame: LazyFrame, keys: tuple[str, ...]) -> None:
+        self._frame = frame
+        self._keys = keys
+
+    def agg(self, *aggs: Agg) -> LazyFrame:
+        """One row per distinct key combination, in key order."""
+        return self._frame._then(_Aggregate(self._keys, aggs))
+
+
+# -- execution ---------------------------------------------------------------
+
+
+def _physical(column: Column) -> np.ndarray:
+    if isinstance(column, Categorical):
+        return np.asarray(column.codes)
+    column = np.asarray(column)
+    return column.astype("datetime64[s]").astype(np.int64) if column.dtype.kind == "M" else column
+
+
+def _group_ids(table: ListingTable, keys: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Dense group id per row, and the first row of each group; groups sort by key values."""
+    combined = np.zeros(len(table), dtype=np.int64)
+    for name in keys:
+        uniques, inverse = np.unique(_physical(table[name]), return_inverse=True)
+        # Re-densify after every key so the mixed radix cannot overflow.
+        _, combined = np.unique(combined * len(uniques) + inverse.reshape(-1), return_inverse=True)
+        combined = combined.reshape(-1)
+    _, first, ids = np.unique(combined, return_index=True, return_inverse=True)
+    return ids.reshape(-1), first
+
+
+def _reduce(func: str, values: np.ndarray, ids: np.ndarray, groups: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    values, ids = values[valid], ids[valid]
+    counts = np.bincount(ids, minlength=groups)
+    if func == "count":
+        return counts
+    if func in ("sum", "mean"):
+        sums = np.bincount(ids, weights=values, minlength=groups)
+        if func == "sum":
+            return sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+    ordered = values[np.lexsort((values, ids))]
+    starts = np.cumsum(counts) - counts
+    last = np.maximum(counts - 1, 0)
+    out = np.full(groups, np.nan)
+    present = counts > 0
+    if func == "min":
+        picked = ordered[starts[present]]
+    elif func == "max":
+        picked = ordered[(starts + last)[present]]
+    else:
+        lo = ordered[(starts + last // 2)[present]]
+        hi = ordered[(starts + counts // 2)[present]]
+        picked = (lo + hi) / 2
+    out[present] = picked
+    return out
+
+
+def _aggregate(table: ListingTable, keys: Sequence[str], aggs: Sequence[Agg]) -> ListingTable:
+    """Aggregate ``table``; numeric results are float64 (NaN for all-null groups), counts int64."""
+    if keys:
+        ids, first = _group_ids(table, keys)
+    else:
+        ids, first = np.zeros(len(table), dtype=np.intp), np.zeros(0, dtype=np.intp)
+    groups = len(first) if keys else 1
+    columns: dict[str, Column] = {name: table[name][first] for name in keys}
+    for agg in aggs:
+        if agg.column is None:
+            columns[agg.name] = np.bincount(ids, minlength=groups)
+            continue
+        column = table[agg.column]
+        if isinstance(column, Categorical) or np.asarray(column).dtype.kind == "M":
+            if agg.func != "count":
+                raise TypeError(f"cannot {agg.func} non-numeric column {agg.column!r}")
+            present = np.asarray(column.codes) >= 0 if isinstance(column, Categorical) else ~np.isnat(column)
+            columns[agg.name] = np.bincount(ids[present], minlength=groups)
+            continue
+        columns[agg.name] = _reduce(agg.func, np.asarray(column, dtype=np.float64), ids, groups)
+    return ListingTable(columns)
@@ -0,0 +1,89 @@
+"""Consistency checks and repairs on a decoded listing table.
+
+``sqft_living`` should always equal ``sqft_above + sqft_basement``; a few
+``.dat`` records break this (746 Boylston Ave E carries 1280 instead of
+2700), and the published ``data.csv`` is the converter output with those rows
+re-derived.  :func:`repair_sqft_living` checks every row in one array
+operation and applies a configurable policy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal, Sequence
+
+import numpy as np
+
+from proppredict.table import ListingTable
+
+Policy = Literal["derive", "flag", "drop"]
+POLICIES = ("derive", "flag", "drop")
+
+
+@dataclass(frozen=True)
+class RepairReport:
+    """Summary of one consistency pass.
+
+    Attributes:
+        policy: the policy that was applied.
+        checked: number of rows examined.
+        rows: indices (into the input table) of the inconsistent rows.
+        original: ``sqft_living`` values found at ``rows``.
+        expected: ``sqft_above + sqft_basement`` at ``rows``.
+    """
+
+    policy: str
+    checked: int
+    rows: np.ndarray
+    original: np.ndarray
+    expected: np.ndarray
+
+    @classmethod
+    def concat(cls, policy: str, parts: Sequence["RepairReport"]) -> "RepairReport":
+        """Merge the reports of consecutive row ranges, indexing rows over all of them."""
+        offsets = np.cumsum([0, *(part.checked for part in parts)])
+        if not parts:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(policy, 0, empty, empty, empty)
+        return cls(
+            policy,
+            int(offsets[-1]),
+            np.concatenate([part.rows + offset for part, offset in zip(parts, offsets)]),
+            np.concatenate([part.original for part in parts]),
+            np.concatenate([part.expected for part in parts]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __str__(self) -> str:
+        shown = ", ".join(f"{r}: {o}->{e}" for r, o, e in zip(self.rows[:10], self.original, self.expected))
+        more = f" (+{len(self.rows) - 10} more)" if len(self.rows) > 10 else ""
+        return f"{self.policy}: {len(self.rows)}/{self.checked} rows inconsistent [{shown}{more}]"
+
+
+def repair_sqft_living(table: ListingTable, policy: Policy = "derive") -> tuple[ListingTable, RepairReport]:
+    """Check ``sqft_living == sqft_above + sqft_basement`` for every row.
+
+    Policies:
+        ``"derive"``: replace the bad ``sqft_living`` with the sum.
+        ``"flag"``: leave the table unchanged and only report.
+        ``"drop"``: remove the inconsistent rows.
+
+    The input table is never modified (it may be a read-only cache mapping);
+    untouched columns are shared with the returned table.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown repair policy {policy!r}; expected one of {POLICIES}")
+    living = np.asarray(table["sqft_living"])
+    expected = np.asarray(table["sqft_above"]).astype(np.int64) + np.asarray(table["sqft_basement"])
+    bad = living != expected
+    rows = np.flatnonzero(bad)
+    report = RepairReport(policy, len(living), rows, living[rows].copy(), expected[rows].astype(living.dtype))
+    if policy == "flag" or not len(rows):
+        return table, report
+    if policy == "drop":
+        return table.take(~bad), report
+    columns = dict(table.columns)
+    columns["sqft_living"] = np.where(bad, expected, living).astype(living.dtype)
+    return ListingTable(columns, table.invalid), report
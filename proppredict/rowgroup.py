@@ -0,0 +1,207 @@
+"""Row-group columnar file format with min/max and distinct-set zone maps.
+
+Layout of a ``.pprg`` file::
+
+    MAGIC | column chunks and dictionaries (8-byte aligned) | footer JSON | footer length (u64) | MAGIC
+
+Rows are split into groups of ``group_rows``; every column of every group is
+a raw little-endian array, with text columns stored as category codes into
+one file-wide dictionary.  The footer records, per group and column, the
+byte range plus :class:`~proppredict.predicate.ZoneStats`.  A reader given
+predicates consults those statistics first and never touches groups that
+cannot match; the surviving chunks are memory-mapped rather than copied.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+
+from proppredict.categorical import Categorical
+from proppredict.predicate import Predicate, ZoneStats, column_kind, combined_mask, referenced_columns
+from proppredict.table import ListingTable, PathLike
+
+MAGIC = b"PPRG\x00\x01\x00\x00"
+FORMAT_VERSION = 1
+GROUP_ROWS = 1 << 16
+DISTINCT_LIMIT = 64
+
+_ALIGN = 8
+_LENGTH = struct.Struct("<Q")
+
+
+def _physical(column: np.ndarray | Categorical) -> np.ndarray:
+    return np.asarray(column.codes if isinstance(column, Categorical) else column)
+
+
+def write_rowgroups(
+    table: ListingTable,
+    path: PathLike,
+    group_rows: int = GROUP_ROWS,
+    sort_by: Sequence[str] = (),
+    distinct_limit: int = DISTINCT_LIMIT,
+) -> Path:
+    """Write ``table`` as a row-group file.
+
+    ``sort_by`` clusters rows first (e.g. ``("city", "date")``) so that zone
+    maps become selective; text columns sort in string order because their
+    dictionaries are sorted.  Decode failures recorded in
+    :attr:`ListingTable.invalid` are only kept for unsorted writes, where the
+    row indices still apply.
+    """
+    if sort_by:
+        order = np.lexsort([_physical(table[name]) for name in reversed(sort_by)])
+        table = table.take(order)
+    path = Path(path)
+    columns_meta: list[dict[str, Any]] = []
+    groups: list[dict[str, Any]] = []
+    with open(path, "wb") as out:
+        out.write(MAGIC)
+
+        def block(array: np.ndarray) -> dict[str, int]:
+            out.write(b"\0" * (-out.tell() % _ALIGN))
+            offset = out.tell()
+            data = np.ascontiguousarray(array)
+            out.write(data.tobytes())
+            return {"offset": offset, "length": data.nbytes}
+
+        for name, col in table.columns.items():
+            meta: dict[str, Any] = {"name": name, "kind": column_kind(col), "dtype": _physical(col).dtype.str}
+            if isinstance(col, Categorical):
+                meta["dictionary"] = {**block(col.categories), "dtype": col.categories.dtype.str}
+            columns_meta.append(meta)
+
+        for start in range(0, len(table), group_rows):
+            stop = min(start + group_rows, len(table))
+            chunks = {}
+            for name, col in table.columns.items():
+                data = _physical(col)[start:stop]
+                chunks[name] = {**block(data), "stats": ZoneStats.of(data, distinct_limit).as_dict()}
+            groups.append({"rows": stop - start, "columns": chunks})
+
+        footer = {
+            "version": FORMAT_VERSION,
+            "rows": len(table),
+            "columns": columns_meta,
+            "groups": groups,
+            "invalid": {name: rows.tolist() for name, rows in table.invalid.items()} if not sort_by else {},
+        }
+        payload = json.dumps(footer).encode("utf-8")
+        out.write(payload)
+        out.write(_LENGTH.pack(len(payload)))
+        out.write(MAGIC)
+    return path
+
+
+@dataclass(frozen=True)
+class _Column:
+    name: str
+    kind: str
+    dtype: np.dtype
+    categories: np.ndarray | None
+
+
+class RowGroupFile:
+    """Read-only, memory-mapped view of a row-group file."""
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        tail = len(MAGIC) + _LENGTH.size
+        framed = len(self._data) >= len(MAGIC) + tail
+        if not framed or bytes(self._data[: len(MAGIC)]) != MAGIC or bytes(self._data[-len(MAGIC):]) != MAGIC:
+            raise ValueError(f"{self.path}: not a row-group file")
+        (length,) = _LENGTH.unpack(bytes(self._data[-tail:-len(MAGIC)]))
+        footer = json.loads(bytes(self._data[-tail - length:-tail]))
+        if footer["version"] != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: format version {footer['version']} != {FORMAT_VERSION}")
+        self.num_rows: int = footer["rows"]
+        self._groups = footer["groups"]
+        self._invalid = {name: np.asarray(rows, dtype=np.int64) for name, rows in footer["invalid"].items()}
+        self._columns: dict[str, _Column] = {}
+        for meta in footer["columns"]:
+            categories = None
+            if "dictionary" in meta:
+                categories = self._view(meta["dictionary"], np.dtype(meta["dictionary"]["dtype"]))
+            self._columns[meta["name"]] = _Column(meta["name"], meta["kind"], np.dtype(meta["dtype"]), categories)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def num_groups(self) -> int:
+        return len(self._groups)
+
+    def _view(self, block: dict[str, int], dtype: np.dtype) -> np.ndarray:
+        raw = self._data[block["offset"]:block["offset"] + block["length"]]
+        return np.frombuffer(raw, dtype=dtype) if len(raw) else np.empty(0, dtype=dtype)
+
+    def stats(self, group: int, column: str) -> ZoneStats:
+        return ZoneStats.from_dict(self._groups[group]["columns"][column]["stats"])
+
+    def prune(self, filters: Sequence[Predicate] = ()) -> list[int]:
+        """Indices of the row groups whose zone maps allow a match for every filter."""
+        keep = []
+        for g in range(len(self._groups)):
+            if all(
+                f.may_match(self.stats(g, f.column), self._columns[f.column].kind, self._columns[f.column].categories)
+                for f in filters
+            ):
+                keep.append(g)
+        return keep
+
+    def _chunk(self, group: int, name: str) -> np.ndarray | Categorical:
+        column = self._columns[name]
+        data = self._view(self._groups[group]["columns"][name], column.dtype)
+        return Categorical(data, column.categories) if column.categories is not None else data
+
+    def iter_groups(self, columns: Sequence[str] | None = None) -> Iterator[ListingTable]:
+        """Each row group as its own table of memory-mapped chunks, so a file of any size streams in bounded memory."""
+        names = list(columns) if columns is not None else list(self._columns)
+        for name in names:
+            if name not in self._columns:
+                raise KeyError(f"{self.path}: no column {name!r}")
+        for g in range(len(self._groups)):
+            yield ListingTable({name: self._chunk(g, name) for name in names})
+
+    def read(self, columns: Sequence[str] | None = None, filters: Sequence[Predicate] = ()) -> ListingTable:
+        """Rows matching all ``filters`` (ANDed), restricted to ``columns``.
+
+        Pruned groups are skipped without decoding; in the remaining groups
+        the filter columns are read first and the projected columns only for
+        groups that still have matching rows.
+        """
+        for name in [*(columns or ()), *referenced_columns(filters)]:
+            if name not in self._columns:
+                raise KeyError(f"{self.path}: no column {name!r}")
+        names = list(columns) if columns is not None else list(self._columns)
+        parts: dict[str, list] = {name: [] for name in names}
+        for g in self.prune(filters):
+            rows = self._groups[g]["rows"]
+            if filters:
+                filter_cols = {name: self._chunk(g, name) for name in referenced_columns(filters)}
+                keep = combined_mask(filters, filter_cols, rows)
+                if not keep.any():
+                    continue
+                selected = None if keep.all() else np.flatnonzero(keep)
+            else:
+                selected = None
+            for name in names:
+                chunk = self._chunk(g, name)
+                parts[name].append(chunk if selected is None else chunk[selected])
+        out: dict[str, np.ndarray | Categorical] = {}
+        for name in names:
+            column = self._columns[name]
+            if column.categories is not None:
+                codes = np.concatenate([p.codes for p in parts[name]]) if parts[name] else np.empty(0, column.dtype)
+                out[name] = Categorical(codes, column.categories)
+            else:
+                out[name] = np.concatenate(parts[name]) if parts[name] else np.empty(0, column.dtype)
+        invalid = self._invalid if not filters and columns is None else {}
+        return ListingTable(out, invalid)
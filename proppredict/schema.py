@@ -0,0 +1,194 @@
+"""Typed schema for the listing columns.
+
+Each :class:`Field` declares the valid domain of a column and derives the
+narrowest numpy dtype that holds it: small counts and codes (``waterfront``
+0/1, ``view`` 0-4, ``condition`` 1-5, ``bedrooms``) become int8, years
+int16, square footage int32.  ``floors`` comes in half steps, which float16
+represents exactly, so it takes two bytes and still behaves as an ordinary
+float in arithmetic and CSV output.  Comparisons are the exception, since
+numpy rounds a Python float to float16 first, so
+:meth:`~proppredict.predicate.Predicate.mask` compares narrow floats in
+float64.  ``bathrooms`` stays float64: besides
+the usual quarter steps, ``data.dat`` carries values such as 1.05 that no
+narrower float reproduces exactly.
+
+:meth:`Schema.conform` is applied by every loader.  It checks every value
+against its field, meaning range, integrality, step and nulls, before
+casting, and raises :class:`SchemaError` instead of wrapping around or
+rounding silently.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, Literal, Mapping, Sequence
+
+import numpy as np
+
+from proppredict.categorical import Categorical
+
+Kind = Literal["int", "decimal", "float", "datetime", "text"]
+
+# float16 has an 11-bit significand: multiples of ``step`` are exact up to 2048 steps.
+_FLOAT16_STEPS = 1 << 11
+_FLOAT32_STEPS = 1 << 24
+
+
+class SchemaError(ValueError):
+    """Raised by :meth:`Schema.conform` when values do not fit their field."""
+
+    def __init__(self, column: str, rows: np.ndarray, values: np.ndarray, reason: str) -> None:
+        self.column = column
+        self.rows = rows
+        shown = ", ".join(f"{r}={v!r}" for r, v in zip(rows[:10].tolist(), values[:10].tolist()))
+        more = f" (+{len(rows) - 10} more)" if len(rows) > 10 else ""
+        super().__init__(f"{len(rows)} {column!r} value(s) {reason}: rows {shown}{more}")
+
+
+def narrowest_int(lo: int, hi: int) -> np.dtype:
+    """Smallest signed integer dtype holding ``[lo, hi]``."""
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    raise OverflowError(f"[{lo}, {hi}] does not fit in int64")
+
+
+@dataclass(frozen=True)
+class Field:
+    """One column's domain.
+
+    Attributes:
+        name: column name.
+        kind: ``"int"``, ``"decimal"`` (multiples of ``step``), ``"float"``,
+            ``"datetime"`` or ``"text"`` (dictionary-encoded).
+        min: smallest valid value (numeric kinds).
+        max: largest valid value (numeric kinds).
+        step: resolution of a ``"decimal"`` field.
+        nullable: whether NaN/NaT is allowed.
+    """
+
+    name: str
+    kind: Kind
+    min: float | None = None
+    max: float | None = None
+    step: float | None = None
+    nullable: bool = False
+
+    @property
+    def dtype(self) -> np.dtype | None:
+        """Storage dtype; ``None`` for text fields, whose code width depends on the dictionary."""
+        if self.kind == "int":
+            return narrowest_int(int(self.min), int(self.max))
+        if self.kind == "decimal":
+            steps = max(abs(self.min), abs(self.max)) / self.step
+            if steps <= _FLOAT16_STEPS:
+                return np.dtype(np.float16)
+            return np.dtype(np.float32 if steps <= _FLOAT32_STEPS else np.float64)
+        if self.kind == "float":
+            return np.dtype(np.float64)
+        if self.kind == "datetime":
+            return np.dtype("datetime64[s]")
+        return None
+
+    def conform(self, values: np.ndarray | Categorical, skip: np.ndarray | None = None) -> np.ndarray | Categorical:
+        """Check ``values`` and cast them to :attr:`dtype`; rows set in ``skip`` are not checked."""
+        if self.kind == "text":
+            if not isinstance(values, Categorical):
+                raise TypeError(f"{self.name}: expected a Categorical column")
+            return values
+        values = np.asarray(values)
+        if self.kind == "datetime":
+            return self._check(values.astype(self.dtype), np.isnat, skip)
+        data = values.astype(np.float64) if values.dtype.kind in "fiub" else values
+        if data.dtype.kind != "f":
+            raise TypeError(f"{self.name}: expected a numeric column, got {data.dtype}")
+        self._check(data, np.isnan, skip)
+        return values.astype(self.dtype, copy=False)
+
+    def _check(self, data: np.ndarray, isnull, skip: np.ndarray | None) -> np.ndarray:
+        checked = np.ones(len(data), dtype=bool) if skip is None else ~skip
+        null = isnull(data)
+        if not self.nullable:
+            self._fail(data, checked & null, "are null")
+        if self.kind in ("datetime", "text"):
+            return data
+        present = checked & ~null
+        with np.errstate(invalid="ignore"):
+            self._fail(data, present & ((data < self.min) | (data > self.max)), f"are outside [{self.min}, {self.max}]")
+            if self.kind == "int":
+                self._fail(data, present & (data != np.round(data)), "are not whole numbers")
+            elif self.kind == "decimal":
+                steps = data / self.step
+                self._fail(data, present & (steps != np.round(steps)), f"are not multiples of {self.step}")
+        return data
+
+    def _fail(self, data: np.ndarray, bad: np.ndarray, reason: str) -> None:
+        if bad.any():
+            rows = np.flatnonzero(bad)
+            raise SchemaError(self.name, rows, data[rows], reason)
+
+
+class Schema:
+    """An ordered registry of :class:`Field` objects keyed by column name."""
+
+    def __init__(self, fields: Sequence[Field]) -> None:
+        self._fields = {f.name: f for f in fields}
+
+    def __getitem__(self, name: str) -> Field:
+        return self._fields[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._fields
+
+    def __iter__(self) -> Iterator[Field]:
+        return iter(self._fields.values())
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._fields)
+
+    def dtypes(self) -> dict[str, np.dtype | None]:
+        return {f.name: f.dtype for f in self}
+
+    def conform(
+        self,
+        columns: Mapping[str, np.ndarray | Categorical],
+        invalid: Mapping[str, np.ndarray] | None = None,
+    ) -> dict[str, np.ndarray | Categorical]:
+        """Check and narrow every column that has a field; rows listed in ``invalid`` are not checked.
+
+        Raises:
+            SchemaError: for the first column with a value outside its field.
+        """
+        skip = None
+        if invalid:
+            rows = len(next(iter(columns.values())))
+            skip = np.zeros(rows, dtype=bool)
+            for bad in invalid.values():
+                skip[bad] = True
+        return {name: self[name].conform(col, skip) if name in self else col for name, col in columns.items()}
+
+
+LISTING_SCHEMA = Schema(
+    [
+        Field("date", "datetime", nullable=True),
+        Field("price", "float", 0, 1e10),
+        Field("bedrooms", "int", 0, 100),
+        Field("bathrooms", "float", 0, 100),
+        Field("sqft_living", "int", 0, 100_000_000),
+        Field("sqft_lot", "int", 0, 1_000_000_000),
+        Field("floors", "decimal", 0, 100, step=0.5),
+        Field("waterfront", "int", 0, 1),
+        Field("view", "int", 0, 4),
+        Field("condition", "int", 1, 5),
+        Field("sqft_above", "int", 0, 100_000_000),
+        Field("sqft_basement", "int", 0, 100_000_000),
+        Field("yr_built", "int", 1000, 3000),
+        Field("yr_renovated", "int", 0, 3000),
+        Field("street", "text"),
+        Field("city", "text"),
+        Field("statezip", "text"),
+        Field("country", "text"),
+    ]
+)
@@ -0,0 +1,294 @@
+"""Successive-halving hyperparameter search for the boosted-tree price model.
+
+Tuning used to decode ``data.csv``, build the feature matrix and bin it
+once per trial.  :func:`load_binned` does all of that once per source
+file: it quarantines the rows, holds out the most recent sale dates for
+validation, shuffles the remaining training rows and bins them with a
+:class:`~proppredict.gbt.BinMapper` fitted on them alone.  The result is
+stored inside the :func:`~proppredict.cache.load_table` cache entry of
+the source, under a name made of every argument that shapes it (bins,
+held-out share, shuffle seed and a digest of the feature names), so it
+is rebuilt exactly when the source or any of those changes.
+
+:func:`successive_halving` then spends little on bad configurations.
+Every configuration is first trained on a small prefix of the shuffled
+rows with few trees, and only the best ``1 / eta`` of each rung moves on
+to ``eta`` times more rows and trees.  The last rung trains the
+survivors on all training rows with ``max_trees`` trees.  Trials of a
+rung run in a process pool over one shared copy of the bins, and each
+trial calls :meth:`~proppredict.gbt.GradientBoostedTrees.fit_binned` on a
+row slice, so no trial repeats the preprocessing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+from proppredict._shared import SharedArrays, init_worker, local_arrays, worker_arrays
+from proppredict.cache import default_cache_dir, load_table, source_digest
+from proppredict.cv import assign_folds
+from proppredict.features import FEATURES, feature_matrix, target
+from proppredict.gbt import MAX_BINS, BinMapper, GradientBoostedTrees
+from proppredict.quarantine import quarantine
+from proppredict.table import PathLike
+
+DEFAULT_GRID: dict[str, Sequence[Any]] = {
+    "learning_rate": (0.05, 0.1, 0.2),
+    "max_depth": (4, 6, 8),
+    "min_samples_leaf": (5, 20, 50),
+    "l2": (0.0, 1.0, 10.0),
+}
+ETA = 3
+MAX_TREES = 200
+# Smallest row and tree budget given to a trial in the first rung.
+MIN_ROWS = 128
+MIN_TREES = 5
+# The most recent 1 / VALID_FOLDS of the sale dates is held out for scoring.
+VALID_FOLDS = 5
+
+
+@dataclass(frozen=True)
+class BinnedFeatures:
+    """Cached model inputs of one source file.
+
+    Attributes:
+        mapper: bin edges, fitted on the training rows.
+        bins: ``(rows, features)`` uint8 bins of the training rows, in shuffled order.
+        y: training prices aligned with ``bins``.
+        valid_X: raw feature matrix of the held-out rows.
+        valid_y: held-out prices.
+        features: feature column names.
+    """
+
+    mapper: BinMapper
+    bins: np.ndarray
+    y: np.ndarray
+    valid_X: np.ndarray
+    valid_y: np.ndarray
+    features: tuple[str, ...]
+
+    def save(self, path: PathLike) -> None:
+        """Write to an ``.npz`` file, replacing it atomically."""
+        path = os.fspath(path)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            bins=self.bins,
+            y=self.y,
+            valid_X=self.valid_X,
+            valid_y=self.valid_y,
+            features=np.array(self.features),
+            **{f"edges_{j}": edges for j, edges in enumerate(self.mapper.edges)},
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: PathLike) -> "BinnedFeatures":
+        with np.load(os.fspath(path)) as saved:
+            features = tuple(saved["features"].tolist())
+            mapper = BinMapper(tuple(saved[f"edges_{j}"] for j in range(len(features))))
+            return cls(mapper, saved["bins"], saved["y"], saved["valid_X"], saved["valid_y"], features)
+
+
+def bin_features(
+    source: PathLike,
+    max_bins: int = MAX_BINS,
+    features: Sequence[str] = FEATURES,
+    cache_dir: PathLike | None = None,
+    seed: int = 0,
+    valid_folds: int = VALID_FOLDS,
+) -> BinnedFeatures:
+    """Build the :class:`BinnedFeatures` of ``source`` without looking at the cache.
+
+    The latest ``1 / valid_folds`` of the sale dates is held out, and the
+    training rows are shuffled with ``seed``.
+    """
+    clean, _ = quarantine(load_table(source, cache_dir))
+    held_out = assign_folds(clean, valid_folds, "date") == valid_folds - 1
+    X, y = feature_matrix(clean, features), target(clean)
+    train = np.flatnonzero(~held_out)
+    train = train[np.random.default_rng(seed).permutation(len(train))]
+    mapper = BinMapper.fit(X[train], max_bins)
+    return BinnedFeatures(mapper, mapper.transform(X[train]), y[train], X[held_out], y[held_out], tuple(features))
+
+
+def load_binned(
+    source: PathLike,
+    max_bins: int = MAX_BINS,
+    features: Sequence[str] = FEATURES,
+    cache_dir: PathLike | None = None,
+    seed: int = 0,
+    valid_folds: int = VALID_FOLDS,
+    refresh: bool = False,
+) -> BinnedFeatures:
+    """The :class:`BinnedFeatures` of ``source``, built on the first call and read from the cache after.
+
+    Arguments are those of :func:`bin_features`; each distinct combination
+    is cached separately.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(source)
+    names = hashlib.sha256("\0".join(features).encode()).hexdigest()[:16]
+    path = cache_dir / source_digest(source) / f"binned-{max_bins}-{valid_folds}-{seed}-{names}.npz"
+    if not refresh:
+        try:
+            return BinnedFeatures.load(path)
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+    binned = bin_features(source, max_bins, features, cache_dir, seed, valid_folds)
+    # The table cache entry is (re)created by bin_features, so the directory exists.
+    binned.save(path)
+    return binned
+
+
+def grid(space: Mapping[str, Sequence[Any]] = DEFAULT_GRID) -> list[dict[str, Any]]:
+    """Every combination of the values in ``space``, as keyword-argument dicts."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+@dataclass(frozen=True)
+class Trial:
+    """One configuration trained on ``rows`` rows with ``n_trees`` trees; ``rmse`` is on the held-out rows."""
+
+    config: int
+    params: dict[str, Any]
+    rung: int
+    rows: int
+    n_trees: int
+    rmse: float
+    seconds: float
+
+
+@dataclass(frozen=True)
+class SearchReport:
+    """Result of :func:`successive_halving`.
+
+    Attributes:
+        trials: every trial run, rung by rung.
+        best: the best trial at the full budget.
+        seconds: wall-clock time of the search.
+    """
+
+    trials: tuple[Trial, ...]
+    best: Trial
+    seconds: float
+
+    def rung(self, rung: int) -> list[Trial]:
+        return [trial for trial in self.trials if trial.rung == rung]
+
+    def __str__(self) -> str:
+        lines = []
+        for rung in sorted({trial.rung for trial in self.trials}):
+            trials = self.rung(rung)
+            top = min(trials, key=lambda trial: trial.rmse)
+            lines.append(
+                f"rung {rung}: {len(trials):>3} configs x {trials[0].rows:>7} rows x {trials[0].n_trees:>4} trees, "
+                f"{sum(trial.seconds for trial in trials):7.2f}s of fitting, best rmse {top.rmse:.0f}"
+            )
+        lines.append(f"best {self.best.params} rmse {self.best.rmse:.0f} in {self.seconds:.2f}s")
+        return "\n".join(lines)
+
+
+def _run_trial(params: dict[str, Any], rows: int, n_trees: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    arrays = worker_arrays(__name__)
+    params = {**params, "n_trees": n_trees, "workers": 1}  # trials already fill the pool
+    if "min_samples_leaf" in params:
+        # A leaf size means the same regularisation on a row prefix as on all rows.
+        share = rows / len(arrays["y"])
+        params["min_samples_leaf"] = max(1, round(params["min_samples_leaf"] * share))
+    bins = arrays["bins"]
+    mapper = BinMapper(tuple(arrays[f"edges_{j}"] for j in range(bins.shape[1])))
+    model = GradientBoostedTrees(**params)
+    model.fit_binned(bins[:rows], arrays["y"][:rows], mapper)
+    error = model.predict(arrays["valid_X"]) - arrays["valid_y"]
+    return float(np.sqrt(np.mean(error**2))), time.perf_counter() - start
+
+
+def _steps(ratio: float, eta: int) -> int:
+    """The largest ``s`` with ``eta ** s <= ratio`` (0 if there is none)."""
+    steps = 0
+    while eta ** (steps + 1) <= ratio:
+        steps += 1
+    return steps
+
+
+def successive_halving(
+    data: BinnedFeatures,
+    configs: Sequence[Mapping[str, Any]] | None = None,
+    eta: int = ETA,
+    max_trees: int = MAX_TREES,
+    min_rows: int = MIN_ROWS,
+    min_trees: int = MIN_TREES,
+    workers: int | None = None,
+) -> SearchReport:
+    """Search ``configs`` (keyword arguments of :class:`~proppredict.gbt.GradientBoostedTrees`).
+
+    As in Hyperband, the number of rungs ``R + 1`` follows from the
+    budgets: ``R`` is the largest number of ``eta``-fold reductions that
+    keeps the first rung at ``min_rows`` rows and ``min_trees`` trees or
+    more, and no more than it takes to cut the configurations down to one.
+    No rung is clamped to the budget of another, so every cull is earned
+    by a larger refit.  Rung ``i`` trains on ``eta ** (i - R)`` of the rows
+    and of ``max_trees``, and every rung but the last keeps the best
+    ``ceil(n_i / eta)`` configurations; ``min_samples_leaf`` is scaled
+    by the same row share, so small rungs do not favour whatever can still
+    split on few rows.  ``workers`` defaults to the CPU count;
+    ``workers=1`` runs trials in-process.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    configs = [dict(config) for config in (grid() if configs is None else configs)]
+    if not configs:
+        raise ValueError("no configurations to search")
+    start = time.perf_counter()
+    last = min(
+        math.ceil(math.log(len(configs), eta) - 1e-9) if len(configs) > 1 else 0,
+        _steps(len(data.y) / min_rows, eta),
+        _steps(max_trees / min_trees, eta),
+    )
+    budgets = [
+        (round(len(data.y) * eta ** (rung - last)), round(max_trees * eta ** (rung - last)))
+        for rung in range(last + 1)
+    ]
+    arrays = {
+        "bins": data.bins,
+        "y": data.y,
+        "valid_X": data.valid_X,
+        "valid_y": data.valid_y,
+        **{f"edges_{j}": edges for j, edges in enumerate(data.mapper.edges)},
+    }
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+
+    def search(run) -> tuple[list[Trial], list[Trial]]:
+        trials, ranked, alive = [], [], list(range(len(configs)))
+        for rung, (rows, n_trees) in enumerate(budgets):
+            results = run([configs[c] for c in alive], rows, n_trees)
+            scored = [Trial(c, configs[c], rung, rows, n_trees, rmse, seconds) for c, (rmse, seconds) in zip(alive, results)]
+            trials += scored
+            ranked = sorted(scored, key=lambda trial: trial.rmse)
+            alive = [trial.config for trial in ranked[: math.ceil(len(ranked) / eta)]]
+        return trials, ranked
+
+    if workers == 1:
+        with local_arrays(__name__, arrays):
+            trials, ranked = search(lambda params, rows, n_trees: [_run_trial(p, rows, n_trees) for p in params])
+    else:
+        with SharedArrays(arrays) as shared:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(__name__, shared.specs)) as pool:
+                trials, ranked = search(
+                    lambda params, rows, n_trees: list(
+                        pool.map(_run_trial, params, itertools.repeat(rows), itertools.repeat(n_trees))
+                    )
+                )
+    return SearchReport(tuple(trials), ranked[0], time.perf_counter() - start)
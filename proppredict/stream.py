@@ -0,0 +1,141 @@
+"""Incremental reader for the single-line ``{"houses": [...]}`` documents.
+
+``data/data.dat`` stores every listing on one line, so ``json.load`` has to
+hold the whole document before the first record is usable.  The reader here
+pulls fixed-size chunks from the stream and decodes one record at a time;
+consumed text is dropped from the buffer, so memory is bounded by the chunk
+size plus the largest single record rather than by the file size.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import os
+from typing import IO, Any, Iterator, Union
+
+CHUNK_SIZE = 1 << 16
+MAX_RECORD_SIZE = 1 << 24
+
+Source = Union[str, "os.PathLike[str]", IO[bytes], IO[str]]
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Chunked text buffer with just enough JSON tokenising for the document."""
+
+    def __init__(self, stream: IO[Any], chunk_size: int, max_record_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._max_record_size = max_record_size
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append one chunk to the buffer; return False once the stream is exhausted."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if isinstance(chunk, bytes):
+            text = self._text_decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self._eof = True
+        # Drop everything already consumed so the buffer never grows with the file.
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more input until it is complete."""
+        self._peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if len(self._buf) - self._pos > self._max_record_size:
+                    raise ValueError(
+                        f"record exceeds {self._max_record_size} characters"
+                    ) from None
+                if not self._fill():
+                    raise
+                continue
+            # A number could still continue in the next chunk; objects and strings cannot.
+            if end == len(self._buf) and not isinstance(obj, (dict, list, str)) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+    def array_items(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self._peek()
+            self._pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or ']' but found {sep or 'end of input'!r}")
+
+    def at_end(self) -> bool:
+        return self._peek() == ""
+
+
+def iter_houses(
+    source: Source,
+    key: str = "houses",
+    chunk_size: int = CHUNK_SIZE,
+    max_record_size: int = MAX_RECORD_SIZE,
+) -> Iterator[dict]:
+    """Yield the listing records of a ``{"houses": [...]}`` document one at a time.
+
+    ``source`` is a path or an open binary/text stream.  The non-standard
+    ``NaN`` literal used for ``yr_renovated`` is accepted and decoded as
+    ``float("nan")``.
+
+    Raises:
+        ValueError: if the document is not a single-key object holding an array
+            under ``key``, or a record is larger than ``max_record_size``.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            yield from iter_houses(stream, key, chunk_size, max_record_size)
+        return
+
+    reader = _Reader(source, chunk_size, max_record_size)
+    reader.expect("{")
+    name = reader.value()
+    if name != key:
+        raise ValueError(f"expected top-level key {key!r} but found {name!r}")
+    reader.expect(":")
+    yield from reader.array_items()
+    reader.expect("}")
+    if not reader.at_end():
+        raise ValueError("unexpected data after the end of the document")
@@ -0,0 +1,216 @@
+"""Synthetic listings that follow the joint structure of a real table.
+
+:meth:`SyntheticModel.fit` learns from a seed table (normally ``data.csv``):
+
+* house structure (city, statezip, bedrooms, bathrooms, floors, view,
+  condition, waterfront, yr_built/yr_renovated) is bootstrapped from seed
+  rows, so the discrete joint distribution and the city/statezip pairing are
+  kept; square footage and lot size are jittered multiplicatively, with
+  ``sqft_living = sqft_above + sqft_basement`` preserved;
+* price is drawn from a log-linear model on statezip, city,
+  ``log(sqft_living)``, bedrooms and bathrooms plus its residual noise, with
+  the seed's share of zero prices kept;
+* dates follow the empirical distribution of listing days.
+
+Rows are produced in fixed-size chunks whose random stream depends only on
+``(seed, chunk index)``, so output is identical for any worker count and
+memory is bounded by the chunk size::
+
+    python -m proppredict.synth data/data.csv big.csv --rows 100000000 --seed 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+from typing import Iterator, Literal
+
+import numpy as np
+
+from proppredict._pool import ordered_map
+from proppredict.categorical import Categorical
+from proppredict.decode import NOT_RENOVATED
+from proppredict.table import COLUMNS, CSV_HEADER, ListingTable, PathLike, read_table, to_csv_bytes, to_dat_bytes
+
+CHUNK_ROWS = 100_000
+Format = Literal["csv", "dat"]
+
+_SQFT_JITTER = 0.08
+_LOT_JITTER = 0.15
+_PRICE_ROUNDING = -2
+
+
+@dataclass
+class SyntheticModel:
+    """Parameters learned by :meth:`fit`; plain arrays so the model pickles cheaply."""
+
+    seed_rows: ListingTable
+    street_names: np.ndarray
+    days: np.ndarray
+    day_weights: np.ndarray
+    coef: np.ndarray
+    residual_std: float
+    zero_price_share: float
+    yr_built_range: tuple[int, int]
+
+    @classmethod
+    def fit(cls, table: ListingTable) -> "SyntheticModel":
+        """Learn the generator from ``table``; rows that failed to decode are ignored."""
+        bad = np.zeros(len(table), dtype=bool)
+        for rows in table.invalid.values():
+            bad[rows] = True
+        seed = table.take(~bad)
+
+        days, counts = np.unique(seed["date"].astype("datetime64[D]"), return_counts=True)
+        price = np.asarray(seed["price"], dtype=np.float64)
+        priced = price > 0
+        design = _design(seed)
+        coef, *_ = np.linalg.lstsq(design[priced], np.log(price[priced]), rcond=None)
+        residual = np.log(price[priced]) - design[priced] @ coef
+
+        streets = seed["street"].categories
+        # Keep the street name and drop the house number, which is regenerated.
+        names = np.char.partition(streets, " ")[:, 2] if len(streets) else streets
+        yr_built = np.asarray(seed["yr_built"])
+        return cls(
+            seed_rows=seed,
+            street_names=np.where(names == "", streets, names),
+            days=days,
+            day_weights=counts / counts.sum(),
+            coef=coef,
+            residual_std=float(residual.std()),
+            zero_price_share=float(1 - priced.mean()),
+            yr_built_range=(int(yr_built.min()), int(yr_built.max())),
+        )
+
+    def sample(self, rows: int, rng: np.random.Generator) -> ListingTable:
+        """Draw ``rows`` synthetic listings."""
+        seed = self.seed_rows
+        pick = rng.integers(0, len(seed), rows)
+        t = seed.take(pick)
+
+        scale = rng.lognormal(0.0, _SQFT_JITTER, rows)
+        above = np.maximum(np.rint(np.asarray(t["sqft_above"]) * scale), 1).astype(np.int32)
+        basement = np.rint(np.asarray(t["sqft_basement"]) * scale).astype(np.int32)
+        lot = np.maximum(np.rint(np.asarray(t["sqft_lot"]) * rng.lognormal(0.0, _LOT_JITTER, rows)), 1)
+
+        lo, hi = self.yr_built_range
+        yr_built = np.clip(np.asarray(t["yr_built"]) + rng.integers(-2, 3, rows), lo, hi).astype(t["yr_built"].dtype)
+        renovated = np.asarray(t["yr_renovated"])
+        yr_renovated = np.where(renovated == NOT_RENOVATED, NOT_RENOVATED, np.maximum(renovated, yr_built))
+
+        columns = dict(t.columns)
+        columns.update(
+            date=self.days[rng.choice(len(self.days), rows, p=self.day_weights)].astype("datetime64[s]"),
+            sqft_living=above + basement,
+            sqft_lot=lot.astype(np.int32),
+            sqft_above=above,
+            sqft_basement=basement,
+            yr_built=yr_built,
+            yr_renovated=yr_renovated.astype(np.asarray(t["yr_renovated"]).dtype),
+        )
+        columns["price"] = self._price(ListingTable(columns), rng)
+        columns["street"] = self._street(t["street"], rng)
+        return ListingTable({name: columns[name] for name in COLUMNS})
+
+    def _price(self, t: ListingTable, rng: np.random.Generator) -> np.ndarray:
+        log_price = _design(t) @ self.coef + rng.normal(0.0, self.residual_std, len(t))
+        price = np.round(np.exp(log_price), _PRICE_ROUNDING)
+        return np.where(rng.random(len(t)) < self.zero_price_share, 0.0, price)
+
+    def _street(self, street: Categorical, rng: np.random.Generator) -> Categorical:
+        numbers = rng.integers(100, 30000, len(street)).astype(str)
+        names = self.street_names[np.maximum(street.codes, 0)]
+        return Categorical.encode(np.char.add(np.char.add(numbers, " "), names))
+
+
+def _design(t: ListingTable) -> np.ndarray:
+    """Columns: statezip one-hot, city one-hot, log sqft_living, bedrooms, bathrooms."""
+    statezip, city = t["statezip"], t["city"]
+    offset = len(statezip.categories)
+    out = np.zeros((len(t), offset + len(city.categories) + 3))
+    for codes, base in ((statezip.codes, 0), (city.codes, offset)):
+        rows = np.flatnonzero(codes >= 0)
+        out[rows, base + codes[rows]] = 1.0
+    out[:, -3] = np.log(np.maximum(np.asarray(t["sqft_living"], dtype=np.float64), 1.0))
+    out[:, -2] = t["bedrooms"]
+    out[:, -1] = t["bathrooms"]
+    return out
+
+
+def _chunks(rows: int, chunk_rows: int) -> Iterator[tuple[int, int]]:
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        yield index, min(chunk_rows, rows - start)
+
+
+def generate(model: SyntheticModel, rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> Iterator[ListingTable]:
+    """Yield ``rows`` synthetic listings as tables of at most ``chunk_rows`` rows."""
+    for index, size in _chunks(rows, chunk_rows):
+        yield model.sample(size, np.random.default_rng([seed, index]))
+
+
+_worker_model: SyntheticModel | None = None
+
+
+def _init_worker(model: SyntheticModel) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _render(index: int, size: int, seed: int, fmt: Format) -> bytes:
+    table = _worker_model.sample(size, np.random.default_rng([seed, index]))
+    if fmt == "csv":
+        return to_csv_bytes(table, header=False)
+    return (b", " if index else b"") + to_dat_bytes(table)
+
+
+def write(
+    model: SyntheticModel,
+    destination: PathLike,
+    rows: int,
+    fmt: Format = "csv",
+    seed: int = 0,
+    workers: int | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> int:
+    """Stream ``rows`` synthetic listings to ``destination`` in ``data.csv`` or ``data.dat`` format.
+
+    Chunks are rendered in a process pool and written in order with at most
+    two per worker in flight; the bytes written depend only on ``seed`` and
+    ``chunk_rows``.  Returns the number of bytes written.
+    """
+    if fmt not in ("csv", "dat"):
+        raise ValueError(f"unknown format {fmt!r}; expected 'csv' or 'dat'")
+    workers = workers or os.cpu_count() or 1
+    chunks = list(_chunks(rows, chunk_rows))
+    with open(destination, "wb") as out:
+        written = out.write(CSV_HEADER if fmt == "csv" else b'{"houses": [')
+        args = [(index, size, seed, fmt) for index, size in chunks]
+        for chunk in ordered_map(_render, args, workers, initializer=_init_worker, initargs=(model,)):
+            written += out.write(chunk)
+        if fmt == "dat":
+            written += out.write(b"]}")
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m proppredict.synth", description=__doc__.splitlines()[0])
+    parser.add_argument("seed_file", help="listing file (.csv or .dat) to learn from")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--format", choices=("csv", "dat"), help="default: from the output extension")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("dat" if args.output.endswith(".dat") else "csv")
+    model = SyntheticModel.fit(read_table(args.seed_file))
+    write(model, args.output, args.rows, fmt, args.seed, args.workers, args.chunk_rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,483 @@
+"""The decoded 18-column listing table and its loaders.
+
+A :class:`ListingTable` holds one numpy array per ``data.csv`` column, with
+the text columns dictionary-encoded as
+:class:`~proppredict.categorical.Categorical`.  Tables are built from the
+``.dat`` record stream in fixed-size batches so the columnar decoders always
+see whole columns, or from an existing ``.csv`` export.
+
+``.csv`` exports are read through :class:`MappedCSV`, which memory-maps the
+file and finds every line and field with vectorised byte scans.  Numeric
+columns are parsed in bulk from their byte spans, without building a Python
+string per row, and text columns stay :class:`TextSpans` offset views into
+the mapping until they are decoded or dictionary-encoded.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Sequence, Union
+
+import numpy as np
+
+from proppredict._bytescan import (
+    NEWLINE,
+    byte_at,
+    find_each,
+    gather_spans,
+    parse_decimal,
+    parse_uint,
+    span_hashes,
+    spans_equal,
+    unique_bytes,
+)
+from proppredict.categorical import Categorical, code_dtype
+from proppredict.decode import (
+    AREA_KEY,
+    DecodeError,
+    _to_str,
+    decode_address,
+    decode_area,
+    decode_dates,
+    decode_rooms,
+    normalize_yr_renovated,
+)
+from proppredict.schema import LISTING_SCHEMA
+from proppredict.stream import iter_houses
+
+COLUMNS = (
+    "date",
+    "price",
+    "bedrooms",
+    "bathrooms",
+    "sqft_living",
+    "sqft_lot",
+    "floors",
+    "waterfront",
+    "view",
+    "condition",
+    "sqft_above",
+    "sqft_basement",
+    "yr_built",
+    "yr_renovated",
+    "street",
+    "city",
+    "statezip",
+    "country",
+)
+TEXT_COLUMNS = ("street", "city", "statezip", "country")
+# Written with a decimal point in data.csv ("3.0") whatever their storage dtype.
+CSV_FLOATS = ("price", "bedrooms", "bathrooms", "floors")
+CSV_HEADER = (",".join(COLUMNS) + "\r\n").encode("ascii")
+
+_COMMA = ord(",")
+_QUOTE = ord('"')
+_CR = 13
+# parse_decimal is exact up to 15 characters; longer spans take the per-row fallback.
+_DECIMAL_CHARS = 15
+_INT_DIGITS = 18
+
+BATCH_ROWS = 1 << 16
+
+Column = Union[np.ndarray, Categorical]
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+@dataclass
+class ListingTable:
+    """Column-oriented listing data.
+
+    Attributes:
+        columns: arrays keyed by ``data.csv`` column name, in :data:`COLUMNS` order.
+        invalid: row indices that failed to decode, keyed by source field.
+    """
+
+    columns: dict[str, Column]
+    invalid: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.columns
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self.columns.values())
+
+    def select(self, names: Sequence[str]) -> "ListingTable":
+        """Table with only ``names``, sharing the underlying arrays."""
+        return ListingTable({name: self.columns[name] for name in names}, self.invalid)
+
+    def take(self, rows: np.ndarray) -> "ListingTable":
+        """Table with the given rows (an index array or boolean mask)."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return ListingTable({name: col[rows] for name, col in self.columns.items()})
+
+    def check(self) -> "ListingTable":
+        """Return ``self``, or raise :class:`~proppredict.decode.DecodeError` for the first bad field."""
+        for name, rows in self.invalid.items():
+            if len(rows):
+                raise DecodeError(name, rows)
+        return self
+
+    @classmethod
+    def concat(cls, tables: Sequence["ListingTable"]) -> "ListingTable":
+        """Stack tables with the same columns row-wise."""
+        if not tables:
+            return cls({})
+        columns: dict[str, Column] = {}
+        for name, first in tables[0].columns.items():
+            parts = [t.columns[name] for t in tables]
+            columns[name] = Categorical.concat(parts) if isinstance(first, Categorical) else np.concatenate(parts)
+        invalid: dict[str, list[np.ndarray]] = {}
+        offset = 0
+        for table in tables:
+            for name, rows in table.invalid.items():
+                invalid.setdefault(name, []).append(rows + offset)
+            offset += len(table)
+        return cls(columns, {name: np.concatenate(parts) for name, parts in invalid.items()})
+
+
+def batches(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Consecutive lists of up to ``size`` records."""
+    it = iter(records)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+# Decoder needed by each column of a ``.dat`` record.
+_DECODERS = {
+    "date": "date",
+    "bedrooms": "rooms",
+    "bathrooms": "rooms",
+    "sqft_living": "area",
+    "sqft_lot": "area",
+    "yr_renovated": "yr_renovated",
+    **{name: "address" for name in TEXT_COLUMNS},
+}
+
+
+def _projection(columns: Sequence[str] | None) -> tuple[str, ...]:
+    if columns is None:
+        return COLUMNS
+    unknown = [name for name in columns if name not in COLUMNS]
+    if unknown:
+        raise KeyError(f"unknown columns {unknown!r}")
+    return tuple(name for name in COLUMNS if name in columns)
+
+
+def _decode_batch(batch: list[dict], names: tuple[str, ...] = COLUMNS) -> ListingTable:
+    area = [r["area"] for r in batch]
+    wanted = {_DECODERS[name] for name in names if name in _DECODERS}
+    decoded = []
+    if "date" in wanted:
+        decoded.append(decode_dates([r["date"] for r in batch]))
+    if "rooms" in wanted:
+        decoded.append(decode_rooms([r["rooms"] for r in batch]))
+    if "area" in wanted:
+        decoded.append(decode_area([a[AREA_KEY] for a in area]))
+    if "address" in wanted:
+        decoded.append(decode_address([r["address"] for r in batch]))
+    if "yr_renovated" in wanted:
+        yr_renovated = np.fromiter((r["yr_renovated"] for r in batch), np.float64, len(batch))
+        decoded.append(normalize_yr_renovated(yr_renovated))
+    raw: dict[str, Column] = {}
+    for result in decoded:
+        raw.update(result.columns)
+    if "street" in names:
+        raw["street"] = Categorical.encode(raw["street"])
+    for name in ("price", "floors"):
+        if name in names:
+            raw[name] = np.array([r[name] for r in batch], dtype=np.float64)
+    for name in ("waterfront", "view", "condition", "yr_built"):
+        if name in names:
+            raw[name] = np.array([r[name] for r in batch], dtype=np.int64)
+    for name in ("sqft_above", "sqft_basement"):
+        if name in names:
+            raw[name] = np.array([a[name] for a in area], dtype=np.int64)
+    invalid = {result.field: result.invalid for result in decoded if len(result.invalid)}
+    return ListingTable(LISTING_SCHEMA.conform({name: raw[name] for name in names}, invalid), invalid)
+
+
+def from_records(
+    records: Iterable[dict], batch_rows: int = BATCH_ROWS, columns: Sequence[str] | None = None
+) -> ListingTable:
+    """Build a table from ``.dat`` house records, decoding ``batch_rows`` at a time.
+
+    ``yr_renovated`` becomes int16 with
+    :data:`~proppredict.decode.NOT_RENOVATED` for never-renovated houses.
+    Rows that fail to decode are zero-filled and listed in
+    :attr:`ListingTable.invalid`.  Only ``columns`` (default: all) are
+    decoded, and only their decoders can report invalid rows.
+    """
+    names = _projection(columns)
+    return ListingTable.concat([_decode_batch(batch, names) for batch in batches(records, batch_rows)])
+
+
+def read_dat(path: PathLike, batch_rows: int = BATCH_ROWS, columns: Sequence[str] | None = None) -> ListingTable:
+    """Stream and decode a ``{"houses": [...]}`` document."""
+    return from_records(iter_houses(path), batch_rows, columns)
+
+
+@dataclass(frozen=True)
+class TextSpans:
+    """A text column as ``[starts, ends)`` byte offsets into a shared buffer.
+
+    Indexing only touches the offset arrays; the bytes are read when the
+    column is decoded or encoded.
+    """
+
+    buf: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return bytes(self.buf[self.starts[index]:self.ends[index]]).decode("utf-8")
+        return TextSpans(self.buf, self.starts[index], self.ends[index])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the view itself, not counting the mapped file."""
+        return self.starts.nbytes + self.ends.nbytes
+
+    def decode(self) -> np.ndarray:
+        """Materialise the column as a numpy string array."""
+        return _to_str(gather_spans(self.buf, self.starts, self.ends))
+
+    def encode(self) -> Categorical:
+        """Dictionary-encode the column.
+
+        Spans are grouped by a hash of their bytes read in place, so only the
+        distinct values are ever copied out of the buffer and decoded.
+        """
+        hashes = span_hashes(self.buf, self.starts, self.ends)
+        _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        same = first[inverse]
+        if not spans_equal(self.buf, self.starts, self.ends, self.starts[same], self.ends[same]).all():
+            # A hash collision merged two values; compare the gathered bytes instead.
+            return Categorical.encode(gather_spans(self.buf, self.starts, self.ends))
+        values = _to_str(gather_spans(self.buf, self.starts[first], self.ends[first]))
+        order = np.argsort(values)
+        rank = np.empty(len(order), dtype=code_dtype(len(order)))
+        rank[order] = np.arange(len(order))
+        return Categorical(rank[inverse], values[order])
+
+
+class MappedCSV:
+    """A memory-mapped ``data.csv`` export with the byte offsets of every field.
+
+    Date and numeric columns are parsed on first access to :meth:`column`
+    and kept; :meth:`text` returns lazy :class:`TextSpans` views.
+
+    Raises:
+        ValueError: if the header is not :data:`COLUMNS`, a field is quoted
+            (quoting can hide commas and newlines from the byte scan), or a
+            line does not have one field per column.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = os.fspath(path)
+        buf = np.memmap(self.path, dtype=np.uint8, mode="r") if os.path.getsize(self.path) else np.empty(0, np.uint8)
+        newlines = np.flatnonzero(buf == NEWLINE)
+        header_end = int(newlines[0]) + 1 if len(newlines) else len(buf)
+        header = bytes(buf[:header_end])
+        if header.rstrip(b"\r\n").split(b",") != [name.encode("ascii") for name in COLUMNS]:
+            raise ValueError(f"{self.path}: unexpected header {header!r}")
+        if (buf == _QUOTE).any():
+            raise ValueError(f"{self.path}: quoted fields cannot be memory-mapped")
+
+        starts = newlines + 1
+        ends = np.append(newlines[1:], len(buf))[:len(starts)]
+        keep = ends > starts  # the final newline opens an empty line
+        starts, ends = starts[keep], ends[keep]
+        ends = ends - (byte_at(buf, ends - 1) == _CR)
+        commas, ok = find_each(buf, starts, ends, _COMMA, len(COLUMNS) - 1)
+        if not ok.all():
+            bad = np.flatnonzero(~ok)
+            raise ValueError(f"{self.path}: {len(bad)} row(s) without {len(COLUMNS)} fields, the first is row {bad[0]}")
+        self._buf = buf
+        # Field j of row i is buf[_starts[i, j]:_ends[i, j]].
+        self._starts = np.column_stack([starts, commas + 1])
+        self._ends = np.column_stack([commas, ends])
+        self._parsed: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def spans(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """Absolute byte offsets ``(starts, ends)`` of column ``name`` in every row."""
+        j = COLUMNS.index(name)
+        return self._starts[:, j], self._ends[:, j]
+
+    def text(self, name: str) -> TextSpans:
+        if name not in TEXT_COLUMNS:
+            raise KeyError(f"{name!r} is not a text column")
+        return TextSpans(self._buf, *self.spans(name))
+
+    def column(self, name: str) -> np.ndarray:
+        """A date or numeric column in its schema dtype."""
+        if name in TEXT_COLUMNS:
+            raise KeyError(f"{name!r} is a text column; use text()")
+        if name not in self._parsed:
+            self._parsed[name] = LISTING_SCHEMA[name].conform(self._parse(name))
+        return self._parsed[name]
+
+    def table(self, columns: Sequence[str] | None = None) -> ListingTable:
+        """Convert ``columns`` (default: all) into a :class:`ListingTable`."""
+        out: dict[str, Column] = {}
+        for name in _projection(columns):
+            out[name] = self.text(name).encode() if name in TEXT_COLUMNS else self.column(name)
+        return ListingTable(out)
+
+    def _parse(self, name: str) -> np.ndarray:
+        starts, ends = self.spans(name)
+        if name == "date":
+            # Listings cluster on a few dates, so only the distinct values are converted.
+            distinct, inverse = unique_bytes(gather_spans(self._buf, starts, ends))
+            return distinct.astype("datetime64[s]")[inverse]
+        if name in CSV_FLOATS or name == "yr_renovated":
+            values, ok = parse_decimal(self._buf, starts, ends, _DECIMAL_CHARS)
+            values = self._fallback(values, ok, starts, ends, float)
+            return normalize_yr_renovated(values).check()[name] if name == "yr_renovated" else values
+        values, ok = parse_uint(self._buf, starts, ends, _INT_DIGITS)
+        return self._fallback(values, ok, starts, ends, int)
+
+    def _fallback(
+        self, values: np.ndarray, ok: np.ndarray, starts: np.ndarray, ends: np.ndarray, convert: Callable
+    ) -> np.ndarray:
+        """Convert the spans the vectorised parsers reject (signs, exponents, junk) one at a time."""
+        for i in np.flatnonzero(~ok).tolist():
+            text = bytes(self._buf[starts[i]:ends[i]])
+            try:
+                values[i] = convert(text)
+            except ValueError:
+                raise ValueError(f"{self.path}: row {i}: cannot convert {text!r}") from None
+        return values
+
+
+def read_csv(path: PathLike, columns: Sequence[str] | None = None) -> ListingTable:
+    """Load a ``data.csv``-format export, converting only ``columns`` (default: all).
+
+    The file is memory-mapped and scanned in bulk (:class:`MappedCSV`); an
+    export with quoted fields is read with the ``csv`` module instead.
+    """
+    try:
+        mapped = MappedCSV(path)
+    except ValueError:
+        return _read_quoted_csv(path, _projection(columns))
+    return mapped.table(columns)
+
+
+def _read_quoted_csv(path: PathLike, names: tuple[str, ...]) -> ListingTable:
+    with open(path, newline="", encoding="utf-8") as fp:
+        reader = csv.reader(fp)
+        header = tuple(next(reader, ()))
+        if header != COLUMNS:
+            raise ValueError(f"{os.fspath(path)}: unexpected header {header!r}")
+        fields = list(zip(*reader)) or [()] * len(COLUMNS)
+    text = {name: np.array(fields[COLUMNS.index(name)]) for name in names}
+    out: dict[str, Column] = {}
+    for name in names:
+        if name == "date":
+            out[name] = text[name].astype("datetime64[s]")
+        elif name in CSV_FLOATS:
+            out[name] = text[name].astype(np.float64)
+        elif name == "yr_renovated":
+            out[name] = normalize_yr_renovated(text[name].astype(np.float64)).check()[name]
+        elif name in TEXT_COLUMNS:
+            out[name] = Categorical.encode(text[name])
+        else:
+            out[name] = text[name].astype(np.int64)
+    return ListingTable(LISTING_SCHEMA.conform(out))
+
+
+def _csv_cells(table: ListingTable) -> list[list]:
+    """Per-column Python values that ``csv.writer`` renders exactly as ``data.csv``."""
+    date = table["date"]
+    text = np.datetime_as_string(date, unit="s")
+    cells: list[list] = [np.where(np.isnat(date), "", np.char.replace(text, "T", " ")).tolist()]
+    for name in COLUMNS[1:]:
+        col = table[name]
+        if isinstance(col, Categorical):
+            cells.append(col.decode().tolist())
+        else:
+            cells.append(np.asarray(col, dtype=np.float64 if name in CSV_FLOATS else None).tolist())
+    return cells
+
+
+def to_csv_bytes(table: ListingTable, header: bool = True) -> bytes:
+    """Render ``table`` in the ``data.csv`` format (CRLF line endings)."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(zip(*_csv_cells(table)))
+    return out.getvalue().encode("utf-8")
+
+
+def to_dat_bytes(table: ListingTable) -> bytes:
+    """Render rows as ``.dat`` house records joined by ``", "``.
+
+    This is the body of the ``houses`` array, laid out exactly like
+    ``data.dat`` (key order, ``NaN`` for never-renovated houses), so callers
+    can frame it or concatenate bodies.
+    """
+    text = np.char.replace(np.char.replace(np.datetime_as_string(table["date"], unit="s"), "-", ""), ":", "")
+    columns = {
+        name: np.asarray(table[name], dtype=np.float64 if name in CSV_FLOATS else None).tolist()
+        for name in COLUMNS[1:14]
+    }
+    columns.update({name: table[name].decode().tolist() for name in TEXT_COLUMNS})
+    records = [
+        {
+            "area": {
+                "sqft_basement": basement,
+                "sqft_above": above,
+                "sqft_living/sqft_lot": f"{AREA_KEY}={living}\\ {lot}",
+            },
+            "yr_renovated": float(renovated) if renovated else float("nan"),
+            "price": price,
+            "waterfront": waterfront,
+            "floors": floors,
+            "rooms": f"Number of bathrooms: {bathrooms}; Number of bedrooms: {int(bedrooms)}",
+            "address": f"{street}, {city}, {statezip}, {country}",
+            "date": date,
+            "yr_built": built,
+            "condition": condition,
+            "view": view,
+        }
+        for (date, price, bedrooms, bathrooms, living, lot, floors, waterfront, view, condition, above, basement,
+             built, renovated, street, city, statezip, country)
+        in zip(text.tolist(), *(columns[name] for name in COLUMNS[1:]))
+    ]
+    return json.dumps(records)[1:-1].encode("utf-8")
+
+
+def read_table(path: PathLike, columns: Sequence[str] | None = None) -> ListingTable:
+    """Load a ``.dat`` or ``.csv`` listing file, chosen by extension."""
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    if suffix == ".dat":
+        return read_dat(path, columns=columns)
+    if suffix == ".csv":
+        return read_csv(path, columns)
+    raise ValueError(f"unsupported listing file type: {os.fspath(path)!r}")
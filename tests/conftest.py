@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import pytest
+
+from proppredict import read_csv, read_dat
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="session")
+def data_dir() -> Path:
+    return DATA
+
+
+@pytest.fixture(scope="session")
+def csv_table(data_dir):
+    return read_csv(data_dir / "data.csv")
+
+
+@pytest.fixture(scope="session")
+def dat_table(data_dir):
+    return read_dat(data_dir / "data.dat")
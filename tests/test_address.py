@@ -0,0 +1,11 @@
+from proppredict import AddressIndex
+
+
+def test_counts_on_data_dat(dat_table):
+    index = AddressIndex.build(dat_table)
+    counts = index.counts()
+    assert counts["duplicate"] == 1
+    assert counts["conflict"] == 1
+    assert counts["repeat_sale"] == 73
+    assert sum(counts.values()) == len(dat_table) == 4601
+    assert int(index.training_mask().sum()) == 4601 - 2
@@ -0,0 +1,62 @@
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from proppredict import cache, load_table
+from proppredict.categorical import Categorical
+
+
+@pytest.fixture
+def source(data_dir, tmp_path):
+    path = tmp_path / "data.csv"
+    shutil.copy(data_dir / "data.csv", path)
+    return path
+
+
+def _assert_same(table, other):
+    assert list(table.columns) == list(other.columns)
+    for name, column in table.columns.items():
+        if isinstance(column, Categorical):
+            np.testing.assert_array_equal(column.decode(), other[name].decode())
+        else:
+            np.testing.assert_array_equal(column, other[name])
+
+
+def test_hit_memory_maps_the_same_table(source, csv_table, tmp_path):
+    first = load_table(source, tmp_path / "cache")
+    _assert_same(first, csv_table)
+    second = load_table(source, tmp_path / "cache")
+    _assert_same(second, csv_table)
+    assert isinstance(second["price"], np.memmap)
+    assert [entry.name for entry in (tmp_path / "cache").iterdir()] == [cache.source_digest(source)]
+
+
+def test_changed_source_misses_and_prunes_the_old_entry(source, tmp_path):
+    before = load_table(source, tmp_path / "cache")
+    old = cache.source_digest(source)
+    lines = source.read_bytes().splitlines(keepends=True)
+    source.write_bytes(b"".join(lines[:-1]))
+    after = load_table(source, tmp_path / "cache")
+    assert len(after) == len(before) - 1
+    assert [entry.name for entry in (tmp_path / "cache").iterdir()] == [cache.source_digest(source)]
+    assert cache.source_digest(source) != old
+
+
+def test_version_bump_rebuilds(source, tmp_path, monkeypatch):
+    load_table(source, tmp_path / "cache")
+    entry = tmp_path / "cache" / cache.source_digest(source)
+    monkeypatch.setattr(cache, "CACHE_VERSION", cache.CACHE_VERSION + 1)
+    with pytest.raises(ValueError):
+        cache.read_cache(entry)
+    rebuilt = load_table(source, tmp_path / "cache")
+    assert json.loads((entry / cache.MANIFEST).read_text())["version"] == cache.CACHE_VERSION
+    assert len(rebuilt) == 4600
+
+
+def test_corrupt_entry_rebuilds(source, tmp_path):
+    load_table(source, tmp_path / "cache")
+    entry = tmp_path / "cache" / cache.source_digest(source)
+    (entry / cache.MANIFEST).write_text("{")
+    assert len(load_table(source, tmp_path / "cache")) == 4600
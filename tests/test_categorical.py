@@ -0,0 +1,46 @@
+import numpy as np
+
+from proppredict import Categorical, decode_address, iter_houses
+from proppredict.categorical import MISSING
+
+
+def test_encode_decode_round_trip():
+    values = ["Seattle", "Kent", "Seattle", "Ålesund", "Kent"]
+    column = Categorical.encode(values)
+    assert column.categories.tolist() == ["Kent", "Seattle", "Ålesund"]
+    assert column.codes.dtype == np.int8
+    assert column.decode().tolist() == values
+    assert [column[i] for i in range(len(column))] == values
+    assert column.code_of("Seattle") == 1 and column.code_of("Tacoma") == MISSING
+
+
+def test_bytes_and_missing_rows_round_trip():
+    values = np.array([b"WA 98133", b"", "WA 98042".encode(), "Ålesund".encode()])
+    column = Categorical.encode(values, missing=np.array([False, True, False, False]))
+    assert column.categories.tolist() == ["WA 98042", "WA 98133", "Ålesund"]
+    assert column.decode().tolist() == ["WA 98133", "", "WA 98042", "Ålesund"]
+    assert column[1] is None
+
+
+def test_concat_merges_dictionaries():
+    left, right = Categorical.encode(["b", "a"]), Categorical.encode(["c", "a"])
+    both = Categorical.concat([left, right, Categorical.encode([])])
+    assert both.categories.tolist() == ["a", "b", "c"]
+    assert both.decode().tolist() == ["b", "a", "c", "a"]
+    assert both[1:3].decode().tolist() == ["a", "c"]
+
+
+def test_decode_address_round_trips_the_source(data_dir):
+    addresses = [house["address"] for house in iter_houses(data_dir / "data.dat")]
+    decoded = decode_address(addresses).check()
+    rebuilt = [
+        ", ".join(parts)
+        for parts in zip(
+            decoded["street"].tolist(),
+            decoded["city"].decode().tolist(),
+            decoded["statezip"].decode().tolist(),
+            decoded["country"].decode().tolist(),
+        )
+    ]
+    assert rebuilt == addresses
+    assert decoded["country"].categories.tolist() == ["USA"]
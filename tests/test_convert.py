@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from proppredict import convert, read_csv, read_dat, repair_sqft_living
+from proppredict.table import to_csv_bytes
+
+
+@pytest.mark.parametrize("name", ["data.csv", "output.csv"])
+def test_csv_round_trips_byte_for_byte(data_dir, name):
+    path = data_dir / name
+    assert to_csv_bytes(read_csv(path)) == path.read_bytes()
+
+
+def test_derive_repair_turns_output_csv_into_data_csv(data_dir):
+    repaired, report = repair_sqft_living(read_csv(data_dir / "output.csv"), "derive")
+    np.testing.assert_array_equal(report.rows, [4337, 4338])
+    assert to_csv_bytes(repaired) == (data_dir / "data.csv").read_bytes()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_chunked_convert_matches_a_whole_read(tmp_path, data_dir, workers):
+    destination = tmp_path / "out.csv"
+    written, report = convert(data_dir / "data.dat", destination, workers=workers, chunk_bytes=1 << 17)
+    expected = to_csv_bytes(read_dat(data_dir / "data.dat"))
+    assert destination.read_bytes() == expected
+    assert written == len(expected) and report is None
+
+
+@pytest.mark.parametrize("policy", ["derive", "flag", "drop"])
+def test_chunked_repair_report_matches_a_single_chunk(tmp_path, data_dir, policy):
+    source = data_dir / "data.dat"
+    _, whole = convert(source, tmp_path / "whole.csv", workers=1, chunk_bytes=1 << 30, repair=policy)
+    _, chunked = convert(source, tmp_path / "chunked.csv", workers=2, chunk_bytes=1 << 16, repair=policy)
+    _, direct = repair_sqft_living(read_dat(source), policy)
+    assert len(whole) > 0 and whole.checked == chunked.checked == direct.checked == 4601
+    for report in (whole, chunked):
+        np.testing.assert_array_equal(report.rows, direct.rows)
+        np.testing.assert_array_equal(report.original, direct.original)
+        np.testing.assert_array_equal(report.expected, direct.expected)
+    assert (tmp_path / "chunked.csv").read_bytes() == (tmp_path / "whole.csv").read_bytes()
@@ -0,0 +1,63 @@
+from dataclasses import replace
+from functools import partial
+
+import numpy as np
+import pytest
+
+from proppredict import GradientBoostedTrees, RidgeModel, StreamingRidge, cross_validate
+from proppredict.cv import assign_folds
+from proppredict.features import feature_matrix, target
+
+SMALL_GBT = partial(GradientBoostedTrees, n_trees=5, max_depth=3, workers=1)
+
+
+@pytest.mark.parametrize("by, key", [("date", "date"), ("statezip", "statezip")])
+def test_folds_are_disjoint_in_their_key(csv_table, by, key):
+    fold = assign_folds(csv_table, k=5, by=by)
+    assert fold.shape == (len(csv_table),) and set(fold.tolist()) == set(range(5))
+    column = csv_table[key]
+    values = np.asarray(column.codes if key == "statezip" else column)
+    for value in np.unique(values):
+        assert len(np.unique(fold[values == value])) == 1, value
+
+
+def test_date_folds_are_contiguous_ranges(csv_table):
+    fold = assign_folds(csv_table, k=4, by="date")
+    dates = np.asarray(csv_table["date"])
+    for j in range(3):
+        assert dates[fold == j].max() < dates[fold == j + 1].min()
+
+
+def test_bad_arguments_raise(csv_table):
+    with pytest.raises(ValueError):
+        assign_folds(csv_table, k=1)
+    with pytest.raises(ValueError):
+        assign_folds(csv_table, by="city")
+    with pytest.raises(ValueError):
+        assign_folds(csv_table.take(np.arange(3)), k=5, by="statezip")
+
+
+def test_every_row_is_held_out_once(csv_table):
+    report = cross_validate(csv_table, k=3, by="statezip", model=RidgeModel, workers=1)
+    sizes = np.bincount(assign_folds(csv_table, k=3, by="statezip"))
+    assert [f.test_rows for f in report.folds] == sizes.tolist()
+    assert all(f.train_rows + f.test_rows == len(csv_table) for f in report.folds)
+
+
+def test_ridge_adapter_matches_streaming_ridge(csv_table):
+    fold = assign_folds(csv_table, k=3, by="date")
+    X, y = feature_matrix(csv_table), target(csv_table)
+    report = cross_validate(csv_table, k=3, by="date", model=RidgeModel, workers=1)
+    for result in report.folds:
+        train, test = fold != result.fold, fold == result.fold
+        ridge = StreamingRidge().add(X[train], y[train]).fit()
+        error = ridge.predict(X[test]) - y[test]
+        assert result.rmse == pytest.approx(np.sqrt(np.mean(error**2)))
+
+
+def test_pool_matches_in_process(csv_table):
+    timings = {"fit_seconds": 0.0, "predict_seconds": 0.0}
+    for model in (RidgeModel, SMALL_GBT):
+        local = cross_validate(csv_table, k=3, by="statezip", model=model, workers=1)
+        pooled = cross_validate(csv_table, k=3, by="statezip", model=model, workers=2)
+        assert [replace(f, **timings) for f in pooled.folds] == [replace(f, **timings) for f in local.folds]
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from proppredict import DecodeError, decode_area, decode_dates, decode_rooms, iter_houses, normalize_yr_renovated
+
+
+def test_decode_area_matches_string_split(data_dir):
+    values = [house["area"]["sqft_living/sqft_lot"] for house in iter_houses(data_dir / "data.dat")]
+    decoded = decode_area(values).check()
+    living, lot = zip(*(value.split("=")[1].split("\\ ") for value in values))
+    np.testing.assert_array_equal(decoded["sqft_living"], np.array(living, dtype=np.int32))
+    np.testing.assert_array_equal(decoded["sqft_lot"], np.array(lot, dtype=np.int32))
+
+
+def test_decode_area_flags_malformed_rows():
+    decoded = decode_area(
+        [
+            "sqft_living/sqft_lot=1340\\ 7912",
+            "sqft_living/sqft_lot=1340 7912",
+            "sqft_lot=1\\ 2",
+            "sqft_living/sqft_lot=99999999999\\ 1",
+            "",
+            "sqft_living/sqft_lot=12\\ 3",
+            "sqft_living/sqft_lot=1\n2\\ 3",
+        ]
+    )
+    np.testing.assert_array_equal(decoded.invalid, [1, 2, 3, 4, 6])
+    np.testing.assert_array_equal(decoded["sqft_living"], [1340, 0, 0, 0, 0, 12, 0])
+    np.testing.assert_array_equal(decoded["sqft_lot"], [7912, 0, 0, 0, 0, 3, 0])
+    with pytest.raises(DecodeError) as err:
+        decoded.check()
+    assert err.value.field == "area"
+
+
+@pytest.mark.parametrize("tail", ["sqft_living/sqft_lot=1\\", "sqft_living/sqft_lot=1", "sqft_liv", "s"])
+def test_decode_area_short_last_row(tail):
+    # The last row ends the buffer, so word-wide reads of it run past the end.
+    decoded = decode_area(["sqft_living/sqft_lot=2\\ 3", tail])
+    np.testing.assert_array_equal(decoded.invalid, [1])
+    np.testing.assert_array_equal(decoded["sqft_living"], [2, 0])
+
+
+def test_decode_rooms_accepts_both_label_orders():
+    decoded = decode_rooms(
+        ["Number of bathrooms: 1.5; Number of bedrooms: 3", "Number of bedrooms: 4; Number of bathrooms: 2.25"]
+    ).check()
+    np.testing.assert_array_equal(decoded["bathrooms"], [1.5, 2.25])
+    np.testing.assert_array_equal(decoded["bedrooms"], [3.0, 4.0])
+
+
+def test_decode_rooms_flags_malformed_rows():
+    decoded = decode_rooms(
+        [
+            "Number of bathrooms: x; Number of bedrooms: 3",
+            "Number of bathrooms: 1.5.1; Number of bedrooms: 3",
+            "Number of bathrooms: 1; Number of bathrooms: 3",
+            "Number of bathrooms: 1, Number of bedrooms: 3",
+            "Number of bathrooms: 2; Number of bedrooms: 1",
+        ]
+    )
+    np.testing.assert_array_equal(decoded.invalid, [0, 1, 2, 3])
+    np.testing.assert_array_equal(decoded["bathrooms"], [0, 0, 0, 0, 2])
+    with pytest.raises(DecodeError):
+        decoded.check()
+
+
+@pytest.mark.parametrize("tail", ["Number of bath", "Number of bathrooms: 1; Number of bed", "N"])
+def test_decode_rooms_short_last_row(tail):
+    decoded = decode_rooms(["Number of bedrooms: 2; Number of bathrooms: 1", tail])
+    np.testing.assert_array_equal(decoded.invalid, [1])
+    np.testing.assert_array_equal(decoded["bedrooms"], [2, 0])
+
+
+def test_decode_rooms_writes_into_given_arrays():
+    bathrooms, bedrooms = np.empty(1, dtype=np.float32), np.empty(1, dtype=np.float32)
+    decode_rooms(["Number of bathrooms: 0.75; Number of bedrooms: 1"], bathrooms, bedrooms)
+    assert (bathrooms[0], bedrooms[0]) == (0.75, 1.0)
+    with pytest.raises(ValueError):
+        decode_rooms(["Number of bathrooms: 1; Number of bedrooms: 1"], np.empty(1, dtype=np.int64))
+
+
+def test_decode_dates_accepts_both_date_orders():
+    decoded = decode_dates(
+        [
+            "20140502T000000",
+            "02052014T000000",
+            "20140230T000000",
+            "2014050T000000",
+            "20140502T250000",
+            "20140502X000000",
+            "20141231T235959",
+        ]
+    )
+    np.testing.assert_array_equal(decoded.invalid, [2, 3, 4, 5])
+    np.testing.assert_array_equal(decoded["epoch_day"], [16192, 16192, 0, 0, 0, 0, 16435])
+    assert decoded["date"][6] == np.datetime64("2014-12-31T23:59:59")
+    assert np.isnat(decoded["date"][2:6]).all()
+
+
+def _strptime(value: str) -> np.datetime64:
+    for layout in ("%Y%m%dT%H%M%S", "%d%m%YT%H%M%S"):
+        try:
+            return np.datetime64(datetime.strptime(value, layout), "s")
+        except ValueError:
+            pass
+    return np.datetime64("NaT", "s")
+
+
+def test_decode_dates_matches_strptime(data_dir):
+    values = [house["date"] for house in iter_houses(data_dir / "data.dat")]
+    decoded = decode_dates(values)
+    expected = np.array([_strptime(value) for value in values])
+    np.testing.assert_array_equal(decoded["date"], expected)
+    # The source holds one impossible date, 20140631.
+    np.testing.assert_array_equal(decoded.invalid, [4334])
+
+
+def test_normalize_yr_renovated_uses_the_zero_sentinel():
+    decoded = normalize_yr_renovated([np.nan, 0.0, 2005.0, 1999.5, -3.0, 40000.0, 1912.0])
+    assert decoded["yr_renovated"].dtype == np.int16
+    np.testing.assert_array_equal(decoded["yr_renovated"], [0, 0, 2005, 0, 0, 0, 1912])
+    np.testing.assert_array_equal(decoded.invalid, [3, 4, 5])
+
+
+def test_dat_yr_renovated_matches_the_raw_floats(data_dir, dat_table):
+    raw = np.array([house["yr_renovated"] for house in iter_houses(data_dir / "data.dat")], dtype=np.float64)
+    assert np.isnan(raw).any()
+    np.testing.assert_array_equal(dat_table["yr_renovated"], np.nan_to_num(raw).astype(np.int16))
@@ -0,0 +1,17 @@
+from proppredict import SnapshotDiff
+
+
+def test_output_csv_differs_in_two_sqft_living_cells(data_dir):
+    diff = SnapshotDiff(data_dir / "data.csv", data_dir / "output.csv")
+    changes = [(c.kind, c.old_line, c.new_line, c.column, c.old, c.new) for c in diff]
+    assert changes == [
+        ("changed", 4339, 4339, "sqft_living", "2700", "1280"),
+        ("changed", 4340, 4340, "sqft_living", "590", "890"),
+    ]
+    assert diff.rows == (4600, 4600)
+    assert dict(diff.counts) == {"inserted": 0, "deleted": 0, "changed": 2}
+
+
+def test_identical_files_have_no_changes(data_dir):
+    diff = SnapshotDiff(data_dir / "data.csv", data_dir / "data.csv")
+    assert list(diff) == []
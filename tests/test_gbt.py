@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from proppredict import CompiledForest, GradientBoostedTrees, quarantine
+from proppredict import gbt
+from proppredict.features import feature_matrix
+
+
+@pytest.fixture(scope="module")
+def clean(csv_table):
+    return quarantine(csv_table)[0]
+
+
+def _walk(model: GradientBoostedTrees, X: np.ndarray) -> np.ndarray:
+    out = np.full(len(X), model.base)
+    for tree in model.trees:
+        for i, x in enumerate(X):
+            node = tree[0]
+            while node.feature >= 0:
+                node = tree[node.left] if x[node.feature] <= node.threshold else tree[node.right]
+            out[i] += node.value
+    return out
+
+
+def test_compiled_forest_matches_tree_walk(clean, csv_table, tmp_path):
+    model = GradientBoostedTrees(n_trees=20, max_depth=4, workers=1).fit(clean)
+    X = feature_matrix(csv_table)[:500]
+    expected = _walk(model, X)
+    forest = model.compile()
+    np.testing.assert_allclose(forest.predict(X, block_elements=1000), expected, rtol=1e-12)
+    forest.save(tmp_path / "forest.npz")
+    np.testing.assert_array_equal(CompiledForest.load(tmp_path / "forest.npz").predict(X), forest.predict(X))
+
+
+def test_two_workers_fit_the_same_trees(clean, monkeypatch):
+    monkeypatch.setattr(gbt, "MIN_SHARD_ROWS", 1000)
+    one = GradientBoostedTrees(n_trees=5, max_depth=4, workers=1).fit(clean)
+    two = GradientBoostedTrees(n_trees=5, max_depth=4, workers=2).fit(clean)
+    assert [[(n.feature, n.bin, n.left, n.right, n.count) for n in tree] for tree in two.trees] == [
+        [(n.feature, n.bin, n.left, n.right, n.count) for n in tree] for tree in one.trees
+    ]
+    np.testing.assert_allclose(two.predict(clean), one.predict(clean), rtol=1e-9)
+
+
+def test_interrupted_save_keeps_the_previous_forest(clean, tmp_path, monkeypatch):
+    path = tmp_path / "forest.npz"
+    old = GradientBoostedTrees(n_trees=2, max_depth=2, workers=1).fit(clean).compile()
+    old.save(path)
+    new = GradientBoostedTrees(n_trees=4, max_depth=3, workers=1).fit(clean).compile()
+    savez = np.savez
+
+    def interrupted(file, **arrays):
+        savez(file, **{name: arrays[name] for name in list(arrays)[:2]})
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(np, "savez", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        new.save(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["forest.npz"]
+    np.testing.assert_array_equal(CompiledForest.load(path).predict(clean), old.predict(clean))
@@ -0,0 +1,54 @@
+import csv
+
+import numpy as np
+import pytest
+
+from proppredict import House, Houses, ListingTable
+
+
+def test_attributes_match_the_csv_row(csv_table, data_dir):
+    with open(data_dir / "data.csv", newline="") as fp:
+        first = next(csv.DictReader(fp))
+    house = Houses(csv_table)[0]
+    assert house.price == float(first["price"]) and isinstance(house.price, float)
+    assert house.sqft_living == int(first["sqft_living"]) and isinstance(house.sqft_living, int)
+    assert house.floors == float(first["floors"]) and isinstance(house.floors, float)
+    assert (house.street, house.city, house.statezip, house.country) == (
+        first["street"],
+        first["city"],
+        first["statezip"],
+        first["country"],
+    )
+    assert house.date == np.datetime64(first["date"])
+    assert list(house.as_dict()) == list(csv_table.names)
+
+
+def test_views_do_not_copy_and_have_no_dict(csv_table):
+    house = Houses(csv_table)[3]
+    assert not hasattr(house, "__dict__")
+    with pytest.raises(AttributeError):
+        house.extra = 1
+    assert house == House(csv_table, 3) and hash(house) == hash(House(csv_table, 3))
+    assert house != House(csv_table, 4)
+
+
+def test_sequence_indexing(csv_table):
+    houses = Houses(csv_table)
+    assert len(houses) == len(csv_table)
+    assert houses[-1].row == len(csv_table) - 1
+    with pytest.raises(IndexError):
+        houses[len(csv_table)]
+    expensive = houses[np.asarray(csv_table["price"]) > 1e6]
+    assert all(house.price > 1e6 for house in expensive)
+    assert [house.row for house in expensive[1:3]] == expensive.rows[1:3].tolist()
+    assert [house.row for house in houses[10:13]] == [10, 11, 12]
+    table = expensive.materialize()
+    np.testing.assert_array_equal(table["price"], [house.price for house in expensive])
+
+
+def test_missing_column_is_an_attribute_error(csv_table):
+    house = Houses(ListingTable({"price": np.asarray(csv_table["price"])}))[0]
+    assert house.price == csv_table["price"][0]
+    with pytest.raises(AttributeError):
+        house.city
+    assert repr(house) == "House(row=0)"
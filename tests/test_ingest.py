@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import proppredict
+from proppredict import IngestStore
+from proppredict.table import to_csv_bytes
+
+_SEP = b"}, {"
+
+
+def _prefix(raw: bytes, records: int) -> bytes:
+    """``data.dat`` cut back to its first ``records`` records."""
+    head, body = raw.split(b"[", 1)
+    parts = body[: body.rindex(b"]")].split(_SEP)
+    if not records:
+        return head + b"[]}"
+    return head + b"[" + _SEP.join(parts[:records]) + (b"}" if records < len(parts) else b"") + b"]}"
+
+
+def test_appends_match_a_full_read(tmp_path, data_dir, dat_table):
+    raw = (data_dir / "data.dat").read_bytes()
+    source, export = tmp_path / "data.dat", tmp_path / "export.csv"
+    store = IngestStore(tmp_path / "store")
+    ingested = 0
+    for records in (0, 1000, 3000, 4601):
+        source.write_bytes(_prefix(raw, records))
+        report = store.ingest(source, export)
+        assert report.rows == records - ingested
+        ingested = records
+    assert source.read_bytes() == raw
+    assert store.state.rows == len(dat_table) == 4601
+    expected = to_csv_bytes(dat_table)
+    assert to_csv_bytes(store.table()) == expected
+    assert export.read_bytes() == expected
+    assert store.features().shape == (4601, 12)
+
+
+def test_cli_modules_run_without_runpy_warnings(tmp_path, data_dir):
+    # proppredict must not import diff or ingest itself, or ``python -m`` warns.
+    env = {**os.environ, "PYTHONPATH": str(Path(proppredict.__file__).parent.parent)}
+    for args in (
+        ["proppredict.ingest", str(data_dir / "data.dat"), str(tmp_path / "store"), "--csv", str(tmp_path / "out.csv")],
+        ["proppredict.diff", str(data_dir / "data.csv"), str(data_dir / "data.csv")],
+    ):
+        done = subprocess.run([sys.executable, "-W", "error", "-m", *args], env=env, capture_output=True, text=True)
+        assert done.returncode == 0, done.stderr
@@ -0,0 +1,45 @@
+import numpy as np
+
+from proppredict import StreamingRidge
+
+
+def _ridge(X: np.ndarray, y: np.ndarray, alpha: float) -> tuple[np.ndarray, float]:
+    """Ridge on standardised features with an unpenalised intercept, solved directly."""
+    mean, scale = X.mean(axis=0), X.std(axis=0)
+    Z = (X - mean) / scale
+    beta = np.linalg.solve(Z.T @ Z + alpha * np.eye(X.shape[1]), Z.T @ (y - y.mean()))
+    coef = beta / scale
+    return coef, float(y.mean() - mean @ coef)
+
+
+def _data(rows: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    loc = [3, 2, 2000, 8000, 1.5, 0, 0, 3, 1700, 300, 1970, 0]
+    scale = [1, 1, 800, 5000, 0.5, 1, 1, 1, 700, 400, 30, 1]
+    X = rng.normal(loc, scale, (rows, 12))
+    y = X @ rng.normal(0, 50, 12) + 5e5 + rng.normal(0, 1e4, rows)
+    return X, y
+
+
+def test_add_remove_merge_match_direct_solve():
+    X, y = _data(3000, 0)
+    coef, intercept = _ridge(X[:2000], y[:2000], 3.0)
+
+    model = StreamingRidge(alpha=3.0).add(X[:1000], y[:1000]).add(X[1000:], y[1000:])
+    model.remove(X[2000:], y[2000:]).fit()
+    np.testing.assert_allclose(model.coef, coef, rtol=1e-8)
+    assert abs(model.intercept - intercept) <= 1e-8 * abs(intercept)
+
+    other = StreamingRidge(alpha=3.0).add(X[700:2000], y[700:2000])
+    merged = StreamingRidge(alpha=3.0).add(X[:700], y[:700]).merge(other).fit()
+    np.testing.assert_allclose(merged.coef, coef, rtol=1e-8)
+    np.testing.assert_allclose(merged.predict(X[2000:]), X[2000:] @ coef + intercept, rtol=1e-9)
+
+
+def test_save_load_round_trip(tmp_path):
+    X, y = _data(500, 1)
+    model = StreamingRidge(alpha=1.0).add(X, y)
+    model.save(tmp_path / "ridge.npz")
+    loaded = StreamingRidge.load(tmp_path / "ridge.npz").fit()
+    np.testing.assert_allclose(loaded.coef, model.fit().coef)
+    assert loaded.rows == 500
@@ -0,0 +1,17 @@
+import numpy as np
+
+from proppredict import quarantine
+
+
+def test_quarantine_counts(csv_table):
+    clean, report = quarantine(csv_table)
+    assert report.checked == 4600
+    assert len(report) == 260
+    assert report.counts() == {
+        "zero_price": 49,
+        "price_per_sqft": 18,
+        "sqft_living": 0,
+        "renovated_before_built": 195,
+    }
+    assert len(clean) + len(report.side) == len(csv_table)
+    assert (np.asarray(clean["price"]) > 0).all()
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from proppredict import load_table, query, write_rowgroups
+from proppredict.query import col, count, scan
+
+SOURCES = ["table", "data.csv", "data.dat", "rowgroups", "cache"]
+
+
+@pytest.fixture(scope="module")
+def sources(data_dir, csv_table, tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("query")
+    load_table(data_dir / "data.csv", tmp / "cache")
+    return {
+        "table": csv_table,
+        "data.csv": data_dir / "data.csv",
+        "data.dat": data_dir / "data.dat",
+        "rowgroups": write_rowgroups(csv_table, tmp / "data.pprg", group_rows=512, sort_by=("city",)),
+        "cache": next((tmp / "cache").iterdir()),
+    }
+
+
+@pytest.mark.parametrize("name", SOURCES)
+def test_global_count(sources, csv_table, dat_table, name):
+    table = dat_table if name == "data.dat" else csv_table
+    price = np.asarray(table["price"])
+    frame = scan(sources[name])
+    assert frame.agg(count()).collect()["count"].tolist() == [len(table)]
+    assert frame.filter(col("price") > 0).agg(count()).collect()["count"].tolist() == [(price > 0).sum()]
+    seattle = np.asarray(table["city"].decode() == "Seattle")
+    filtered = frame.filter(col("city") == "Seattle", col("price") > 5e5).agg(count(), col("price").count())
+    assert filtered.collect()["count"].tolist() == [(seattle & (price > 5e5)).sum()]
+
+
+@pytest.mark.parametrize("name", SOURCES)
+def test_group_by_matches_eager_aggregates(sources, csv_table, dat_table, name):
+    table = dat_table if name == "data.dat" else csv_table
+    result = (
+        scan(sources[name])
+        .filter(col("price") > 0)
+        .group_by("city")
+        .agg(col("price").median(), col("price").mean(), col("sqft_living").max(), count())
+        .collect()
+    )
+    city, price = table["city"].decode(), np.asarray(table["price"])
+    sqft = np.asarray(table["sqft_living"])
+    names = sorted(set(city[price > 0].tolist()))
+    assert result["city"].decode().tolist() == names
+    for i, name in enumerate(names):
+        rows = (city == name) & (price > 0)
+        assert result["count"][i] == rows.sum()
+        assert result["price_median"][i] == np.median(price[rows])
+        assert result["price_mean"][i] == pytest.approx(price[rows].mean())
+        assert result["sqft_living_max"][i] == sqft[rows].max()
+
+
+def test_projection_and_pushdown_in_the_plan(sources):
+    frame = (
+        scan(sources["data.csv"])
+        .select("price", "city", "sqft_living", "bedrooms")
+        .filter(col("bedrooms") >= 3)
+        .group_by("city")
+        .agg(col("price").median().alias("median"))
+        .filter(col("median") > 6e5)
+    )
+    plan = frame.plan()
+    assert plan.columns == ("city", "price")
+    assert [str(p) for p in plan.filters] == ["bedrooms >= 3"]
+    assert [str(p) for p in plan.having] == ["median > 600000.0"]
+    assert plan.output == ("city", "median")
+    assert frame.explain().splitlines() == [
+        f"scan {sources['data.csv']} (decode)",
+        "  columns: city, price",
+        "  pushed filters: bedrooms >= 3",
+        "aggregate by [city]: median(price) as median",
+        "filter median > 600000.0",
+        "output city, median",
+    ]
+    result = frame.collect()
+    assert (result["median"] > 6e5).all() and list(result.columns) == ["city", "median"]
+
+
+def test_count_plan_reads_one_column(sources):
+    assert scan(sources["table"]).agg(count()).plan().columns == (query.COUNT_COLUMN,)
+    assert scan(sources["table"]).filter(col("price") > 0).agg(count()).plan().columns == ("price",)
+
+
+def test_file_source_decodes_only_used_columns(sources, monkeypatch):
+    seen = []
+    decode = query.read_table
+
+    def read_table(path, columns=None):
+        seen.append(sorted(columns))
+        return decode(path, columns)
+
+    monkeypatch.setattr(query, "read_table", read_table)
+    result = scan(sources["data.dat"]).filter(col("yr_built") < 1950).select("price").collect()
+    assert seen == [["price", "yr_built"]]
+    assert list(result.columns) == ["price"]
+
+
+def test_unaggregated_select_and_filter(sources, csv_table):
+    result = scan(sources["rowgroups"]).select("price", "city").filter(col("city").isin(["Kent", "Auburn"])).collect()
+    city = csv_table["city"].decode()
+    expected = np.sort(np.asarray(csv_table["price"])[(city == "Kent") | (city == "Auburn")])
+    assert list(result.columns) == ["price", "city"]
+    np.testing.assert_array_equal(np.sort(result["price"]), expected)
+
+
+def test_plan_errors(sources):
+    frame = scan(sources["table"])
+    with pytest.raises(KeyError):
+        frame.select("price").filter(col("city") == "Kent").plan()
+    with pytest.raises(ValueError):
+        frame.agg(count()).agg(count()).plan()
+    with pytest.raises(ValueError):
+        frame.agg(col("price").count(), col("price").count()).plan()
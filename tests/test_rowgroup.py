@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from proppredict import Categorical, Predicate, RowGroupFile, write_rowgroups
+from proppredict.predicate import combined_mask
+
+FILTERS = [
+    [Predicate("city", "==", "Seattle")],
+    [Predicate("city", "in", ["Kent", "Redmond", "Nowhere"])],
+    [Predicate("city", ">=", "S"), Predicate("city", "<", "T")],
+    [Predicate("price", ">", 1e6)],
+    [Predicate("price", "<=", 0)],
+    [Predicate("bedrooms", "in", [2.5])],
+    [Predicate("bedrooms", "in", [3, 300])],
+    [Predicate("bedrooms", "!=", 3), Predicate("yr_built", "<", 1950)],
+    [Predicate("floors", "in", [1.5, 2.5])],
+    [Predicate("date", ">=", "2014-06-15"), Predicate("date", "<", "2014-06-20")],
+    [Predicate("statezip", "==", "WA 99999")],
+]
+
+
+@pytest.fixture(scope="module", params=[(), ("city", "date")], ids=["unsorted", "sorted"])
+def stored(request, csv_table, tmp_path_factory):
+    sort_by = request.param
+    path = write_rowgroups(csv_table, tmp_path_factory.mktemp("rg") / "data.pprg", group_rows=256, sort_by=sort_by)
+    table = csv_table.take(np.lexsort([_codes(csv_table[n]) for n in reversed(sort_by)])) if sort_by else csv_table
+    return table, RowGroupFile(path)
+
+
+def _codes(column):
+    return np.asarray(column.codes if isinstance(column, Categorical) else column)
+
+
+def _assert_same(read, expected):
+    assert list(read.columns) == list(expected.columns)
+    for name, column in expected.columns.items():
+        if isinstance(column, Categorical):
+            np.testing.assert_array_equal(read[name].decode(), column.decode())
+        else:
+            np.testing.assert_array_equal(read[name], column)
+
+
+def test_full_read_round_trips(stored):
+    table, rg = stored
+    assert rg.num_rows == len(table) and rg.num_groups == -(-len(table) // 256)
+    _assert_same(rg.read(), table)
+
+
+@pytest.mark.parametrize("filters", FILTERS, ids=[" & ".join(map(str, f)) for f in FILTERS])
+def test_pruned_read_matches_full_scan(stored, filters):
+    table, rg = stored
+    expected = table.take(combined_mask(filters, table.columns, len(table)))
+    _assert_same(rg.read(["price", "city", "date"], filters), expected.select(["price", "city", "date"]))
+    # No group that holds a match may be pruned.
+    kept = set(rg.prune(filters))
+    for g, group in enumerate(rg.iter_groups()):
+        if combined_mask(filters, group.columns, len(group)).any():
+            assert g in kept
+
+
+def test_sorted_file_prunes_selective_filters(csv_table, tmp_path):
+    rg = RowGroupFile(write_rowgroups(csv_table, tmp_path / "data.pprg", group_rows=256, sort_by=("city",)))
+    assert len(rg.prune([Predicate("city", "==", "Seattle")])) < rg.num_groups / 2
+    assert rg.prune([Predicate("statezip", "==", "WA 99999")]) == []
+
+
+def test_isin_compares_in_the_values_own_dtype(csv_table):
+    bedrooms = np.asarray(csv_table["bedrooms"])
+    assert bedrooms.dtype == np.int8
+    assert not Predicate("bedrooms", "in", [2.5]).mask(bedrooms).any()
+    np.testing.assert_array_equal(Predicate("bedrooms", "in", [3, 300]).mask(bedrooms), bedrooms == 3)
+    np.testing.assert_array_equal(Predicate("bedrooms", "in", ["3", 2**70, 3]).mask(bedrooms), bedrooms == 3)
+    assert not Predicate("bedrooms", "in", []).mask(bedrooms).any()
+
+
+def test_unknown_column_raises(stored):
+    _, rg = stored
+    with pytest.raises(KeyError):
+        rg.read(["nope"])
+    with pytest.raises(KeyError):
+        rg.read(filters=[Predicate("nope", "==", 1)])
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from proppredict import LISTING_SCHEMA, Field, Predicate, SchemaError, write_rowgroups
+from proppredict.query import col, count, scan
+from proppredict.rowgroup import RowGroupFile
+from proppredict.schema import narrowest_int
+
+_NUMPY_OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def test_listing_dtypes_are_narrowed():
+    dtypes = LISTING_SCHEMA.dtypes()
+    assert dtypes["waterfront"] == dtypes["bedrooms"] == np.int8
+    assert dtypes["yr_built"] == dtypes["yr_renovated"] == np.int16
+    assert dtypes["sqft_living"] == np.int32
+    assert dtypes["floors"] == np.float16
+    assert dtypes["price"] == dtypes["bathrooms"] == np.float64
+    assert dtypes["city"] is None
+
+
+def test_loaded_tables_use_the_schema_dtypes(csv_table, dat_table):
+    for table in (csv_table, dat_table):
+        for field in LISTING_SCHEMA:
+            if field.dtype is not None:
+                assert np.asarray(table[field.name]).dtype == field.dtype, field.name
+
+
+@pytest.mark.parametrize(
+    "field, values, reason",
+    [
+        (Field("bedrooms", "int", 0, 100), [3, 101], "outside"),
+        (Field("bedrooms", "int", 0, 100), [3, -1], "outside"),
+        (Field("bedrooms", "int", 0, 100), [3, 300], "outside"),
+        (Field("bedrooms", "int", 0, 100), [3.0, 2.5], "whole numbers"),
+        (Field("floors", "decimal", 0, 100, step=0.5), [1.5, 1.25], "multiples of 0.5"),
+        (Field("floors", "decimal", 0, 100, step=0.5), [1.0, 100.5], "outside"),
+        (Field("price", "float", 0, 1e10), [1.0, np.nan], "null"),
+    ],
+)
+def test_out_of_domain_values_raise_instead_of_wrapping(field, values, reason):
+    with pytest.raises(SchemaError, match=reason) as err:
+        field.conform(np.array(values))
+    assert err.value.column == field.name
+    np.testing.assert_array_equal(err.value.rows, [1])
+
+
+def test_skipped_rows_are_not_checked():
+    field = Field("bedrooms", "int", 0, 100)
+    np.testing.assert_array_equal(field.conform(np.array([3.0, 999.0]), skip=np.array([False, True]))[:1], [3])
+
+
+def test_narrowest_int_bounds():
+    assert narrowest_int(0, 127) == np.int8 and narrowest_int(0, 128) == np.int16
+    assert narrowest_int(-(2**31), 2**31 - 1) == np.int32
+    with pytest.raises(OverflowError):
+        narrowest_int(0, 2**63)
+
+
+def test_float16_half_steps_round_trip():
+    field = LISTING_SCHEMA["floors"]
+    steps = np.arange(0, 100.5, 0.5)
+    stored = field.conform(steps)
+    assert stored.dtype == np.float16
+    np.testing.assert_array_equal(stored.astype(np.float64), steps)
+    assert [float(v) for v in stored] == steps.tolist()
+
+
+@pytest.mark.parametrize(
+    "predicate",
+    [
+        col("floors") < 1.0004,
+        col("floors") <= 1.4999,
+        col("floors") > 1.0004,
+        col("floors") >= 1.0004,
+        col("floors") == 1.0004,
+        col("floors") != 1.0004,
+        col("floors") == 1.5,
+        col("floors").isin([1.0004, 2.5]),
+        col("bedrooms") < 2.5,
+        col("bedrooms") >= 300,
+        col("yr_built") > 1999.5,
+    ],
+    ids=str,
+)
+def test_queries_on_narrowed_columns_compare_exactly(csv_table, tmp_path, predicate):
+    values = np.asarray(csv_table[predicate.column]).astype(np.float64)
+    if predicate.op == "in":
+        expected = np.isin(values, predicate.value).sum()
+    else:
+        expected = _NUMPY_OPS[predicate.op](values, predicate.value).sum()
+    assert predicate.mask(csv_table[predicate.column]).sum() == expected
+    assert scan(csv_table).filter(predicate).agg(count()).collect()["count"][0] == expected
+    # Zone maps built from the narrow column must not prune matching groups either.
+    rg = RowGroupFile(write_rowgroups(csv_table, tmp_path / "t.pprg", group_rows=128, sort_by=(predicate.column,)))
+    assert len(rg.read(["price"], [predicate])) == expected
+
+
+def test_floors_thresholds_between_half_steps(csv_table):
+    floors = csv_table["floors"]
+    assert Predicate("floors", "<", 1.0004).mask(floors).sum() == 2174
+    assert Predicate("floors", "<=", 1.4999).mask(floors).sum() == 2174
@@ -0,0 +1,49 @@
+import pytest
+
+from proppredict import load_binned, successive_halving
+from proppredict.search import grid
+
+SPACE = {"learning_rate": (0.05, 0.2), "max_depth": (2, 4, 6), "min_samples_leaf": (5, 50)}
+
+
+@pytest.fixture(scope="module")
+def binned(data_dir, tmp_path_factory):
+    return load_binned(data_dir / "data.csv", cache_dir=tmp_path_factory.mktemp("cache"))
+
+
+def test_pick_is_among_the_best_of_the_full_grid(binned):
+    configs = grid(SPACE)
+    report = successive_halving(binned, configs, max_trees=54, min_rows=128, min_trees=6, workers=1)
+    assert len({trial.rung for trial in report.trials}) == 3
+    # One rung at the full budget is the plain grid search.
+    full = successive_halving(binned, configs, max_trees=54, min_trees=54, workers=1)
+    assert {trial.rung for trial in full.trials} == {0}
+    ranked = [trial.config for trial in sorted(full.trials, key=lambda trial: trial.rmse)]
+    assert ranked.index(report.best.config) < 3
+    assert report.best.rows == len(binned.y) and report.best.n_trees == 54
+
+
+def test_no_rung_repeats_a_budget(binned):
+    report = successive_halving(binned, grid(SPACE), max_trees=54, min_rows=128, min_trees=6, workers=1)
+    budgets = [(report.rung(rung)[0].rows, report.rung(rung)[0].n_trees) for rung in range(3)]
+    assert len(set(budgets)) == 3
+    assert [len(report.rung(rung)) for rung in range(3)] == [12, 4, 2]
+
+
+def test_two_workers_score_like_one(binned):
+    configs = grid(SPACE)[:4]
+    one = successive_halving(binned, configs, max_trees=18, min_trees=6, workers=1)
+    two = successive_halving(binned, configs, max_trees=18, min_trees=6, workers=2)
+    assert [(t.config, t.rung, t.rmse) for t in two.trials] == [(t.config, t.rung, t.rmse) for t in one.trials]
+
+
+def test_cache_is_keyed_on_every_argument(data_dir, binned, tmp_path):
+    source = data_dir / "data.csv"
+    first = load_binned(source, cache_dir=tmp_path)
+    assert (first.bins == binned.bins).all()
+    reseeded = load_binned(source, cache_dir=tmp_path, seed=1)
+    assert not (reseeded.y == first.y).all()
+    fewer = load_binned(source, features=first.features[:3], cache_dir=tmp_path)
+    assert fewer.features == first.features[:3] and fewer.bins.shape[1] == 3
+    assert len(list(tmp_path.glob("*/binned-*.npz"))) == 3
+    assert (load_binned(source, cache_dir=tmp_path).y == first.y).all()
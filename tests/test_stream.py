@@ -0,0 +1,11 @@
+import json
+
+from proppredict import iter_houses
+
+
+def test_iter_houses_matches_json_load(data_dir):
+    houses = list(iter_houses(data_dir / "data.dat", chunk_size=4096))
+    expected = json.loads((data_dir / "data.dat").read_text().replace("NaN", "null"))["houses"]
+    assert len(houses) == len(expected) == 4601
+    assert [h["address"] for h in houses] == [h["address"] for h in expected]
+    assert [h["price"] for h in houses] == [h["price"] for h in expected]
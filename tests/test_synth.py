@@ -0,0 +1,13 @@
+import pytest
+
+from proppredict.synth import SyntheticModel, write
+
+
+@pytest.mark.parametrize("fmt", ["csv", "dat"])
+def test_output_does_not_depend_on_worker_count(tmp_path, csv_table, fmt):
+    model = SyntheticModel.fit(csv_table)
+    one, two = tmp_path / f"one.{fmt}", tmp_path / f"two.{fmt}"
+    written = write(model, one, 5000, fmt, seed=3, workers=1, chunk_rows=1000)
+    write(model, two, 5000, fmt, seed=3, workers=2, chunk_rows=1000)
+    assert one.read_bytes() == two.read_bytes()
+    assert written == one.stat().st_size